@@ -1,16 +1,27 @@
+import argparse
+import contextlib
+import functools
+import os
 import time
 
 from comp_fuego import fuego
 from comp_bombero import bombero
+from contexto import InstanceContext
+from exacto import ExactSolver
 from iterated_local_search import IteratedLocalSearch
+from portafolio import PortfolioStrategy
 from variable_neighborhood_search import VariableNeighborhoodSearch
-from loader import data_carga
-from writer import guardar_salida_txt
+from loader import data_carga_cacheada
+from metricas import MetricsRecorder
+from presupuesto import TimeBudgetScheduler
+from writer import guardar_presupuesto, guardar_salida_txt
 from simulation import Simulation
+from resultados_db import ResultStore, hash_instancia, parametros
 
 INPUT_CHOICES = {str(i): f"input{i}.dat" for i in range(1, 21)}
 SEEDS = list(range(10))  # 10 ejecuciones con 10 semillas distintas
-SALIDAS = {"ils": "salidaA1.txt", "vns": "salidaA2.txt"}
+SALIDAS = {"ils": "salidaA1.txt", "vns": "salidaA2.txt", "portafolio": "salidaP.txt"}
+PRESUPUESTOS_DIR = "presupuestos"  # reparto por tick de cada corrida con --presupuesto
 
 
 def _seleccionar_inputs() -> list[str] | None:
@@ -36,41 +47,105 @@ def _correr_ejecucion(
     estrategia_factory,
     input_path: str,
     seed: int,
+    nombre: str | None = None,
+    store: ResultStore | None = None,
+    instance_hash: str | None = None,
+    contexto: InstanceContext | None = None,
+    con_metricas: bool = False,
+    presupuesto: float | None = None,
 ) -> tuple[int, float] | None:
+    estrategia = _crear_estrategia(estrategia_factory, seed)
+    # con presupuesto global el scheduler fija time_limit: es otra corrida
+    params = parametros(estrategia, presupuesto=presupuesto)
+    if store is not None and nombre is not None and instance_hash is not None:
+        guardado = store.obtener(instance_hash, nombre, params, seed)
+        if guardado is not None:
+            return guardado
+
     try:
-        _, fuego_pos, bombero_pos, area = data_carga(input_path)
+        # las 10 semillas comparten el parseo: cada corrida recibe una copia
+        _, fuego_pos, bombero_pos, area = data_carga_cacheada(input_path, persistir=True)
     except Exception as e:
         print(f"[ERROR] No se pudo cargar {input_path}: {e}")
         return None
 
-    comp_bombero = bombero(bombero_pos[0], bombero_pos[1], estrategia=_crear_estrategia(estrategia_factory, seed))
-    comp_fuego = fuego(tasa_crecimiento=1)
-    sim = Simulation(area, comp_fuego, comp_bombero)
+    estrategia.usar_contexto(contexto)
+    comp_bombero = bombero(bombero_pos[0], bombero_pos[1], estrategia=estrategia)
+    comp_fuego = fuego(tasa_crecimiento=1, contexto=contexto)
+    metricas = MetricsRecorder() if con_metricas else None
+    scheduler = TimeBudgetScheduler(presupuesto) if presupuesto else None
+    sim = Simulation(area, comp_fuego, comp_bombero, scheduler=scheduler, metricas=metricas)
 
     start = time.perf_counter()
-    sim.run_until_stable()
+    try:
+        sim.run_until_stable()
+    finally:
+        # estrategias con procesos propios (portafolio, VNS con workers)
+        cerrar = getattr(estrategia, "cerrar", None)
+        if cerrar is not None:
+            cerrar()
     elapsed = time.perf_counter() - start
+    if scheduler is not None and nombre is not None:
+        os.makedirs(PRESUPUESTOS_DIR, exist_ok=True)
+        base = os.path.splitext(os.path.basename(input_path))[0]
+        guardar_presupuesto(os.path.join(PRESUPUESTOS_DIR, f"{nombre}_{base}_s{seed}.txt"), scheduler.reporte())
 
     stats = comp_bombero.estrategia.resumen_global(area=area, wall_time=elapsed)
+    if metricas is not None:
+        # curva de quemadas y latencias por tick: en el almacen va el resumen
+        stats["metricas"] = metricas.resumen()
     costo = stats.get("quemadas")
     if costo is None:
         costo = area.counts()[1]
 
+    if store is not None and nombre is not None and instance_hash is not None:
+        store.guardar(instance_hash, nombre, params, seed, input_path, costo, elapsed, stats)
     return costo, elapsed
 
 
-def _procesar_input(
-    nombre_estrategia: str,
-    estrategia_factory,
+def _optimo_exacto(
     input_path: str,
-) -> list[str] | None:
-    resultados: list[tuple[int, float]] = []
-    for seed in SEEDS:
-        ejec = _correr_ejecucion(estrategia_factory, input_path, seed)
-        if ejec is None:
-            return None
-        resultados.append(ejec)
+    store: ResultStore | None = None,
+    instance_hash: str | None = None,
+) -> int | None:
+    """
+    Quemadas optimas de la instancia con el solver exacto (solo mapas chicos).
+    El resultado se guarda en el almacen como estrategia "exacto", semilla 0.
+    """
+    solver = ExactSolver()
+    params = parametros(solver)
+    if store is not None and instance_hash is not None:
+        guardado = store.obtener(instance_hash, "exacto", params, 0)
+        if guardado is not None:
+            return guardado[0]
+    try:
+        _, _, bombero_pos, area = data_carga_cacheada(input_path, persistir=True)
+    except Exception as e:
+        print(f"[ERROR] No se pudo cargar {input_path}: {e}")
+        return None
+    if area.n > solver.max_n:
+        print(f"[AVISO] {input_path}: mapa de {area.n}x{area.n}, el exacto solo llega a {solver.max_n}x{solver.max_n}.")
+        return None
+
+    resultado = solver.resolver(area, bombero_pos)
+    if resultado["quemadas"] is None:
+        print(f"[AVISO] EXACTO - {input_path}: sin optimo ({resultado['status']}, {resultado['nodos']} nodos).")
+        return None
+    if store is not None and instance_hash is not None:
+        store.guardar(
+            instance_hash, "exacto", params, 0, input_path,
+            resultado["quemadas"], resultado["elapsed_sec"], resultado,
+        )
+    print(f"[OK] EXACTO - {input_path}: optimo={resultado['quemadas']}, tiempo={resultado['elapsed_sec']:.4f}s")
+    return resultado["quemadas"]
+
 
+def _seccion(
+    nombre_estrategia: str,
+    input_path: str,
+    resultados: list[tuple[int, float]],
+    optimo: int | None = None,
+) -> list[str]:
     costos = [c for c, _ in resultados]
     tiempos = [t for _, t in resultados]
     mejor_costo = min(costos)
@@ -79,10 +154,16 @@ def _procesar_input(
 
     lineas: list[str] = []
     lineas.append(f"# {nombre_estrategia.upper()} - {input_path}")
-    lineas.append("instancia,mejor_costo,error_relativa,costo_promedio,tiempo_promedio")
+    encabezado = "instancia,mejor_costo,error_relativa,costo_promedio,tiempo_promedio"
+    # gap_optimo: error contra el optimo real (solo si se calculo el exacto)
+    lineas.append(encabezado if optimo is None else encabezado + ",optimo,gap_optimo")
     for idx, (costo, _) in enumerate(resultados, start=1):
         error_rel = 0.0 if mejor_costo == 0 else (costo - mejor_costo) / mejor_costo
-        lineas.append(f"{idx},{mejor_costo},{error_rel:.6f},{costo_prom:.6f},{tiempo_prom:.6f}")
+        linea = f"{idx},{mejor_costo},{error_rel:.6f},{costo_prom:.6f},{tiempo_prom:.6f}"
+        if optimo is not None:
+            gap = 0.0 if optimo == 0 else (costo - optimo) / optimo
+            linea += f",{optimo},{gap:.6f}"
+        lineas.append(linea)
     lineas.append("")
 
     print(
@@ -92,20 +173,46 @@ def _procesar_input(
     return lineas
 
 
-def _ejecutar_metaheuristica(nombre: str, estrategia_factory) -> None:
-    inputs = _seleccionar_inputs()
-    if not inputs:
-        return
+def _procesar_input(
+    nombre_estrategia: str,
+    estrategia_factory,
+    input_path: str,
+    store: ResultStore | None = None,
+    exacto: bool = False,
+    con_metricas: bool = False,
+    presupuesto: float | None = None,
+) -> list[str] | None:
+    instance_hash = None
+    if store is not None:
+        try:
+            instance_hash = hash_instancia(input_path)
+        except OSError as e:
+            print(f"[ERROR] No se pudo leer {input_path}: {e}")
+            return None
 
-    salida_path = SALIDAS[nombre]
-    contenido: list[str] = []
+    # vecinos y el memo de llegadas y rollouts se comparten entre las 10 semillas
+    try:
+        contexto = InstanceContext(data_carga_cacheada(input_path, persistir=True)[3])
+    except Exception as e:
+        print(f"[ERROR] No se pudo cargar {input_path}: {e}")
+        return None
 
-    for input_path in inputs:
-        seccion = _procesar_input(nombre, estrategia_factory, input_path)
-        if seccion is None:
-            continue
-        contenido.extend(seccion)
+    resultados: list[tuple[int, float]] = []
+    for seed in SEEDS:
+        ejec = _correr_ejecucion(
+            estrategia_factory, input_path, seed,
+            nombre=nombre_estrategia, store=store, instance_hash=instance_hash,
+            contexto=contexto, con_metricas=con_metricas, presupuesto=presupuesto,
+        )
+        if ejec is None:
+            return None
+        resultados.append(ejec)
+
+    optimo = _optimo_exacto(input_path, store, instance_hash) if exacto else None
+    return _seccion(nombre_estrategia, input_path, resultados, optimo)
 
+
+def _guardar_salida(salida_path: str, contenido: list[str]) -> None:
     if not contenido:
         print("[ERROR] No se genero informacion para guardar.")
         return
@@ -118,20 +225,110 @@ def _ejecutar_metaheuristica(nombre: str, estrategia_factory) -> None:
         print(f"[ERROR] No se pudo guardar {salida_path}: {e}")
 
 
-def main():
+def _ejecutar_metaheuristica(nombre: str, estrategia_factory, opciones: argparse.Namespace) -> None:
+    inputs = _seleccionar_inputs()
+    if not inputs:
+        return
+
+    contenido: list[str] = []
+    # Las corridas ya guardadas (misma instancia, parametros, semilla y
+    # version del codigo) se reutilizan en vez de recalcularse.
+    with ResultStore() if opciones.almacen else contextlib.nullcontext() as store:
+        for input_path in inputs:
+            seccion = _procesar_input(
+                nombre, estrategia_factory, input_path,
+                store=store, exacto=opciones.exacto, con_metricas=opciones.metricas,
+                presupuesto=opciones.presupuesto,
+            )
+            if seccion is None:
+                continue
+            contenido.extend(seccion)
+
+    _guardar_salida(SALIDAS[nombre], contenido)
+
+
+def _exportar_resultados() -> None:
+    """
+    Regenera salidaA1/salidaA2/salidaP desde el almacen, sin recalcular nada,
+    y opcionalmente resultados.xlsx.
+    """
+    inputs = _seleccionar_inputs()
+    if not inputs:
+        return
+    factories = {"ils": IteratedLocalSearch, "vns": VariableNeighborhoodSearch, "portafolio": PortfolioStrategy}
+    with ResultStore() as store:
+        for nombre, factory in factories.items():
+            contenido: list[str] = []
+            for input_path in inputs:
+                try:
+                    instance_hash = hash_instancia(input_path)
+                except OSError as e:
+                    print(f"[ERROR] No se pudo leer {input_path}: {e}")
+                    continue
+                resultados = []
+                for seed in SEEDS:
+                    params = parametros(_crear_estrategia(factory, seed))
+                    guardado = store.obtener(instance_hash, nombre, params, seed)
+                    if guardado is None:
+                        break
+                    resultados.append(guardado)
+                if len(resultados) != len(SEEDS):
+                    print(f"[AVISO] {nombre.upper()} - {input_path}: faltan corridas guardadas.")
+                    continue
+                # el optimo exacto, si ya se calculo antes, viene del almacen
+                guardado = store.obtener(instance_hash, "exacto", parametros(ExactSolver()), 0)
+                optimo = guardado[0] if guardado is not None else None
+                contenido.extend(_seccion(nombre, input_path, resultados, optimo))
+            if contenido:
+                _guardar_salida(SALIDAS[nombre], contenido)
+
+        if input("Exportar tambien resultados.xlsx? [s/N]: ").strip().lower() in ("s", "si"):
+            try:
+                store.exportar_xlsx("resultados.xlsx", list(factories))
+                print("[OK] Reporte guardado en resultados.xlsx")
+            except Exception as e:
+                print(f"[ERROR] No se pudo exportar resultados.xlsx: {e}")
+
+
+def _opciones(argv: list[str] | None = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Menu de metaheuristicas para el problema del bombero.")
+    parser.add_argument("--exacto", action="store_true",
+                        help="agregar el optimo exacto (mapas <= 12x12) a los reportes")
+    parser.add_argument("--sin-almacen", dest="almacen", action="store_false",
+                        help="no reutilizar ni guardar corridas en resultados.sqlite")
+    parser.add_argument("--metricas", action="store_true",
+                        help="registrar metricas por tick en el resumen de cada corrida")
+    parser.add_argument("--presupuesto", type=float, default=None, metavar="SEG",
+                        help=f"presupuesto global de tiempo por corrida, repartido entre ticks "
+                             f"(el reparto queda en {PRESUPUESTOS_DIR}/)")
+    return parser.parse_args(argv)
+
+
+def main(argv: list[str] | None = None):
+    opciones = _opciones(argv)
     while True:
         print("\n=== MENU METAHEURISTICAS ===")
         print("1) Ejecutar metaheuristica ILS")
         print("2) Ejecutar metaheuristica VNS")
-        print("3) Salir")
+        print("3) Ejecutar portafolio (B&B + ILS + VNS)")
+        print("4) Exportar resultados guardados")
+        print("0) Salir")
 
         op = input("Opcion: ").strip().lower()
 
         if op == "1" or op in ("i", "ils"):
-            _ejecutar_metaheuristica("ils", IteratedLocalSearch)
+            _ejecutar_metaheuristica("ils", IteratedLocalSearch, opciones)
         elif op == "2" or op in ("v", "vns"):
-            _ejecutar_metaheuristica("vns", VariableNeighborhoodSearch)
-        elif op == "3" or op in ("s", "salir", "q", "quit"):
+            _ejecutar_metaheuristica("vns", VariableNeighborhoodSearch, opciones)
+        elif op == "3" or op in ("p", "portafolio"):
+            # las cuotas aprenden de las victorias en todas las semillas de la instancia
+            _ejecutar_metaheuristica("portafolio", functools.partial(PortfolioStrategy, historial={}), opciones)
+        elif op == "4" or op in ("e", "exportar"):
+            if opciones.almacen:
+                _exportar_resultados()
+            else:
+                print("Exportar lee el almacen: correr sin --sin-almacen.")
+        elif op == "0" or op in ("s", "salir", "q", "quit"):
             print("Adios!")
             break
         else:
@@ -1,6 +1,10 @@
 from celdas import est_celda
 from errors import InputFormatError
 
+# Cada celda se empaqueta como un byte (el caracter ASCII de su estado).
+_A_BYTE: dict[est_celda, int] = {c: ord(c.value) for c in est_celda}
+_DESDE_BYTE: dict[int, est_celda] = {v: c for c, v in _A_BYTE.items()}
+
 class Area: #Clase que maneja toda el area o grid de * + - sirve para tener todas las caracteristicas de cada uno de los caracteres
     def __init__(self, matrix: list[list[est_celda]], tick: int = 0):
         self.matrix = matrix  # matrix
@@ -60,7 +64,36 @@ class Area: #Clase que maneja toda el area o grid de * + - sirve para tener toda
 
 
     def to_lines(self) -> list[str]: #Funcion que ayuda a imprimir la matrix en el output
-        return [" ".join(cell.value for cell in row) for row in self.matrix]
+        return list(self.iter_lines())
+
+    def iter_lines(self): #igual que to_lines pero fila por fila, sin armar la lista entera
+        for row in self.matrix:
+            yield " ".join(cell.value for cell in row)
+
+    def clone(self) -> "Area": #copia independiente (las estrategias la modifican sin tocar el original)
+        return Area([row.copy() for row in self.matrix], tick=self.tick)
+
+    def restaurar_bytes(self, data: bytes, n: int, tick: int) -> None:
+        #Reemplaza el contenido en el mismo objeto (checkpoints)
+        restored = Area.from_bytes(data, n, tick=tick)
+        self.matrix = restored.matrix
+        self.tick = restored.tick
+
+    def to_bytes(self) -> bytes: #matriz empaquetada fila por fila, un byte por celda
+        return bytes(_A_BYTE[v] for row in self.matrix for v in row)
+
+    def huella(self) -> bytes: #clave del estado para memos y duplicados; en un area densa es to_bytes
+        return self.to_bytes()
+
+    @staticmethod
+    def from_bytes(data: bytes, n: int, tick: int = 0) -> "Area":
+        if len(data) != n * n:
+            raise InputFormatError(f"Se esperaban {n * n} bytes de area y llegaron {len(data)}.")
+        try:
+            matrix = [[_DESDE_BYTE[b] for b in data[i * n:(i + 1) * n]] for i in range(n)]
+        except KeyError as exc:
+            raise InputFormatError(f"Byte de celda desconocido: {exc.args[0]}.") from exc
+        return Area(matrix, tick=tick)
     
     @staticmethod
     def parse_from_lines(lines: list[str], expected_size: int | None = None) -> "Area":
@@ -0,0 +1,227 @@
+from __future__ import annotations
+
+import struct
+
+from area import Area, _A_BYTE
+from celdas import est_celda
+from errors import InputFormatError
+
+# Area dispersa para mapas enormes (10k x 10k) donde el fuego y el bombero
+# solo tocan una ventana chica. La grilla se divide en baldosas (tiles) de
+# tile x tile que se crean recien cuando alguna celda deja de estar sin
+# afectar; las que no existen son todas sn_af. Cada baldosa lleva sus conteos
+# por estado, asi positions/counts/limite recorren solo las baldosas activas.
+#
+# `matrix` es un proxy: area.matrix[i][j] lee y area.matrix[i][j] = v escribe
+# (actualizando los conteos), igual que con la lista de listas de Area, asi
+# fuego, bombero, Simulation y las estrategias funcionan sin cambios.
+# Lo que necesita la grilla entera (to_bytes, to_lines, positions(sn_af), el
+# alcance exacto del fuego en un mapa abierto) sigue costando n*n; para
+# comparar estados (memos, duplicados) esta huella(), que solo mira lo activo.
+
+TILE = 64
+_CLAVE = struct.Struct("<II")  # posicion de una baldosa en huella()
+
+
+class _Fila:
+    __slots__ = ("_area", "_i")
+
+    def __init__(self, area: "TiledArea", i: int):
+        self._area = area
+        self._i = i
+
+    def __getitem__(self, j: int) -> est_celda:
+        area = self._area
+        t = area.tile
+        tile = area._tiles.get((self._i // t, j // t))
+        if tile is None:
+            return est_celda.sn_af
+        return tile[self._i % t][j % t]
+
+    def __setitem__(self, j: int, valor: est_celda) -> None:
+        self._area._poner(self._i, j, valor)
+
+    def __len__(self) -> int:
+        return self._area.n
+
+    def __iter__(self):
+        yield from self.copy()
+
+    def copy(self) -> list[est_celda]: #fila densa
+        area = self._area
+        t = area.tile
+        ti, r = divmod(self._i, t)
+        fila: list[est_celda] = []
+        for tj in range(area.tiles_por_lado):
+            ancho = min(t, area.n - tj * t)
+            tile = area._tiles.get((ti, tj))
+            fila.extend(tile[r] if tile is not None else [est_celda.sn_af] * ancho)
+        return fila
+
+
+class _Matriz:
+    __slots__ = ("_area", "_filas")
+
+    def __init__(self, area: "TiledArea"):
+        self._area = area
+        self._filas: dict[int, _Fila] = {}
+
+    def __getitem__(self, i: int) -> _Fila:
+        fila = self._filas.get(i)
+        if fila is None:
+            if not 0 <= i < self._area.n:
+                raise IndexError(i)
+            fila = self._filas[i] = _Fila(self._area, i)
+        return fila
+
+    def __len__(self) -> int:
+        return self._area.n
+
+    def __iter__(self):
+        for i in range(self._area.n):
+            yield self[i]
+
+
+class TiledArea(Area):
+    """
+    Area n x n dispersa en baldosas de tile x tile creadas a demanda.
+    - TiledArea(n, tile): todo sin afectar.
+    - TiledArea.desde_area(area, tile): copia de un Area densa.
+    - baldosas_activas(): cuantas baldosas existen (memoria ~ activas*tile^2).
+    Mismos metodos que Area; clone() y huella() miran solo las baldosas activas.
+    """
+
+    def __init__(self, n: int, tile: int = TILE, tick: int = 0):
+        if n <= 0 or tile <= 0:
+            raise InputFormatError("El tamaño del area y de la baldosa deben ser mayores que cero.")
+        self._n = n
+        self.tile = tile
+        self.tiles_por_lado = -(-n // tile)
+        self.tick = tick
+        self._tiles: dict[tuple[int, int], list[list[est_celda]]] = {}
+        self._conteos: dict[tuple[int, int], dict[est_celda, int]] = {}
+        self.matrix = _Matriz(self)
+
+    @classmethod
+    def desde_area(cls, area: Area, tile: int = TILE) -> "TiledArea":
+        tiled = cls(area.n, tile, tick=area.tick)
+        for i, row in enumerate(area.matrix):
+            for j, v in enumerate(row):
+                if v != est_celda.sn_af:
+                    tiled._poner(i, j, v)
+        return tiled
+
+    @property
+    def n(self) -> int:
+        return self._n
+
+    def baldosas_activas(self) -> int:
+        return len(self._tiles)
+
+    def _dims(self, ti: int, tj: int) -> tuple[int, int]:
+        t = self.tile
+        return min(t, self._n - ti * t), min(t, self._n - tj * t)
+
+    def _poner(self, i: int, j: int, valor: est_celda) -> None:
+        if not (0 <= i < self._n and 0 <= j < self._n):
+            raise IndexError((i, j))
+        t = self.tile
+        clave = (i // t, j // t)
+        tile = self._tiles.get(clave)
+        if tile is None:
+            if valor == est_celda.sn_af:
+                return
+            alto, ancho = self._dims(*clave)
+            tile = self._tiles[clave] = [[est_celda.sn_af] * ancho for _ in range(alto)]
+            self._conteos[clave] = {c: 0 for c in est_celda}
+            self._conteos[clave][est_celda.sn_af] = alto * ancho
+        fila = tile[i % t]
+        viejo = fila[j % t]
+        if viejo == valor:
+            return
+        fila[j % t] = valor
+        conteo = self._conteos[clave]
+        conteo[viejo] -= 1
+        conteo[valor] += 1
+
+    def _celdas_tile(self, clave: tuple[int, int]):
+        #(i, j, estado) de una baldosa activa, en coordenadas globales
+        i0, j0 = clave[0] * self.tile, clave[1] * self.tile
+        for r, fila in enumerate(self._tiles[clave]):
+            for c, v in enumerate(fila):
+                yield i0 + r, j0 + c, v
+
+    def positions(self, state: est_celda) -> set[tuple[int, int]]:
+        if state == est_celda.sn_af:
+            return super().positions(state)  # incluye las baldosas sin crear: n*n
+        coords: set[tuple[int, int]] = set()
+        for clave, conteo in self._conteos.items():
+            if conteo[state]:
+                coords.update((i, j) for i, j, v in self._celdas_tile(clave) if v == state)
+        return coords
+
+    def counts(self) -> tuple[int, int, int]:
+        ocupadas = quemado = corta_fuego = 0
+        for conteo in self._conteos.values():
+            quemado += conteo[est_celda.fuego]
+            corta_fuego += conteo[est_celda.c_fuego]
+            ocupadas += conteo[est_celda.fuego] + conteo[est_celda.c_fuego] + conteo[est_celda.bomb]
+        return self._n * self._n - ocupadas, quemado, corta_fuego
+
+    def limite(self) -> bool:
+        #Mismo criterio que Area.limite, mirando solo baldosas activas del borde
+        n = self._n
+        ultima = self.tiles_por_lado - 1
+        walls: set[str] = set()
+        for clave, conteo in self._conteos.items():
+            if not (conteo[est_celda.c_fuego] or conteo[est_celda.bomb]):
+                continue
+            if clave[0] not in (0, ultima) and clave[1] not in (0, ultima):
+                continue
+            for i, j, v in self._celdas_tile(clave):
+                if v not in (est_celda.c_fuego, est_celda.bomb):
+                    continue
+                if i == 0:
+                    walls.add("top")
+                if i == n - 1:
+                    walls.add("bottom")
+                if j == 0:
+                    walls.add("left")
+                if j == n - 1:
+                    walls.add("right")
+                if len(walls) >= 2:
+                    return True
+        return False
+
+    def iter_lines(self):
+        for fila in self.matrix:
+            yield " ".join(cell.value for cell in fila.copy())
+
+    def to_bytes(self) -> bytes:
+        return b"".join(bytes(_A_BYTE[v] for v in fila.copy()) for fila in self.matrix)
+
+    def huella(self) -> bytes:
+        #Solo las baldosas con celdas afectadas, cada una con su posicion: no recorre n*n
+        partes: list[bytes] = []
+        for clave in sorted(self._tiles):
+            alto, ancho = self._dims(*clave)
+            if self._conteos[clave][est_celda.sn_af] == alto * ancho:
+                continue  # volvio a estar toda sin afectar: igual que no existir
+            partes.append(_CLAVE.pack(*clave))
+            partes.append(bytes(_A_BYTE[v] for fila in self._tiles[clave] for v in fila))
+        return b"".join(partes)
+
+    def clone(self) -> "TiledArea":
+        copia = TiledArea(self._n, self.tile, tick=self.tick)
+        copia._tiles = {k: [fila.copy() for fila in tile] for k, tile in self._tiles.items()}
+        copia._conteos = {k: dict(conteo) for k, conteo in self._conteos.items()}
+        return copia
+
+    def restaurar_bytes(self, data: bytes, n: int, tick: int) -> None:
+        restored = TiledArea.desde_area(Area.from_bytes(data, n, tick=tick), self.tile)
+        self._n = n
+        self.tiles_por_lado = restored.tiles_por_lado
+        self._tiles = restored._tiles
+        self._conteos = restored._conteos
+        self.matrix = _Matriz(self)
+        self.tick = tick
@@ -0,0 +1,262 @@
+from __future__ import annotations
+
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from area import Area
+from branch_and_bound import BranchAndBound, SearchNode
+from celdas import est_celda
+from memoria_compartida import RecursosCompartidos, adjuntar_cacheada
+
+# Estrategia de busqueda en haz (beam search) para mapas grandes.
+# Reutiliza la transicion y el rollout de BranchAndBound, pero en vez de una
+# cola sin limite conserva solo los `width` mejores nodos de cada capa, asi
+# la memoria queda acotada por width x depth y se puede mirar 20+ ticks.
+
+_worker: "BeamSearch | None" = None
+
+# Un nodo viaja a los workers como (slot, metadatos): el area va en un slot
+# de memoria compartida. Los hijos vuelven con el area empaquetada en bytes.
+Meta = tuple[float, int, float, float, tuple[int, int], list[tuple[int, int]], list[tuple[int, int]], tuple[int, int, int]]
+
+
+def _meta(node: SearchNode) -> Meta:
+    return (node.priority, node.depth, node.bnb_cost, node.score, node.pos,
+            sorted(node.forbidden), node.path, node.counts)
+
+
+def _nodo(meta: Meta, area: Area) -> SearchNode:
+    priority, depth, bnb_cost, score, pos, forbidden, path, counts = meta
+    return SearchNode(
+        priority=priority, depth=depth, bnb_cost=bnb_cost, score=score, pos=pos,
+        area=area, forbidden=set(forbidden), path=path, counts=counts,
+    )
+
+
+def _empacar(node: SearchNode) -> tuple[Meta, bytes, int]:
+    return _meta(node), node.area.to_bytes(), node.area.tick
+
+
+def _init_worker(params: dict[str, object], contexto=None) -> None:
+    #El worker usa los mismos parametros que el principal (orden y hojas iguales)
+    global _worker
+    _worker = BeamSearch(workers=1, **params)
+    _worker.usar_contexto(contexto)
+
+
+def _leer_lote(nombre: str, entradas: list[tuple[int, Meta]]) -> list[SearchNode]:
+    compartida = adjuntar_cacheada(nombre)
+    return [_nodo(meta, compartida.leer(slot)) for slot, meta in entradas]
+
+
+def _expandir_lote(
+    nombre: str,
+    entradas: list[tuple[int, Meta]],
+    width: int,
+) -> tuple[list[tuple[Meta, bytes, int]], list[tuple[Meta, bytes, int]], int]:
+    children, leaves, created = _worker._expandir(_leer_lote(nombre, entradas), width)
+    return [_empacar(c) for c in children], [_empacar(c) for c in leaves], created
+
+
+def _rollout_lote(nombre: str, entradas: list[tuple[int, Meta]]) -> list[tuple[float, float, tuple[int, int, int], bool]]:
+    return [_worker._evaluar_hoja(node) for node in _leer_lote(nombre, entradas)]
+
+
+class BeamSearch(RecursosCompartidos, BranchAndBound):
+    """
+    Busqueda en haz sobre el mismo modelo de transiciones que B&B:
+    - Cada capa expande todos los nodos del haz con _simulate_transition.
+    - Se quedan los `width` hijos con menor quemadas + 0.3 * frente (los
+      estados repetidos se descartan).
+    - Nodos sin movimientos o con el fuego detenido se evaluan como hojas.
+    - Al llegar a `depth` (o al limite de tiempo) cada nodo del haz se
+      puntua con el rollout pasivo y se devuelve el primer paso del mejor.
+    Con workers > 1 cada capa se reparte en lotes entre procesos.
+    """
+
+    def __init__(
+        self,
+        width: int = 8,
+        depth: int = 20,
+        time_limit: float = 5,
+        workers: int = 1,
+        frontier_weight: float = 0.3,
+    ):
+        super().__init__(lookahead=depth, time_limit=time_limit)
+        self.width = width
+        self.depth = depth
+        self.workers = workers
+        self.frontier_weight = frontier_weight
+
+    def _rank_key(self, node: SearchNode) -> tuple[float, float]:
+        return (node.bnb_cost + self.frontier_weight * len(node.forbidden), node.score)
+
+    def _expandir(self, nodes: list[SearchNode], width: int) -> tuple[list[SearchNode], list[SearchNode], int]:
+        """
+        Expande un lote y devuelve (mejores hijos del lote, hojas, nodos creados).
+        Basta con el top-width local: cualquier hijo del top global lo esta.
+        """
+        children: list[SearchNode] = []
+        leaves: list[SearchNode] = []
+        seen: set[tuple[tuple[int, int], bytes]] = set()
+        created = 0
+        for node in nodes:
+            if self._cancelado():
+                break  # la capa queda con lo expandido hasta ahora
+            moves = self._valid_moves(node)
+            if not moves:
+                leaves.append(node)
+                continue
+            for mv in moves:
+                child = self._simulate_transition(node, mv)
+                if child is None:
+                    continue
+                created += 1
+                if not child.forbidden:
+                    leaves.append(child)
+                    continue
+                key = (child.pos, child.area.huella())
+                if key in seen:
+                    continue
+                seen.add(key)
+                children.append(child)
+        children.sort(key=self._rank_key)
+        return children[:width], leaves, created
+
+    def _evaluar_hoja(self, node: SearchNode) -> tuple[float, float, tuple[int, int, int], bool]:
+        rollout_area = self._rollout_stay_until_stable(node.area)
+        counts = rollout_area.counts()
+        return self._bnb_cost(counts, node.depth), self._score(counts, node.depth), counts, rollout_area.limite()
+
+    def _lotes(self, nodes: list[SearchNode]) -> tuple[str, list[list[tuple[int, Meta]]]]:
+        """
+        Escribe las areas de los nodos en slots de memoria compartida (el
+        segmento crece si hacen falta mas slots) y los reparte en lotes.
+        """
+        compartida = self._reservar_compartida(nodes[0].area.n, len(nodes), reserva=2 * self.width)
+        entradas = []
+        for slot, node in enumerate(nodes):
+            compartida.escribir(node.area, slot)
+            entradas.append((slot, _meta(node)))
+        size = max(1, -(-len(entradas) // self.workers))
+        return compartida.nombre, [entradas[k:k + size] for k in range(0, len(entradas), size)]
+
+    def _crear_pool(self) -> ProcessPoolExecutor:
+        params = {"width": self.width, "depth": self.depth, "frontier_weight": self.frontier_weight}
+        return ProcessPoolExecutor(
+            max_workers=self.workers, initializer=_init_worker, initargs=(params, self._contexto),
+        )
+
+    def _expandir_capa(self, beam: list[SearchNode]) -> tuple[list[SearchNode], list[SearchNode], int]:
+        if self.workers <= 1 or len(beam) < 2:
+            return self._expandir(beam, self.width)
+        pool = self._get_pool()
+        nombre, lotes = self._lotes(beam)
+        futures = [pool.submit(_expandir_lote, nombre, lote, self.width) for lote in lotes]
+        children: list[SearchNode] = []
+        leaves: list[SearchNode] = []
+        created = 0
+        seen: set[tuple[tuple[int, int], bytes]] = set()
+        n = beam[0].area.n
+        for fut in futures:
+            lote_children, lote_leaves, lote_created = fut.result()
+            leaves.extend(_nodo(meta, Area.from_bytes(data, n, tick=tick)) for meta, data, tick in lote_leaves)
+            created += lote_created
+            for meta, data, tick in lote_children:
+                key = (meta[4], data)
+                if key not in seen:
+                    seen.add(key)
+                    children.append(_nodo(meta, Area.from_bytes(data, n, tick=tick)))
+        children.sort(key=self._rank_key)
+        return children[:self.width], leaves, created
+
+    def _evaluar_hojas(self, nodes: list[SearchNode]) -> list[tuple[float, float, tuple[int, int, int], bool]]:
+        if self.workers <= 1 or len(nodes) < 2:
+            return [self._evaluar_hoja(node) for node in nodes]
+        pool = self._get_pool()
+        nombre, lotes = self._lotes(nodes)
+        futures = [pool.submit(_rollout_lote, nombre, lote) for lote in lotes]
+        results: list[tuple[float, float, tuple[int, int, int], bool]] = []
+        for fut in futures:
+            results.extend(fut.result())
+        return results
+
+    def siguiente_paso(
+        self,
+        i: int,
+        j: int,
+        area: Area,
+        forbidden: set[tuple[int, int]],
+    ) -> tuple[int, int]:
+        start = time.perf_counter()
+
+        root_area = self._clone_area(area)
+        if root_area.matrix[i][j] == est_celda.bomb:
+            root_area.matrix[i][j] = est_celda.c_fuego
+        root_counts = root_area.counts()
+        root_cost = self._bnb_cost(root_counts, depth=0)
+        root = SearchNode(
+            priority=self._bound(root_cost),
+            depth=0,
+            bnb_cost=root_cost,
+            score=self._score(root_counts, depth=0),
+            pos=(i, j),
+            area=root_area,
+            forbidden=set(forbidden),
+            path=[],
+            counts=root_counts,
+        )
+
+        beam: list[SearchNode] = [root]
+        leaves: list[SearchNode] = []
+        nodes_expanded = 0
+        depth_reached = 0
+        status = "ok"
+        for _ in range(self.depth):
+            if (time.perf_counter() - start) >= self.time_limit:
+                status = "time_limit"
+                break
+            if self._cancelado():
+                status = "cancelado"
+                break
+            beam, layer_leaves, created = self._expandir_capa(beam)
+            nodes_expanded += created
+            leaves.extend(node for node in layer_leaves if node.depth > 0)
+            if not beam:
+                break
+            depth_reached = beam[0].depth
+
+        candidates = [node for node in beam if node.depth > 0] + leaves
+        best: tuple[float, float, tuple[int, int, int], bool, SearchNode] | None = None
+        for node, (cost, score, counts, cerrado) in zip(candidates, self._evaluar_hojas(candidates)):
+            if best is None or (cost, score) < (best[0], best[1]):
+                best = (cost, score, counts, cerrado, node)
+
+        elapsed = time.perf_counter() - start
+        self.total_nodes += nodes_expanded
+        self.total_time += elapsed
+
+        if best is None:
+            best = (root_cost, root.score, root_counts, root_area.limite(), root)
+        cost, score, counts, cerrado, best_node = best
+        self._last_report = {
+            "nodes": nodes_expanded,
+            "status": status,
+            "elapsed_sec": elapsed,
+            "instants": best_node.depth,
+            "depth_reached": depth_reached,
+            "width": self.width,
+            "counts": {
+                "sin_afectar": counts[0],
+                "quemadas": counts[1],
+                "cortafuegos": counts[2],
+            },
+            "cerrado": cerrado,
+        }
+
+        if best_node.path:
+            return best_node.path[0]
+        fallback_moves = self._valid_moves(root)
+        if fallback_moves:
+            return fallback_moves[0]
+        return i, j
@@ -0,0 +1,180 @@
+from __future__ import annotations
+
+import random
+
+from area import Area
+from celdas import NEIS8, est_celda
+
+# Grillas empaquetadas como bits de un entero de Python (bitboards).
+# Varias grillas n x n del mismo tamaño se apilan en un solo entero, asi una
+# operacion &, |, << avanza todas a la vez (el entero grande hace de arreglo).
+#
+# Disposicion: cada fila ocupa ancho = n + 1 bits (la columna extra es una
+# guarda siempre en 0) y cada grilla ocupa n filas + 1 fila de guarda,
+# redondeado a bytes. Un desplazamiento de una celda en cualquiera de las 8
+# direcciones nunca pasa de una celda real a otra de otra fila o grilla:
+# siempre cae en una guarda, que se limpia con la mascara de celdas reales.
+
+
+class BitGrid:
+    """
+    Geometria de `miembros` grillas n x n apiladas en un entero.
+    El bit de la celda (i, j) de la grilla k es k * bloque + i * ancho + j.
+    """
+
+    def __init__(self, n: int, miembros: int):
+        if n <= 0 or miembros <= 0:
+            raise ValueError("n y miembros deben ser mayores que cero.")
+        self.n = n
+        self.miembros = miembros
+        self.ancho = n + 1
+        self.bloque = -(-(n + 1) * self.ancho // 8) * 8
+        self.bytes_bloque = self.bloque // 8
+        fila = (1 << n) - 1
+        self.mascara_miembro = sum(fila << (r * self.ancho) for r in range(n))
+        # repunit en base 2**bloque: replica un patron en cada grilla
+        self._repetir = ((1 << (miembros * self.bloque)) - 1) // ((1 << self.bloque) - 1)
+        self.mascara = self.mascara_miembro * self._repetir
+
+    def indice(self, k: int, i: int, j: int) -> int:
+        return k * self.bloque + i * self.ancho + j
+
+    def replicar(self, patron: int) -> int: #copia un patron de una grilla en todas
+        return patron * self._repetir
+
+    def mascara_de(self, miembros: list[int]) -> int: #mascara de celdas reales de esas grillas
+        return sum(self.mascara_miembro << (k * self.bloque) for k in miembros)
+
+    def desplazar(self, x: int, di: int, dj: int) -> int:
+        #Mueve cada bit (i, j) a (i + di, j + dj); lo que cae fuera queda en guardas
+        s = di * self.ancho + dj
+        return x << s if s >= 0 else x >> -s
+
+    def de_indices(self, indices) -> int: #entero con los bits indicados en 1
+        buf = bytearray(self.miembros * self.bytes_bloque)
+        for idx in indices:
+            buf[idx >> 3] |= 1 << (idx & 7)
+        return int.from_bytes(buf, "little")
+
+    def _bytes(self, x: int) -> bytes:
+        return (x & self.mascara).to_bytes(self.miembros * self.bytes_bloque, "little")
+
+    def bits_en(self, x: int, indices: list[int]) -> list[bool]: #lee varios bits de una sola pasada
+        data = self._bytes(x)
+        return [bool(data[idx >> 3] >> (idx & 7) & 1) for idx in indices]
+
+    def por_miembro(self, x: int) -> list[int]: #separa el entero en una grilla por miembro
+        data = self._bytes(x)
+        b = self.bytes_bloque
+        return [int.from_bytes(data[k * b:(k + 1) * b], "little") for k in range(self.miembros)]
+
+    def no_vacios(self, x: int) -> list[bool]:
+        data = self._bytes(x)
+        b = self.bytes_bloque
+        return [any(data[k * b:(k + 1) * b]) for k in range(self.miembros)]
+
+    def conteos(self, x: int) -> list[int]:
+        return [g.bit_count() for g in self.por_miembro(x)]
+
+    def celdas(self, grilla: int) -> set[tuple[int, int]]: #coordenadas de una grilla ya separada
+        coords: set[tuple[int, int]] = set()
+        while grilla:
+            low = grilla & -grilla
+            idx = low.bit_length() - 1
+            coords.add(divmod(idx, self.ancho))
+            grilla ^= low
+        return coords
+
+    def planos(self, areas: list[Area]) -> dict[est_celda, int]:
+        """
+        Empaqueta las areas (todas n x n, una por miembro) en un entero por estado.
+        """
+        if len(areas) != self.miembros:
+            raise ValueError(f"Se esperaban {self.miembros} areas y llegaron {len(areas)}.")
+        bufs = {estado: bytearray(self.miembros * self.bytes_bloque) for estado in est_celda}
+        for k, area in enumerate(areas):
+            if area.n != self.n:
+                raise ValueError(f"El area {k} es de {area.n}x{area.n} y se esperaba {self.n}x{self.n}.")
+            base = k * self.bloque
+            for i, row in enumerate(area.matrix):
+                fila = base + i * self.ancho
+                for j, v in enumerate(row):
+                    idx = fila + j
+                    bufs[v][idx >> 3] |= 1 << (idx & 7)
+        return {estado: int.from_bytes(buf, "little") for estado, buf in bufs.items()}
+
+    def area(self, planos: dict[est_celda, int], k: int, tick: int = 0) -> Area:
+        #Reconstruye el Area del miembro k (las celdas sin plano quedan sin afectar)
+        matrix = [[est_celda.sn_af] * self.n for _ in range(self.n)]
+        for estado, x in planos.items():
+            if estado == est_celda.sn_af:
+                continue
+            for i, j in self.celdas((x >> (k * self.bloque)) & self.mascara_miembro):
+                matrix[i][j] = estado
+        return Area(matrix, tick=tick)
+
+    def aleatorio(self, rng: random.Random, p: float, bits: int = 16) -> int:
+        """
+        Mascara con cada celda real en 1 con probabilidad p (redondeada a
+        `bits` bits binarios). Recorre la expansion binaria de p desde el bit
+        menos significativo: un 1 hace OR con bits al azar y un 0 hace AND,
+        asi bastan `bits` llamadas a getrandbits para todas las grillas.
+        """
+        if p >= 1:
+            return self.mascara
+        k = round(p * (1 << bits))
+        if k <= 0:
+            return 0
+        total = self.miembros * self.bloque
+        x = 0
+        for b in range(bits):
+            if k >> b & 1:
+                x |= rng.getrandbits(total)
+            elif x:
+                x &= rng.getrandbits(total)
+        return x & self.mascara
+
+    def bloqueo_diagonal(self, corta: int) -> dict[tuple[int, int], int]:
+        """
+        Para cada diagonal (di, dj), celdas destino a las que el fuego NO puede
+        llegar en esa direccion porque una de las esquinas es cortafuego.
+        """
+        return {
+            (di, dj): self.desplazar(corta, di, 0) | self.desplazar(corta, 0, dj)
+            for di, dj in NEIS8 if di and dj
+        }
+
+    def propagar(
+        self,
+        fuego: int,
+        corta: int,
+        libre: int,
+        tasa: int = 1,
+        mascaras: list[int] | None = None,
+    ) -> int:
+        """
+        Equivalente a fuego.a_quemar para todas las grillas: celdas de `libre`
+        que se queman en el proximo tick. Las diagonales se bloquean si alguna
+        esquina es cortafuego, igual que en comp_fuego. Con `mascaras` (una
+        por salto, ver aleatorio) solo prenden las candidatas que caen en la
+        mascara del salto: es la version estocastica de fuego.muestrear.
+        """
+        bloqueo = self.bloqueo_diagonal(corta)
+        quemando = fuego
+        nuevas = 0
+        for salto in range(max(1, tasa)):
+            alcance = 0
+            for di, dj in NEIS8:
+                paso = self.desplazar(quemando, di, dj)
+                if di and dj:
+                    paso &= ~bloqueo[(di, dj)]
+                alcance |= paso
+            agregadas = alcance & libre & ~nuevas
+            if mascaras is not None:
+                # en modo estocastico un salto sin igniciones no corta los siguientes
+                agregadas &= mascaras[salto]
+            elif not agregadas:
+                break
+            nuevas |= agregadas
+            quemando |= agregadas
+        return nuevas
@@ -1,22 +1,14 @@
 from __future__ import annotations
 
-import heapq
 import time
 from dataclasses import dataclass, field
 
 from strategy import strategy_bombero
 from area import Area
-from celdas import est_celda
+from celdas import MOVES, est_celda
 from comp_fuego import fuego
-
-# Movimientos en 8 direcciones.
-NEIS8: list[tuple[int, int]] = [
-    (-1, -1), (-1, 0), (-1, 1),
-    (0, -1),            (0, 1),
-    (1, -1),  (1, 0),  (1, 1),
-]
-# Permite quedarse quieto (primer elemento) o moverse en las 8 direcciones.
-MOVES: list[tuple[int, int]] = [(0, 0)] + NEIS8
+from eventos import rollout_quieto
+from cola_acotada import MODES as QUEUE_MODES, BoundedQueue
 
 
 @dataclass(order=True)
@@ -40,8 +32,13 @@ class BranchAndBound(strategy_bombero):
     - Se expande primero lo prometedor y se poda cuando la cota >= mejor sol
     - En hojas o al agotar lookahead se usa un rollout pesimista (dejar quieto)
       para comparar soluciones por quemadas totales estimadas.
+    - Con max_open_nodes / max_open_mb la cola abierta queda acotada: los
+      peores nodos se descartan (overflow="drop", status "queue_cap") o se
+      bajan a disco (overflow="spill", la busqueda sigue siendo exacta).
     """
 
+    _estado_campos = ("total_nodes", "total_time", "_last_report", "total_dominados")
+
     def __init__(
         self,
         lookahead: int = 5,
@@ -49,12 +46,18 @@ class BranchAndBound(strategy_bombero):
         time_limit: float = 5,
         trace_enabled: bool = False,
         trace_limit: int | None = None,
+        max_open_nodes: int | None = None,
+        max_open_mb: float | None = None,
+        overflow: str = "drop",
     ):
+        if overflow not in QUEUE_MODES:
+            raise ValueError(f"Modo de desborde desconocido '{overflow}'. Opciones: {QUEUE_MODES}.")
         self.lookahead = lookahead #lookhead son los avances hacia el futuro que hace
         self.node_limit = node_limit
         self.time_limit = time_limit
         self._fire = fuego(tasa_crecimiento=1)
         self.total_nodes = 0
+        self.total_dominados = 0  # rollouts de hojas cortados por la cota
         self.total_time = 0.0
         self._last_report: dict[str, object] = {}
         self.trace_enabled = trace_enabled
@@ -62,10 +65,14 @@ class BranchAndBound(strategy_bombero):
         self._last_trace: list[dict[str, object]] = []
         self._trace_truncated = False
         self._trace_history: list[tuple[list[dict[str, object]], bool]] = []
-
+        # Tope de la lista abierta (nodos o MB aproximados); overflow decide si
+        # los peores nodos se descartan ("drop") o se bajan a disco ("spill").
+        self.max_open_nodes = max_open_nodes
+        self.max_open_mb = max_open_mb
+        self.overflow = overflow
 
     def _clone_area(self, area: Area) -> Area: #copia de area solamente
-        return Area([row.copy() for row in area.matrix], tick=area.tick)
+        return area.clone()
 
     def _trace_event(self, kind: str, node: SearchNode, **extra: object) -> None:
         # Guarda una linea de traza si la opcion esta activada.
@@ -98,15 +105,33 @@ class BranchAndBound(strategy_bombero):
     def _bound(self, bnb_cost: float) -> float: 
         return bnb_cost
 
-    def _rollout_stay_until_stable(self, area: Area) -> Area: #analiza el costo de no hacer nada
-        area_copy = self._clone_area(area)
-        while True:
-            to_burn = self._fire.a_quemar(area_copy)
-            if not to_burn:
-                break
-            self._fire.aplicar(area_copy, to_burn)
-            area_copy.tick += 1
-        return area_copy
+    def _open_limit(self, n: int, frente: int) -> int | None:
+        """
+        Tope de la cola abierta en nodos. max_open_mb se convierte con los
+        bytes de un nodo medidos con tracemalloc (n = 10..100):
+        - grilla: 8 bytes por celda (referencia en la fila) y 64 por fila
+          (cabecera de la lista y su referencia en la matriz);
+        - ~640 fijos: SearchNode, Area, path y counts;
+        - ~120 por celda de forbidden (tupla + entrada del set), estimado con
+          el frente de la raiz.
+        """
+        limits: list[int] = []
+        if self.max_open_nodes is not None:
+            limits.append(self.max_open_nodes)
+        if self.max_open_mb is not None:
+            node_bytes = n * n * 8 + n * 64 + 640 + 120 * frente
+            limits.append(max(1, int(self.max_open_mb * 1024 * 1024 / node_bytes)))
+        return min(limits) if limits else None
+
+    def _rollout_stay_until_stable(self, area: Area, cota: float | None = None) -> Area | None: #analiza el costo de no hacer nada
+        #Con cota devuelve None si las quemadas la superan (la hoja no puede ganar)
+        if self._contexto is not None:
+            final = self._contexto.rollout(area, cota)
+        else:
+            final = rollout_quieto(area, self._fire.tasa_crecimiento, cota)
+        if final is None:
+            self.total_dominados += 1
+        return final
 
     def _valid_moves(self, node: SearchNode) -> list[tuple[int, int]]: #maneja los movimientos validos
         ci, cj = node.pos
@@ -196,91 +221,122 @@ class BranchAndBound(strategy_bombero):
             counts=root_counts,
         )
 
-        queue: list[SearchNode] = [root]
+        queue = BoundedQueue(self._open_limit(area.n, len(forbidden)), mode=self.overflow)
+        queue.push(root)
         best_node: SearchNode | None = None
         best_cost = float("inf")
         nodes_expanded = 0
         status = "no_move"
+        podado_externo = False
         self._trace_event("root", root)
 
-        while queue:
-            # bucle principal de B&B saca el mejor nodo, poda y expande 
-            now = time.perf_counter()
-            if (now - start) >= self.time_limit:
-                status = "time_limit"
-                break
-            if nodes_expanded >= self.node_limit:
-                status = "node_limit"
-                break
-
-            node = heapq.heappop(queue)
-            self._trace_event("expand", node, queue_size=len(queue) + 1, best_cost=best_cost)
-            if node.priority >= best_cost:
-                # poda por cota
-                self._trace_event("prune", node, reason="bound", best_cost=best_cost)
-                continue
-
-            moves = self._valid_moves(node)
-
-            if node.depth >= self.lookahead or not moves:
-                # rollout estimamos costo final si el bombero se queda quieto, esto para cuando no se pudiera mover mas
-                rollout_area = self._rollout_stay_until_stable(node.area)
-                rollout_counts = rollout_area.counts()
-                rollout_cost = self._bnb_cost(rollout_counts, node.depth)
-                rollout_score = self._score(rollout_counts, node.depth)
-                self._trace_event(
-                    "leaf",
-                    node,
-                    rollout_cost=rollout_cost,
-                    rollout_score=rollout_score,
-                    best_cost=best_cost,
-                    moves=len(moves),
-                )
-
-                # evitamos elegir la raiz si aun hay movimientos posibles
-                if not (node.depth == 0 and moves):
-                    if (rollout_cost < best_cost or
-                        (rollout_cost == best_cost and
-                         best_node is not None and
-                         rollout_score < best_node.score)):
-                        best_cost = rollout_cost
-                        best_node = SearchNode(
-                            priority=rollout_cost,
-                            depth=node.depth,
-                            bnb_cost=rollout_cost,
-                            score=rollout_score,
-                            pos=node.pos,
-                            area=rollout_area,
-                            forbidden=node.forbidden,
-                            path=node.path,
-                            counts=rollout_counts,
-                        )
-                        status = "ok"
-                        self._trace_event("best", best_node, best_cost=best_cost, status=status)
-                continue
-
-            for mv in moves: #Continua simulando los pasos futuros para logra establecer nuevamente la cola de prioridad
-                child = self._simulate_transition(node, mv)
-                if child is None:
+        try:
+            while queue:
+                # bucle principal de B&B saca el mejor nodo, poda y expande 
+                now = time.perf_counter()
+                if (now - start) >= self.time_limit:
+                    status = "time_limit"
+                    break
+                if nodes_expanded >= self.node_limit:
+                    status = "node_limit"
+                    break
+                if self._cancelado():
+                    status = "cancelado"
+                    break
+
+                node = queue.pop()
+                self._trace_event("expand", node, queue_size=len(queue) + 1, best_cost=best_cost)
+                if node.priority >= best_cost:
+                    # poda por cota
+                    self._trace_event("prune", node, reason="bound", best_cost=best_cost)
+                    continue
+                if self._cota_externa is not None and node.priority >= self._cota_externa():
+                    # otra busqueda ya tiene un plan al menos igual de bueno
+                    podado_externo = True
+                    self._trace_event("prune", node, reason="external", best_cost=best_cost)
                     continue
-                nodes_expanded += 1
-                if child.priority >= best_cost:
+
+                moves = self._valid_moves(node)
+
+                if node.depth >= self.lookahead or not moves:
+                    # rollout estimamos costo final si el bombero se queda quieto, esto para cuando no se pudiera mover mas
+                    # la raiz no compite si hay movimientos: su rollout va sin cota (solo traza)
+                    cota = None
+                    if not (node.depth == 0 and moves):
+                        cota = self._cota(best_cost)
+                    rollout_area = self._rollout_stay_until_stable(node.area, cota)
+                    if rollout_area is None:
+                        # quema mas que el incumbente: la hoja no puede ganar
+                        if best_node is None:
+                            podado_externo = True
+                        self._trace_event("prune", node, reason="rollout", best_cost=best_cost)
+                        continue
+                    rollout_counts = rollout_area.counts()
+                    rollout_cost = self._bnb_cost(rollout_counts, node.depth)
+                    rollout_score = self._score(rollout_counts, node.depth)
                     self._trace_event(
-                        "prune_child",
-                        child,
-                        reason="bound",
+                        "leaf",
+                        node,
+                        rollout_cost=rollout_cost,
+                        rollout_score=rollout_score,
                         best_cost=best_cost,
-                        parent=node.pos,
+                        moves=len(moves),
                     )
+
+                    # evitamos elegir la raiz si aun hay movimientos posibles
+                    if not (node.depth == 0 and moves):
+                        if (rollout_cost < best_cost or
+                            (rollout_cost == best_cost and
+                             best_node is not None and
+                             rollout_score < best_node.score)):
+                            best_cost = rollout_cost
+                            best_node = SearchNode(
+                                priority=rollout_cost,
+                                depth=node.depth,
+                                bnb_cost=rollout_cost,
+                                score=rollout_score,
+                                pos=node.pos,
+                                area=rollout_area,
+                                forbidden=node.forbidden,
+                                path=node.path,
+                                counts=rollout_counts,
+                            )
+                            status = "ok"
+                            self._trace_event("best", best_node, best_cost=best_cost, status=status)
+                            self._avisar({"tick": area.tick, "nodos": nodes_expanded, "mejor_costo": best_cost})
                     continue
-                heapq.heappush(queue, child)
-                self._trace_event("enqueue", child, parent=node.pos)
+
+                for mv in moves: #Continua simulando los pasos futuros para logra establecer nuevamente la cola de prioridad
+                    child = self._simulate_transition(node, mv)
+                    if child is None:
+                        continue
+                    nodes_expanded += 1
+                    if child.priority >= best_cost:
+                        self._trace_event(
+                            "prune_child",
+                            child,
+                            reason="bound",
+                            best_cost=best_cost,
+                            parent=node.pos,
+                        )
+                        continue
+                    queue.push(child)
+                    self._trace_event("enqueue", child, parent=node.pos)
+        finally:
+            # tambien ante errores o Ctrl+C: borra el archivo de desborde (spill)
+            queue.close()
+        if queue.dropped and status == "ok":
+            # Se descartaron nodos por memoria: la solucion ya no es optima garantizada.
+            status = "queue_cap"
 
         elapsed = time.perf_counter() - start #Finaliza el conteo de tiempo
         self.total_nodes += nodes_expanded
         self.total_time += elapsed
 
+        mejor_costo = best_cost if best_node is not None else None
         if best_node is None:
+            if podado_externo and status == "no_move":
+                status = "dominado"  # las cuentas de la raiz no son un costo final
             best_node = root
             best_cost = root_bnb_cost
 
@@ -295,6 +351,10 @@ class BranchAndBound(strategy_bombero):
             "cortafuegos": best_node.counts[2],
             },
             "cerrado": best_node.area.limite(),
+            "mejor_costo": mejor_costo,
+            "open_peak": queue.peak,
+            "open_dropped": queue.dropped,
+            "open_spilled": queue.spilled,
         }
 
         if self.trace_enabled:
@@ -418,26 +478,9 @@ class BranchAndBound(strategy_bombero):
         wall_time: float | None = None,
     ) -> dict[str, object]:
         #resumen acumulado para reportes o guardado
-        libres = quemadas = cortafuegos = None
-        if area is not None:
-            libres, quemadas, cortafuegos = area.counts()
-
-        instantes = None
-        cerrado = None
-        if area is not None:
-            instantes = area.tick
-            cerrado = area.limite()
-
         return {
-            "nodes": self.total_nodes,
-            "estrategia": self._last_report.get("status", "sin_busqueda"),
-            "tiempo_busqueda_sec": self.total_time,
-            "tiempo_total_sec": wall_time,
-            "instantes": instantes,
-            "sin_afectar": libres,
-            "quemadas": quemadas,
-            "cortafuegos": cortafuegos,
-            "cerrado": cerrado,
+            **self._resumen(self.total_nodes, area, wall_time),
+            "rollouts_dominados": self.total_dominados,
         }
 
 
@@ -0,0 +1,58 @@
+from __future__ import annotations
+
+import time
+from typing import Callable
+
+# Cancelacion cooperativa y avisos de progreso para corridas largas.
+# Simulation revisa el token entre ticks y las estrategias una vez por
+# evaluacion o expansion de nodo; al cancelarse, la estrategia devuelve el
+# mejor movimiento que tenga (como con time_limit) y la simulacion se detiene
+# al terminar ese tick, asi el area queda consistente para un reporte
+# "Parcial" (servicio.py llama a writer.guardar_report con finished=False
+# si el trabajo pide "reporte").
+#
+# La fuente externa (p. ej. Event.is_set de un Manager, que cruza procesos)
+# puede ser cara, por eso se consulta como mucho cada `cada` llamadas y cada
+# `intervalo` segundos; cancelar() local se ve de inmediato.
+
+Progreso = Callable[[dict], None]
+
+
+class CancelToken:
+    """
+    - cancelar(): cancela desde el mismo proceso.
+    - cancelado(forzar=False): True si se cancelo; forzar consulta la fuente
+      externa sin esperar el intervalo (entre ticks).
+    """
+
+    def __init__(
+        self,
+        fuente: Callable[[], bool] | None = None,
+        cada: int = 8,
+        intervalo: float = 0.01,
+    ):
+        self.fuente = fuente
+        self.cada = max(1, cada)
+        self.intervalo = intervalo
+        self._cancelado = False
+        self._llamadas = 0
+        self._ultima = 0.0
+
+    def cancelar(self) -> None:
+        self._cancelado = True
+
+    def cancelado(self, forzar: bool = False) -> bool:
+        if self._cancelado:
+            return True
+        if self.fuente is None:
+            return False
+        self._llamadas += 1
+        if not forzar:
+            if self._llamadas % self.cada:
+                return False
+            if time.monotonic() - self._ultima < self.intervalo:
+                return False
+        self._ultima = time.monotonic()
+        if self.fuente():
+            self._cancelado = True
+        return self._cancelado
@@ -0,0 +1,90 @@
+from __future__ import annotations
+
+from area import Area
+from celdas import MOVES, est_celda
+from comp_fuego import SIN_LLEGADA, fuego
+
+# Holgura de una celda a la que el fuego nunca llega: cualquier celda del
+# camino del fuego va antes, pero sigue por delante de las invalidas (inf).
+HOLGURA_SIN_LLEGADA = 1e6
+# Quedarse no pone cortafuego nuevo. Sobre una celda libre va justo detras de
+# moverse a una celda con su misma holgura; sobre una celda ya ocupada
+# (cortafuego o bombero) vale como una holgura de 2.5: detras de los destinos
+# que el fuego alcanza en 1-2 ticks y antes del resto.
+PENALIZA_QUEDARSE = 0.5
+HOLGURA_QUEDARSE_OCUPADA = 2.5
+
+
+class CandidateLists:
+    """
+    Listas de candidatos para los vecindarios de ILS/VNS.
+    Para cada indice t del plan ordena los 9 MOVES segun la holgura de la
+    celda destino: llegada del fuego - t. Un cortafuego solo sirve si se pone
+    antes de que llegue el fuego (holgura > 0) y sirve mas cuanto mas cerca
+    del frente esta. Celdas fuera del mapa, ya ocupadas o quemadas antes de
+    llegar quedan al final. Se devuelven los primeros `width` movimientos.
+    Las llegadas se calculan una vez por tick con el fuego sin intervencion.
+    """
+
+    def __init__(
+        self,
+        area: Area,
+        pos: tuple[int, int],
+        width: int,
+        llegada: list[list[int]] | None = None,
+    ):
+        self.width = max(1, min(width, len(MOVES)))
+        self.pos = pos
+        self._area = area
+        self._llegada = llegada if llegada is not None else fuego().tiempos_llegada(area)
+        self._plan: tuple[tuple[int, int], ...] | None = None
+        self._pos_plan: list[tuple[int, int]] = []
+
+    def _holgura(self, cell: tuple[int, int], t: int) -> float:
+        i, j = cell
+        if not self._area.dentro(i, j) or self._area.matrix[i][j] != est_celda.sn_af:
+            return float("inf")
+        llegada = self._llegada[i][j]
+        if llegada <= t:
+            return float("inf")  # se quema antes de poder protegerla
+        if llegada == SIN_LLEGADA:
+            return HOLGURA_SIN_LLEGADA  # nunca se quema: no aporta, pero sigue siendo valido
+        return float(llegada - t)
+
+    def _posiciones(self, plan: list[tuple[int, int]]) -> list[tuple[int, int]]:
+        #Posicion del bombero antes de cada indice del plan (aproximada con las llegadas)
+        posiciones: list[tuple[int, int]] = []
+        ci, cj = self.pos
+        for t, (di, dj) in enumerate(plan):
+            posiciones.append((ci, cj))
+            ni, nj = ci + di, cj + dj
+            if (di, dj) != (0, 0) and self._holgura((ni, nj), t) != float("inf"):
+                ci, cj = ni, nj
+        return posiciones
+
+    def ranking(self, pos: tuple[int, int], t: int) -> list[tuple[int, int]]:
+        ci, cj = pos
+        scored: list[tuple[float, int, tuple[int, int]]] = []
+        for order, (di, dj) in enumerate(MOVES):
+            if (di, dj) == (0, 0):
+                if self._area.matrix[ci][cj] == est_celda.sn_af:
+                    score = self._holgura((ci, cj), t) + PENALIZA_QUEDARSE
+                else:
+                    score = HOLGURA_QUEDARSE_OCUPADA
+            else:
+                score = self._holgura((ci + di, cj + dj), t)
+            scored.append((score, order, (di, dj)))
+        scored.sort()
+        return [mv for _, _, mv in scored[: self.width]]
+
+    def movimientos(self, plan: list[tuple[int, int]], idx: int) -> list[tuple[int, int]]:
+        """
+        Movimientos candidatos para reemplazar plan[idx]. Las posiciones se
+        calculan una vez por plan: la busqueda local recorre varios indices
+        del mismo plan antes de cambiarlo.
+        """
+        clave = tuple(plan)
+        if clave != self._plan:
+            self._plan = clave
+            self._pos_plan = self._posiciones(plan)
+        return self.ranking(self._pos_plan[idx], idx)
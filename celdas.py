@@ -5,3 +5,13 @@ class est_celda(str, Enum): #Clase sencilla que maneja los estados de cada carac
     fuego = "-"  # Quemandose
     c_fuego = "+"  # Corta fuego
     bomb = "x"  # Bombero
+
+
+# Movimientos en 8 direcciones.
+NEIS8: list[tuple[int, int]] = [
+    (-1, -1), (-1, 0), (-1, 1),
+    (0, -1),            (0, 1),
+    (1, -1),  (1, 0),  (1, 1),
+]
+# Permitimos quedarse quieto (primer elemento) o moverse en las 8 direcciones.
+MOVES: list[tuple[int, int]] = [(0, 0)] + NEIS8
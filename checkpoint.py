@@ -0,0 +1,44 @@
+from __future__ import annotations
+
+import os
+import pickle
+
+from area import Area
+
+CHECKPOINT_VERSION = 1
+
+
+def guardar_checkpoint(path: str, estado: dict[str, object]) -> None:
+    """
+    Escribe el snapshot de forma atomica: primero a un archivo temporal y
+    luego se reemplaza el anterior, asi un corte a mitad de escritura no
+    deja un checkpoint corrupto.
+    """
+    data = dict(estado)
+    data["version"] = CHECKPOINT_VERSION
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "wb") as f:
+        pickle.dump(data, f, protocol=pickle.HIGHEST_PROTOCOL)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+
+
+def cargar_checkpoint(path: str) -> dict[str, object] | None:
+    #Devuelve None si todavia no existe un snapshot
+    if not os.path.exists(path):
+        return None
+    with open(path, "rb") as f:
+        data = pickle.load(f)
+    if data.get("version") != CHECKPOINT_VERSION:
+        raise ValueError(f"Checkpoint {path} con version incompatible: {data.get('version')}.")
+    return data
+
+
+def snapshot_area(area: Area) -> dict[str, object]:
+    return {"n": area.n, "tick": area.tick, "grid": area.to_bytes()}
+
+
+def restaurar_area(area: Area, snap: dict[str, object]) -> None:
+    #Restaura en el mismo objeto para no romper referencias externas al Area
+    area.restaurar_bytes(snap["grid"], snap["n"], snap["tick"])
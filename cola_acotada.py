@@ -0,0 +1,126 @@
+from __future__ import annotations
+
+import heapq
+import os
+import pickle
+import tempfile
+from typing import TYPE_CHECKING
+
+from area import Area
+from area_teselada import TiledArea
+
+if TYPE_CHECKING:
+    from branch_and_bound import SearchNode
+
+# Cola de prioridad para la lista abierta de B&B con tope de memoria.
+# Sin tope se comporta igual que una lista manejada con heapq. Con tope:
+#   - "drop": descarta los nodos de peor cota (la busqueda deja de ser exacta)
+#   - "spill": los baja a un archivo temporal compacto (area empaquetada en
+#     bytes) y solo deja en memoria su clave; vuelven cuando su cota es la mejor.
+MODES = ("drop", "spill")
+
+
+def _key(node: "SearchNode") -> tuple[float, int, float]:
+    #Mismo orden que SearchNode (priority, depth, bnb_cost)
+    return (node.priority, node.depth, node.bnb_cost)
+
+
+class BoundedQueue:
+    def __init__(self, max_nodes: int | None = None, mode: str = "drop", batch_fraction: float = 0.25):
+        if mode not in MODES:
+            raise ValueError(f"Modo de cola desconocido '{mode}'. Opciones: {MODES}.")
+        if max_nodes is not None and max_nodes <= 0:
+            raise ValueError("max_nodes debe ser mayor que cero.")
+        self.max_nodes = max_nodes
+        self.mode = mode
+        self.batch_fraction = batch_fraction
+        self._heap: list[SearchNode] = []
+        self._spill_heap: list[tuple[float, int, float, int, int, int]] = []
+        self._spill_file = None
+        self._spill_path: str | None = None
+        self._seq = 0
+        self._node_cls: type | None = None
+        self.dropped = 0
+        self.spilled = 0
+        self.reloaded = 0
+        self.peak = 0
+
+    def __len__(self) -> int:
+        return len(self._heap) + len(self._spill_heap)
+
+    def __bool__(self) -> bool:
+        return len(self) > 0
+
+    def push(self, node: SearchNode) -> None:
+        heapq.heappush(self._heap, node)
+        if self.max_nodes is not None and len(self._heap) > self.max_nodes:
+            self._shrink()
+        self.peak = max(self.peak, len(self._heap))
+
+    def pop(self) -> SearchNode:
+        if self._spill_heap and (not self._heap or self._spill_heap[0][:3] < _key(self._heap[0])):
+            return self._reload()
+        return heapq.heappop(self._heap)
+
+    def _shrink(self) -> None:
+        # Sacamos un lote de los peores para no hacerlo en cada push.
+        count = max(1, int(self.max_nodes * self.batch_fraction))
+        keep_count = max(0, len(self._heap) - count)
+        keep = heapq.nsmallest(keep_count, self._heap)  # ordenada: ya es un heap valido
+        if self.mode == "drop":
+            self.dropped += len(self._heap) - len(keep)
+            self._heap = keep
+            return
+        kept = {id(node) for node in keep}
+        worst = sorted(node for node in self._heap if id(node) not in kept)
+        self._heap = keep
+        for node in worst:
+            self._spill(node)
+
+    def _spill(self, node: SearchNode) -> None:
+        if self._spill_file is None:
+            fd, self._spill_path = tempfile.mkstemp(prefix="bnb_spill_", suffix=".bin")
+            self._spill_file = os.fdopen(fd, "w+b")
+        self._node_cls = type(node)
+        record = pickle.dumps((
+            node.priority, node.depth, node.bnb_cost, node.score, node.pos,
+            node.area.n, node.area.tick, node.area.to_bytes(), getattr(node.area, "tile", None),
+            sorted(node.forbidden), node.path, node.counts,
+        ), protocol=pickle.HIGHEST_PROTOCOL)
+        self._spill_file.seek(0, os.SEEK_END)
+        offset = self._spill_file.tell()
+        self._spill_file.write(record)
+        self._seq += 1
+        heapq.heappush(self._spill_heap, (*_key(node), self._seq, offset, len(record)))
+        self.spilled += 1
+
+    def _reload(self) -> SearchNode:
+        *_, offset, length = heapq.heappop(self._spill_heap)
+        self._spill_file.seek(offset)
+        (priority, depth, bnb_cost, score, pos, n, tick, grid, tile,
+         forbidden, path, counts) = pickle.loads(self._spill_file.read(length))
+        self.reloaded += 1
+        area = Area.from_bytes(grid, n, tick=tick)
+        if tile is not None:
+            # un nodo de un mapa teselado vuelve como TiledArea (clone y conteos dispersos)
+            area = TiledArea.desde_area(area, tile)
+        return self._node_cls(
+            priority=priority,
+            depth=depth,
+            bnb_cost=bnb_cost,
+            score=score,
+            pos=pos,
+            area=area,
+            forbidden=set(forbidden),
+            path=path,
+            counts=counts,
+        )
+
+    def close(self) -> None: #borra el archivo de derrame
+        if self._spill_file is not None:
+            self._spill_file.close()
+            self._spill_file = None
+        if self._spill_path is not None and os.path.exists(self._spill_path):
+            os.remove(self._spill_path)
+        self._spill_path = None
+        self._spill_heap = []
@@ -1,11 +1,161 @@
+from __future__ import annotations
+
+import random
+from collections import deque
+from functools import lru_cache
+from typing import TYPE_CHECKING
+
 from area import Area
-from celdas import est_celda
+from celdas import NEIS8, est_celda
+
+if TYPE_CHECKING:
+    from contexto import InstanceContext
+
+SIN_LLEGADA = 1 << 30  # tiempo de llegada para celdas que el fuego no alcanza
+
+
+@lru_cache(maxsize=8)
+def _tabla(n: int) -> tuple[tuple[tuple[int, int, int], ...], ...]:
+    """
+    Para cada celda k = i*n + j sus vecinos (x, c1, c2): c1/c2 son las esquinas
+    que bloquean el paso diagonal k->x (-1 si el paso es ortogonal).
+    """
+    tabla = []
+    for i in range(n):
+        for j in range(n):
+            vecinos = []
+            for di in (-1, 0, 1):
+                for dj in (-1, 0, 1):
+                    ni, nj = i + di, j + dj
+                    if (di, dj) == (0, 0) or not (0 <= ni < n and 0 <= nj < n):
+                        continue
+                    if di and dj:
+                        vecinos.append((ni * n + nj, i * n + nj, ni * n + j))
+                    else:
+                        vecinos.append((ni * n + nj, -1, -1))
+            tabla.append(tuple(vecinos))
+    return tuple(tabla)
+
+
+def _saltos(estado: list[est_celda], n: int, base: int, cota: float | None = None) -> list[int] | None:
+    """
+    BFS multi-fuente desde las celdas quemandose (todas con h = base), con las
+    mismas reglas que a_quemar; SIN_LLEGADA en las que no alcanza. Con cota,
+    devuelve None apenas las quemadas (fuentes + alcanzadas) la superan.
+    Lo usan tiempos_llegada y el rollout quieto (eventos.py).
+    """
+    tabla = _tabla(n)
+    h = [SIN_LLEGADA] * (n * n)
+    cola: deque[int] = deque()
+    for k, v in enumerate(estado):
+        if v == est_celda.fuego:
+            h[k] = base
+            cola.append(k)
+    quemadas = len(cola)
+    if cota is not None and quemadas > cota:
+        return None
+    sn_af, c_fuego = est_celda.sn_af, est_celda.c_fuego
+    while cola:
+        k = cola.popleft()
+        d = h[k] + 1
+        for x, c1, c2 in tabla[k]:
+            if h[x] <= d or estado[x] != sn_af:
+                continue
+            if c1 >= 0 and (estado[c1] == c_fuego or estado[c2] == c_fuego):
+                continue
+            h[x] = d
+            cola.append(x)
+            quemadas += 1
+            if cota is not None and quemadas > cota:
+                return None
+    return h
+
+
+def _saltos_dispersos(area: Area, cota: float | None = None) -> dict[tuple[int, int], int] | None:
+    """
+    _saltos para areas no densas (TiledArea): el mismo BFS por niveles sobre
+    coordenadas, sin tabla de vecinos ni listas de n*n. Devuelve h solo de
+    las fuentes (0) y las celdas alcanzadas; las que faltan son SIN_LLEGADA.
+    """
+    matrix = area.matrix
+    n = area.n
+    sn_af, c_fuego = est_celda.sn_af, est_celda.c_fuego
+    frontera = list(area.positions(est_celda.fuego))
+    h = dict.fromkeys(frontera, 0)
+    d = 0
+    while True:
+        if cota is not None and len(h) > cota:
+            return None
+        if not frontera:
+            return h
+        d += 1
+        siguiente: list[tuple[int, int]] = []
+        for i, j in frontera:
+            for di, dj in NEIS8:
+                ni, nj = i + di, j + dj
+                if not (0 <= ni < n and 0 <= nj < n) or (ni, nj) in h or matrix[ni][nj] != sn_af:
+                    continue
+                if di and dj and (matrix[i][nj] == c_fuego or matrix[ni][j] == c_fuego):
+                    continue
+                h[(ni, nj)] = d
+                siguiente.append((ni, nj))
+        frontera = siguiente
+
+
+class _FilaLlegada:
+    __slots__ = ("_h", "_i")
+
+    def __init__(self, h: dict[tuple[int, int], int], i: int):
+        self._h = h
+        self._i = i
+
+    def __getitem__(self, j: int) -> int:
+        return self._h.get((self._i, j), SIN_LLEGADA)
+
+
+class LlegadaDispersa:
+    """
+    Mapa de llegadas de un area no densa: llegada[i][j] igual que la lista de
+    listas de tiempos_llegada, pero guardando solo las celdas que el fuego
+    alcanza.
+    """
+
+    def __init__(self, h: dict[tuple[int, int], int], n: int):
+        self._h = h
+        self.n = n
+
+    def __getitem__(self, i: int) -> _FilaLlegada:
+        return _FilaLlegada(self._h, i)
+
+    def __len__(self) -> int:
+        return self.n
+
 
 class fuego: #Clase que lleva todo el fuego maneja la expansion (cuadrada a tasa dada) con su limites en cortafuego
-    def __init__(self, tasa_crecimiento: int = 1):
+    def __init__(
+        self,
+        tasa_crecimiento: int = 1,
+        prob_ignicion: float = 1.0,
+        seed: int | None = None,
+        contexto: InstanceContext | None = None,
+    ):
         self.tasa_crecimiento = tasa_crecimiento  
+        # Contexto de la instancia (contexto.py): vecinos ya calculados por celda
+        self.contexto = contexto
+        # Modo estocastico: con prob_ignicion < 1 cada celda candidata prende con
+        # esa probabilidad en cada salto. a_quemar sigue devolviendo lo posible
+        # (peor caso); la expansion real del tick la decide muestrear.
+        if not 0.0 < prob_ignicion <= 1.0:
+            raise ValueError("prob_ignicion debe estar en (0, 1].")
+        self.prob_ignicion = prob_ignicion
+        self._rng = random.Random(seed)
 
     def _neighbors8(self, i: int, j: int, n: int): #Movimiento o formas en que puede moverse el fuego
+        if self.contexto is not None and self.contexto.vecinos is not None and self.contexto.n == n:
+            return self.contexto.vecinos[i][j]
+        return self._generar_vecinos(i, j, n)
+
+    def _generar_vecinos(self, i: int, j: int, n: int):
         for di in (-1, 0, 1):
             for dj in (-1, 0, 1):
                 if di == 0 and dj == 0:
@@ -44,6 +194,56 @@ class fuego: #Clase que lleva todo el fuego maneja la expansion (cuadrada a tasa
 
         return para_quemar
 
+    def guardar_estado(self) -> object: #estado del RNG para checkpoints
+        return self._rng.getstate()
+
+    def cargar_estado(self, estado: object) -> None:
+        self._rng.setstate(estado)
+
+    def muestrear(self, area: Area) -> set[tuple[int, int]]:
+        """
+        Celdas que efectivamente se queman este tick. En modo determinista es
+        a_quemar; en modo estocastico cada salto tira una moneda por celda
+        candidata (las que no prenden pueden prender en el salto siguiente).
+        """
+        if self.prob_ignicion >= 1.0:
+            return self.a_quemar(area)
+        n = area.n
+        quemando = set(area.positions(est_celda.fuego))
+        para_quemar: set[tuple[int, int]] = set()
+        for _ in range(max(1, self.tasa_crecimiento)):
+            candidatas: set[tuple[int, int]] = set()
+            for (i, j) in quemando:
+                for (ni, nj) in self._neighbors8(i, j, n):
+                    if area.matrix[ni][nj] != est_celda.sn_af or (ni, nj) in para_quemar:
+                        continue
+                    if ni != i and nj != j:
+                        if (area.matrix[i][nj] == est_celda.c_fuego) or (area.matrix[ni][j] == est_celda.c_fuego):
+                            continue
+                    candidatas.add((ni, nj))
+            prenden = {c for c in sorted(candidatas) if self._rng.random() < self.prob_ignicion}
+            para_quemar |= prenden
+            quemando |= prenden
+        return para_quemar
+
+    def tiempos_llegada(self, area: Area) -> list[list[int]] | LlegadaDispersa:
+        """
+        Tick relativo (desde el actual) en que el fuego llegaria a cada celda si
+        nadie interviene: 0 para las que ya se queman, SIN_LLEGADA para las que
+        no alcanza. Usa las mismas reglas que a_quemar (BFS de _saltos). Con
+        un area no densa devuelve una LlegadaDispersa, que se indexa igual.
+        """
+        n = area.n
+        tasa = max(1, self.tasa_crecimiento)
+        if not isinstance(area.matrix, list):
+            # area no densa (TiledArea): solo las celdas que el fuego alcanza
+            dispersos = _saltos_dispersos(area)
+            return LlegadaDispersa({k: -(-d // tasa) for k, d in dispersos.items()}, n)
+        h = _saltos([v for row in area.matrix for v in row], n, 0)
+        if tasa > 1:
+            h = [d if d == SIN_LLEGADA else -(-d // tasa) for d in h]
+        return [h[i * n:(i + 1) * n] for i in range(n)]
+
     def aplicar(self, area: Area, cells: set[tuple[int, int]]) -> None: #se aplica todo lo calculado antes
         for i, j in cells:
             if area.matrix[i][j] not in (est_celda.c_fuego, est_celda.bomb):
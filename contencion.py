@@ -0,0 +1,178 @@
+from __future__ import annotations
+
+from collections import deque
+from typing import Iterable
+
+from area import Area
+from celdas import NEIS8, est_celda
+
+# Deteccion exacta de contencion del fuego.
+# R = celdas sin afectar que el fuego todavia puede alcanzar respetando las
+# mismas reglas que fuego.a_quemar (diagonal bloqueada por cortafuego en una
+# esquina). La celda del bombero cuenta como cortafuego, porque al inicio del
+# siguiente tick se convierte en uno.
+# El fuego esta contenido cuando el bombero ya no puede influir en R: R esta
+# vacio o ninguna celda que el bombero alcanza caminando toca R. Desde ahi el
+# resultado final esta determinado (quemadas actuales + |R|) y no vale la pena
+# buscar. Como solo se agregan barreras, una vez contenido lo sigue estando.
+
+_BLOQUEA = (est_celda.c_fuego, est_celda.bomb)
+
+
+def _paso_permitido(area: Area, i: int, j: int, ni: int, nj: int) -> bool:
+    #Misma regla de esquinas que a_quemar, con el bombero contado como cortafuego
+    if ni != i and nj != j:
+        if area.matrix[i][nj] in _BLOQUEA or area.matrix[ni][j] in _BLOQUEA:
+            return False
+    return True
+
+
+def _fuentes(area: Area, candidatas: Iterable[tuple[int, int]]) -> list[tuple[int, int]]:
+    #Celdas candidatas que el fuego alcanza directamente desde una celda quemandose
+    fuentes: list[tuple[int, int]] = []
+    n = area.n
+    for i, j in candidatas:
+        for di, dj in NEIS8:
+            fi, fj = i + di, j + dj
+            if 0 <= fi < n and 0 <= fj < n and area.matrix[fi][fj] == est_celda.fuego:
+                if _paso_permitido(area, fi, fj, i, j):
+                    fuentes.append((i, j))
+                    break
+    return fuentes
+
+
+def _expandir(area: Area, fuentes: list[tuple[int, int]], dentro_de: set[tuple[int, int]] | None) -> set[tuple[int, int]]:
+    n = area.n
+    alcance: set[tuple[int, int]] = set(fuentes)
+    cola = deque(fuentes)
+    while cola:
+        i, j = cola.popleft()
+        for di, dj in NEIS8:
+            ni, nj = i + di, j + dj
+            if not (0 <= ni < n and 0 <= nj < n) or (ni, nj) in alcance:
+                continue
+            if area.matrix[ni][nj] != est_celda.sn_af:
+                continue
+            if dentro_de is not None and (ni, nj) not in dentro_de:
+                continue
+            if not _paso_permitido(area, i, j, ni, nj):
+                continue
+            alcance.add((ni, nj))
+            cola.append((ni, nj))
+    return alcance
+
+
+def _fuentes_fuego(area: Area) -> list[tuple[int, int]]:
+    #Solo las celdas sin afectar vecinas del fuego pueden ser fuentes
+    n = area.n
+    candidatas = {
+        (i + di, j + dj)
+        for i, j in area.positions(est_celda.fuego)
+        for di, dj in NEIS8
+        if 0 <= i + di < n and 0 <= j + dj < n and area.matrix[i + di][j + dj] == est_celda.sn_af
+    }
+    return _fuentes(area, candidatas)
+
+
+def alcance_fuego(area: Area) -> set[tuple[int, int]]:
+    """
+    Celdas sin afectar que el fuego alcanzaria si el bombero no hiciera nada mas.
+    """
+    return _expandir(area, _fuentes_fuego(area), None)
+
+
+def _bombero_influye(area: Area, pos: tuple[int, int]) -> bool:
+    """
+    Equivale a bombero_alcanza(area, pos, alcance_fuego(area)) sin calcular R:
+    todo camino del fuego dentro de R tambien lo puede caminar el bombero, asi
+    que llega a R si y solo si llega a alguna fuente. En un mapa grande esto
+    corta cerca del bombero en vez de recorrer todo el alcance.
+    """
+    return bombero_alcanza(area, pos, set(_fuentes_fuego(area)))
+
+
+def bombero_alcanza(area: Area, pos: tuple[int, int], objetivo: set[tuple[int, int]]) -> bool:
+    """
+    True si el bombero puede llegar caminando (8 direcciones sobre celdas sin
+    afectar) a alguna celda de objetivo. Corta en cuanto la encuentra.
+    """
+    if not objetivo:
+        return False
+    n = area.n
+    vistos = {pos}
+    cola = deque([pos])
+    while cola:
+        i, j = cola.popleft()
+        for di, dj in NEIS8:
+            ni, nj = i + di, j + dj
+            if not (0 <= ni < n and 0 <= nj < n) or (ni, nj) in vistos:
+                continue
+            if area.matrix[ni][nj] != est_celda.sn_af:
+                continue
+            if (ni, nj) in objetivo:
+                return True
+            vistos.add((ni, nj))
+            cola.append((ni, nj))
+    return False
+
+
+def fuego_contenido(area: Area, pos: tuple[int, int] | None = None) -> bool:
+    #Chequeo exacto sin estado; con pos=None solo mira si el fuego ya no avanza
+    if pos is None:
+        return not _fuentes_fuego(area)
+    return not _bombero_influye(area, pos)
+
+
+def cerrado_exacto(area: Area, pos: tuple[int, int] | None = None) -> bool:
+    """
+    Version exacta de Area.limite(): el fuego esta contenido y queda al menos
+    una celda sin afectar que ya no puede quemarse.
+    """
+    if pos is not None and _bombero_influye(area, pos):
+        return False
+    alcance = alcance_fuego(area)
+    if alcance and pos is None:
+        return False
+    return area.counts()[0] > len(alcance)
+
+
+class ContainmentTracker:
+    """
+    Mantiene R (alcance del fuego) de forma incremental a medida que avanza
+    la simulacion, etiquetando solo la componente afectada:
+    - Celdas que se queman salen de R sin recalcular nada.
+    - Una barrera nueva fuera de R no cambia R (cualquier esquina libre que
+      bloquee una diagonal del fuego ya pertenece a R).
+    - Una barrera dentro de R puede partirlo: se re-etiqueta solo dentro del
+      R anterior, partiendo de las celdas que toca el fuego.
+    """
+
+    def __init__(self, area: Area):
+        self.alcance = alcance_fuego(area)
+        self._contenido = not self.alcance
+        self.recalculos = 0
+
+    def actualizar(
+        self,
+        area: Area,
+        quemadas: Iterable[tuple[int, int]],
+        barreras: Iterable[tuple[int, int]],
+    ) -> None:
+        if self._contenido:
+            return
+        self.alcance.difference_update(quemadas)
+        tocadas = [b for b in barreras if b in self.alcance]
+        if tocadas:
+            self.alcance.difference_update(tocadas)
+            self.alcance = _expandir(area, _fuentes(area, self.alcance), self.alcance)
+            self.recalculos += 1
+        if not self.alcance:
+            self._contenido = True
+
+    def contenido(self, area: Area, pos: tuple[int, int]) -> bool:
+        if not self._contenido and not bombero_alcanza(area, pos, self.alcance):
+            self._contenido = True
+        return self._contenido
+
+    def quemadas_finales(self, area: Area) -> int: #valida solo una vez contenido
+        return area.counts()[1] + len(self.alcance)
@@ -0,0 +1,110 @@
+from __future__ import annotations
+
+from area import Area
+from comp_fuego import LlegadaDispersa, fuego
+from eventos import rollout_quieto
+
+# Datos precalculados de una instancia (un input*.dat), iguales para todas las
+# semillas y estrategias: se arma una vez por input y se comparte.
+#   - vecinos: celdas vecinas (8 direcciones, dentro del mapa) de cada celda,
+#     en el mismo orden que fuego._neighbors8.
+#   - un memo acotado de llegadas (comp_fuego.tiempos_llegada) y rollouts
+#     quietos por estado (area empaquetada): los estados que se repiten entre
+#     semillas, como la primera decision con fuego determinista, se calculan
+#     una sola vez.
+# Todo lo que se entrega es de solo lectura (tuplas) o una copia nueva, asi
+# que el contexto se puede compartir entre estrategias y mandar a los workers
+# (al picklearse viaja sin el memo). Con un area no densa (TiledArea) no se
+# arman los vecinos ni se usa el memo: la clave del memo es el area entera.
+
+MAX_MEMO = 256
+
+
+class InstanceContext:
+    """
+    Contexto de solo lectura de una instancia.
+    - llegada(area): mapa de llegadas (tuplas) del estado, memoizado.
+    - rollout(area): Area nueva con el rollout quieto del estado, memoizado.
+    Se pasa a fuego(contexto=...) y a las estrategias con usar_contexto().
+    """
+
+    def __init__(self, area: Area, tasa: int = 1):
+        self.n = area.n
+        self.tasa = tasa
+        # con un area no densa (TiledArea) no hay tablas ni memo: ocupan n*n
+        self.denso = isinstance(area.matrix, list)
+        self.vecinos: tuple[tuple[tuple[tuple[int, int], ...], ...], ...] | None = None
+        if self.denso:
+            self.vecinos = tuple(
+                tuple(
+                    tuple(
+                        (i + di, j + dj)
+                        for di in (-1, 0, 1) for dj in (-1, 0, 1)
+                        if (di, dj) != (0, 0) and 0 <= i + di < self.n and 0 <= j + dj < self.n
+                    )
+                    for j in range(self.n)
+                )
+                for i in range(self.n)
+            )
+        self._fire = fuego(tasa_crecimiento=tasa, contexto=self)
+        self._llegadas: dict[bytes, tuple[tuple[int, ...], ...]] = {}
+        self._rollouts: dict[bytes, tuple[bytes, int]] = {}
+        self.hits = 0
+        self.misses = 0
+
+    def __getstate__(self) -> dict[str, object]:
+        estado = dict(self.__dict__)
+        estado["_llegadas"], estado["_rollouts"] = {}, {}
+        return estado
+
+    def __setstate__(self, estado: dict[str, object]) -> None:
+        self.__dict__.update(estado)
+        self._fire.contexto = self
+
+    def _guardar(self, memo: dict, clave: bytes, valor: object) -> None:
+        if len(memo) >= MAX_MEMO:
+            memo.pop(next(iter(memo)))  # se va el mas viejo
+        memo[clave] = valor
+
+    def llegada(self, area: Area) -> tuple[tuple[int, ...], ...] | LlegadaDispersa:
+        if not self.denso:
+            return self._fire.tiempos_llegada(area)
+        clave = area.to_bytes()
+        llegada = self._llegadas.get(clave)
+        if llegada is None:
+            self.misses += 1
+            llegada = tuple(tuple(row) for row in self._fire.tiempos_llegada(area))
+            self._guardar(self._llegadas, clave, llegada)
+        else:
+            self.hits += 1
+        return llegada
+
+    def rollout(self, area: Area, cota: float | None = None) -> Area | None:
+        #Mismo resultado que _rollout_stay_until_stable de las estrategias
+        if not self.denso:
+            return rollout_quieto(area, self.tasa, cota)
+        clave = area.to_bytes()
+        guardado = self._rollouts.get(clave)
+        if guardado is None:
+            self.misses += 1
+            final = rollout_quieto(area, self.tasa, cota)
+            if final is None:
+                return None  # cortado por la cota: no queda en el memo
+            guardado = (final.to_bytes(), final.tick - area.tick, final.counts()[1])
+            self._guardar(self._rollouts, clave, guardado)
+            return final
+        self.hits += 1
+        data, ticks, quemadas = guardado
+        if cota is not None and quemadas > cota:
+            return None
+        return Area.from_bytes(data, self.n, tick=area.tick + ticks)
+
+    def reporte(self) -> dict[str, object]:
+        total = self.hits + self.misses
+        return {
+            "memo_llegadas": len(self._llegadas),
+            "memo_rollouts": len(self._rollouts),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / total if total else 0.0,
+        }
@@ -0,0 +1,172 @@
+from __future__ import annotations
+
+import random
+from typing import Callable, Sequence
+
+from area import Area
+from bitboard import BitGrid
+from celdas import est_celda
+from comp_fuego import fuego
+
+# Simulacion de un conjunto (ensemble) de instancias del mismo tamaño que
+# avanzan juntas: las E grillas viven apiladas en bitboards (ver bitboard.py)
+# y cada tick aplica cortafuegos, expansion y condicion de paro a todas con
+# unas pocas operaciones sobre enteros, en vez de E simulaciones en Python.
+# Los movimientos de los bomberos se entregan como una lista (uno por miembro).
+
+Objetivos = Sequence[tuple[int, int] | None]
+
+
+class EnsembleSimulation:
+    """
+    Mismas reglas que Simulation para cada miembro:
+    1. el bombero pone cortafuego en su celda (si esta sin afectar o es bombero)
+    2. el fuego se expande (a_quemar + aplicar)
+    3. el bombero va al objetivo si esta dentro y sin afectar; su celda queda bomb
+    4. tick += 1
+    run_until_stable detiene cada miembro por separado con el mismo chequeo que
+    Simulation.estable; los miembros detenidos no cambian.
+    Con un fuego estocastico (prob_ignicion < 1) cada miembro muestrea su
+    propia expansion, con el RNG del ensemble (`seed`).
+    """
+
+    def __init__(
+        self,
+        areas: list[Area],
+        posiciones: list[tuple[int, int]],
+        comp_fuego: fuego | None = None,
+        seed: int | None = None,
+    ):
+        if not areas:
+            raise ValueError("El ensemble necesita al menos un area.")
+        if len(posiciones) != len(areas):
+            raise ValueError("Se necesita una posicion de bombero por area.")
+        self.grid = BitGrid(areas[0].n, len(areas))
+        self.tasa = comp_fuego.tasa_crecimiento if comp_fuego is not None else 1
+        # expansion estocastica: una mascara al azar por salto para todo el ensemble
+        self.prob = comp_fuego.prob_ignicion if comp_fuego is not None else 1.0
+        self._rng = random.Random(seed)
+        planos = self.grid.planos(areas)
+        self.fuego = planos[est_celda.fuego]
+        self.corta = planos[est_celda.c_fuego]
+        self.bomb = planos[est_celda.bomb]
+        self.posiciones = [tuple(p) for p in posiciones]
+        self.ticks = [area.tick for area in areas]
+        self.activos = [True] * len(areas)
+        self.pasos = [0] * len(areas)
+        # igual que Simulation: marcar dónde está cada bombero al inicio
+        pos = self._mascara_posiciones(range(len(areas)))
+        self.fuego &= ~pos
+        self.corta &= ~pos
+        self.bomb |= pos
+
+    @property
+    def miembros(self) -> int:
+        return self.grid.miembros
+
+    def _mascara_posiciones(self, miembros) -> int:
+        return self.grid.de_indices(self.grid.indice(k, *self.posiciones[k]) for k in miembros)
+
+    def _libres(self) -> int:
+        return self.grid.mascara & ~(self.fuego | self.corta | self.bomb)
+
+    def _indices_activos(self) -> list[int]:
+        return [k for k, activo in enumerate(self.activos) if activo]
+
+    def a_quemar(self) -> list[set[tuple[int, int]]]:
+        """
+        Celdas que se quemarian en el proximo tick, por miembro (lo que
+        Simulation entrega como forbidden a la estrategia).
+        """
+        nuevas = self.grid.propagar(self.fuego, self.corta, self._libres(), self.tasa)
+        return [self.grid.celdas(g) for g in self.grid.por_miembro(nuevas)]
+
+    def area(self, k: int) -> Area: #vista del miembro k como Area normal
+        planos = {est_celda.fuego: self.fuego, est_celda.c_fuego: self.corta, est_celda.bomb: self.bomb}
+        return self.grid.area(planos, k, tick=self.ticks[k])
+
+    def counts(self) -> list[tuple[int, int, int]]: #(libres, quemadas, cortafuegos) por miembro
+        libres = self.grid.conteos(self._libres())
+        quemadas = self.grid.conteos(self.fuego)
+        cortas = self.grid.conteos(self.corta)
+        return list(zip(libres, quemadas, cortas))
+
+    def _sin_expansion_tras_bombero(self) -> list[bool]:
+        #Chequeo de paro de run_until_stable para todos los miembros a la vez
+        pos = self._mascara_posiciones(range(self.miembros))
+        corta = self.corta | (pos & ~self.fuego)
+        libre = self.grid.mascara & ~(self.fuego | corta | self.bomb)
+        nuevas = self.grid.propagar(self.fuego, corta, libre, 1)
+        return [not hay for hay in self.grid.no_vacios(nuevas)]
+
+    def step(self, objetivos: Objetivos | Callable[["EnsembleSimulation"], Objetivos]) -> None:
+        """
+        Avanza un tick todos los miembros activos. `objetivos` es una lista con
+        la celda destino de cada bombero (None = quedarse), o una funcion que
+        la construye despues de la expansion, viendo el mismo estado que ve
+        siguiente_paso en Simulation (usar area(k) y a_quemar()).
+        """
+        activos = self._indices_activos()
+        if not activos:
+            return
+        grid = self.grid
+        activa = grid.mascara_de(activos)
+
+        #1 cortafuego en la celda actual de cada bombero
+        pos = self._mascara_posiciones(activos)
+        nuevo_corta = pos & ~(self.fuego | self.corta)
+        self.corta |= nuevo_corta
+        self.bomb &= ~nuevo_corta
+
+        #2 expansion del fuego
+        mascaras = None
+        if self.prob < 1.0:
+            mascaras = [grid.aleatorio(self._rng, self.prob) for _ in range(max(1, self.tasa))]
+        nuevas = grid.propagar(self.fuego, self.corta, self._libres(), self.tasa, mascaras) & activa
+        self.fuego |= nuevas
+
+        #3 movimiento de los bomberos
+        if callable(objetivos):
+            objetivos = objetivos(self)
+        if len(objetivos) != self.miembros:
+            raise ValueError(f"Se esperaban {self.miembros} objetivos y llegaron {len(objetivos)}.")
+        n = grid.n
+        candidatos: list[int] = []
+        indices: list[int] = []
+        for k in activos:
+            destino = objetivos[k]
+            if destino is not None and 0 <= destino[0] < n and 0 <= destino[1] < n:
+                candidatos.append(k)
+                indices.append(grid.indice(k, *destino))
+        for k, libre in zip(candidatos, grid.bits_en(self._libres(), indices)):
+            if libre:
+                self.posiciones[k] = tuple(objetivos[k])
+        pos = self._mascara_posiciones(activos)
+        self.fuego &= ~pos
+        self.corta &= ~pos
+        self.bomb |= pos
+
+        #4 avanzar tiempo
+        for k in activos:
+            self.ticks[k] += 1
+            self.pasos[k] += 1
+
+    def run_until_stable(
+        self,
+        politica: Callable[["EnsembleSimulation"], Objetivos] | None = None,
+        max_steps: int = 10_000,
+    ) -> list[int]:
+        """
+        Avanza hasta que ningun miembro pueda expandirse tras el cortafuego de
+        su bombero. `politica` devuelve los objetivos de cada tick (por defecto
+        todos se quedan quietos). Devuelve los pasos dados por cada miembro.
+        """
+        quietos: Objetivos = [None] * self.miembros
+        for _ in range(max_steps):
+            for k, estable in enumerate(self._sin_expansion_tras_bombero()):
+                if estable:
+                    self.activos[k] = False
+            if not any(self.activos):
+                break
+            self.step(politica if politica is not None else quietos)
+        return list(self.pasos)
@@ -0,0 +1,53 @@
+from __future__ import annotations
+
+from area import Area
+from celdas import est_celda
+from comp_fuego import SIN_LLEGADA, _saltos, _saltos_dispersos
+
+# Rollout pasivo del fuego en un solo BFS. Sin intervencion del bombero, el
+# futuro del fuego queda descrito por el "salto" h de cada celda: la distancia
+# BFS desde las celdas quemandose (mismas reglas que fuego.a_quemar: 8
+# vecinos, solo celdas sin afectar, diagonal bloqueada si una esquina es
+# cortafuego). La celda prende en el tick ceil(h / tasa), asi el area final
+# y su tick salen sin repetir la simulacion tick a tick.
+
+# h de las celdas que el fuego no alcanza (el BFS vive en comp_fuego)
+INF = SIN_LLEGADA
+
+
+def rollout_quieto(area: Area, tasa: int = 1, cota: float | None = None) -> Area | None:
+    """
+    Mismo resultado que repetir a_quemar/aplicar hasta que no se queme nada
+    (el rollout pasivo de las estrategias), con un solo BFS.
+    Con cota devuelve None (plan dominado) en cuanto las quemadas finales
+    seguro la superan; un empate con la cota no se corta.
+    """
+    tasa = max(1, tasa)
+    if not isinstance(area.matrix, list):
+        return _rollout_disperso(area, tasa, cota)
+    n = area.n
+    estado = [v for row in area.matrix for v in row]
+    h = _saltos(estado, n, 0, cota)
+    if h is None:
+        return None
+    ultimo = 0
+    for k, d in enumerate(h):
+        if 0 < d < INF:
+            estado[k] = est_celda.fuego
+            if d > ultimo:
+                ultimo = d
+    return Area([estado[i * n:(i + 1) * n] for i in range(n)], tick=area.tick + -(-ultimo // tasa))
+
+
+def _rollout_disperso(area: Area, tasa: int, cota: float | None) -> Area | None:
+    #rollout_quieto de un area no densa (TiledArea): BFS por niveles que solo guarda la frontera
+    h = _saltos_dispersos(area, cota)
+    if h is None:
+        return None
+    final = area.clone()
+    for (i, j), d in h.items():
+        if d:
+            final.matrix[i][j] = est_celda.fuego
+    final.tick = area.tick + -(-max(h.values(), default=0) // tasa)
+    return final
+
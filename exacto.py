@@ -0,0 +1,188 @@
+from __future__ import annotations
+
+import sys
+import time
+
+from area import Area
+from bitboard import BitGrid
+from celdas import NEIS8, est_celda
+
+# Solver exacto para mapas chicos (hasta ~12x12), pensado como oraculo para
+# medir que tan lejos del optimo quedan ILS/VNS.
+#
+# El estado de la simulacion entre ticks es (posicion del bombero,
+# cortafuegos, quemadas), todo como bitboards de una grilla (bitboard.py).
+# La celda del bombero cuenta como cortafuego: Simulation la convierte en
+# cortafuego antes de cada expansion y el chequeo de paro hace lo mismo.
+# La busqueda es un branch and bound en profundidad con:
+#   - memo de valores exactos y cotas inferiores por estado,
+#   - cota inferior = quemadas tras la proxima expansion (ocurre si o si),
+#   - dominancia: con la misma posicion y cortafuegos, menos quemadas nunca
+#     terminan peor (el fuego de un estado queda contenido en el del otro).
+#     Cada lista guarda solo entradas no dominadas entre si.
+# _buscar es recursivo, un nivel por tick. Cada tick que sigue quema al menos
+# una celda, asi la profundidad es a lo mas n*n; el constructor verifica que
+# max_n*max_n entre en el limite de recursion.
+_MARGEN_RECURSION = 100  # marcos del llamador y de las funciones auxiliares
+
+
+class _Limite(Exception):
+    pass
+
+
+class ExactSolver:
+    """
+    Minimiza las quemadas finales bajo las reglas de Simulation.run_until_stable.
+    resolver(area, pos) devuelve un dict con quemadas optimas, el plan (celda
+    objetivo del bombero en cada tick), nodos, status y tiempo. Si se agota
+    node_limit o time_limit el status es "limite" y no hay optimo.
+    """
+
+    def __init__(self, max_n: int = 12, node_limit: int = 5_000_000, time_limit: float = 600.0):
+        if max_n * max_n + _MARGEN_RECURSION > sys.getrecursionlimit():
+            raise ValueError(
+                f"max_n={max_n} necesita hasta {max_n * max_n} niveles de recursion "
+                f"(limite {sys.getrecursionlimit()})."
+            )
+        self.max_n = max_n
+        self.node_limit = node_limit
+        self.time_limit = time_limit
+
+    def _preparar(self, area: Area) -> None:
+        grid = BitGrid(area.n, 1)
+        self._grid = grid
+        n = area.n
+        # vecinos de cada celda para mover al bombero
+        self._vecinos: dict[int, list[int]] = {}
+        for i in range(n):
+            for j in range(n):
+                self._vecinos[grid.indice(0, i, j)] = [
+                    grid.indice(0, i + di, j + dj)
+                    for di, dj in NEIS8 if 0 <= i + di < n and 0 <= j + dj < n
+                ]
+        self._exacto: dict[tuple[int, int, int], tuple[int, tuple[int, int, int] | None]] = {}
+        self._cota_inf: dict[tuple[int, int, int], int] = {}
+        self._dominancia: dict[tuple[int, int], list[tuple[int, int]]] = {}
+        self._nodos = 0
+
+    def _anotar_dominancia(self, pos: int, corta: int, fuego: int, valor: int) -> None:
+        """
+        (fuego, valor) acota por abajo a todo estado con un fuego que lo
+        contiene. Si una entrada con fuego contenido en este ya da una cota
+        >= valor, la nueva no aporta; si no, se sacan las que la nueva cubre
+        (fuego que contiene a este y valor <= valor).
+        """
+        lista = self._dominancia.setdefault((pos, corta), [])
+        for otro_fuego, otro_valor in lista:
+            if otro_fuego & ~fuego == 0 and otro_valor >= valor:
+                return
+        lista[:] = [(f, v) for f, v in lista if not (fuego & ~f == 0 and v <= valor)]
+        lista.append((fuego, valor))
+
+    def _propagar(self, fuego: int, corta: int) -> int:
+        libre = self._grid.mascara & ~(fuego | corta | self._bombas)
+        return self._grid.propagar(fuego, corta, libre)
+
+    def _buscar(self, pos: int, corta: int, fuego: int, cota: int) -> int:
+        """
+        Valor optimo del estado si es menor que cota; si no, una cota
+        inferior >= cota.
+        """
+        key = (pos, corta, fuego)
+        if key in self._exacto:
+            return self._exacto[key][0]
+        cota_inf = self._cota_inf.get(key, 0)
+        if cota_inf >= cota:
+            return cota_inf
+        self._nodos += 1
+        if self._nodos > self.node_limit or (time.perf_counter() - self._inicio) >= self.time_limit:
+            raise _Limite()
+
+        proxima = self._propagar(fuego, corta)
+        if not proxima:
+            valor = fuego.bit_count()
+            self._exacto[key] = (valor, None)
+            self._anotar_dominancia(pos, corta, fuego, valor)
+            return valor
+
+        quemado = fuego | proxima
+        base = quemado.bit_count()
+        # dominancia: un estado con subconjunto de estas quemadas ya resuelto
+        for otro_fuego, valor in self._dominancia.get((pos, corta), ()):
+            if otro_fuego & ~fuego == 0 and valor > base:
+                base = valor
+        if base >= cota:
+            self._cota_inf[key] = max(cota_inf, base)
+            return base
+
+        hijos: list[tuple[int, int, int]] = []
+        for destino in [pos] + self._vecinos[pos]:
+            bit = 1 << destino
+            if destino != pos and (quemado | corta | self._bombas) & bit:
+                continue  # solo se avanza a celdas sin afectar
+            hijo_corta = corta | bit
+            cota_hijo = quemado.bit_count() + self._propagar(quemado, hijo_corta).bit_count()
+            hijos.append((cota_hijo, destino, hijo_corta))
+        hijos.sort()
+
+        mejor = cota
+        mejor_hijo: tuple[int, int, int] | None = None
+        menor_cota = None
+        for cota_hijo, destino, hijo_corta in hijos:
+            if cota_hijo >= mejor:
+                menor_cota = cota_hijo if menor_cota is None else min(menor_cota, cota_hijo)
+                break
+            valor = self._buscar(destino, hijo_corta, quemado, mejor)
+            if valor < mejor:
+                mejor = valor
+                mejor_hijo = (destino, hijo_corta, quemado)
+            else:
+                menor_cota = valor if menor_cota is None else min(menor_cota, valor)
+
+        if mejor_hijo is not None:
+            # todos los demas hijos son >= mejor: el valor es exacto
+            self._exacto[key] = (mejor, mejor_hijo)
+            self._anotar_dominancia(pos, corta, fuego, mejor)
+            return mejor
+        cota_inf = max(cota_inf, cota if menor_cota is None else menor_cota)
+        self._cota_inf[key] = cota_inf
+        return cota_inf
+
+    def resolver(self, area: Area, pos: tuple[int, int]) -> dict[str, object]:
+        if area.n > self.max_n:
+            raise ValueError(f"El solver exacto acepta mapas de hasta {self.max_n}x{self.max_n}.")
+        self._preparar(area)
+        grid = self._grid
+        planos = grid.planos([area])
+        bit = 1 << grid.indice(0, *pos)
+        fuego = planos[est_celda.fuego] & ~bit
+        corta = planos[est_celda.c_fuego] | bit
+        self._bombas = planos[est_celda.bomb] & ~bit
+        raiz = (grid.indice(0, *pos), corta, fuego)
+
+        self._inicio = time.perf_counter()
+        status = "ok"
+        optimo: int | None = None
+        try:
+            # n*n + 1 es una cota valida: nunca se queman mas celdas que las del mapa
+            optimo = self._buscar(*raiz, cota=area.n * area.n + 1)
+        except _Limite:
+            status = "limite"
+        elapsed = time.perf_counter() - self._inicio
+
+        plan: list[tuple[int, int]] = []
+        if optimo is not None:
+            estado = raiz
+            while True:
+                _, hijo = self._exacto[estado]
+                if hijo is None:
+                    break
+                plan.append(divmod(hijo[0], grid.ancho))
+                estado = hijo
+        return {
+            "quemadas": optimo,
+            "plan": plan,
+            "nodos": self._nodos,
+            "status": status,
+            "elapsed_sec": elapsed,
+        }
@@ -3,19 +3,13 @@ from __future__ import annotations
 import random
 import time
 
-from strategy import strategy_bombero
+from strategy import DOMINADO, strategy_bombero
 from area import Area
-from celdas import est_celda
+from celdas import MOVES, NEIS8, est_celda
 from comp_fuego import fuego
-
-# Movimientos en 8 direcciones.
-NEIS8: list[tuple[int, int]] = [
-    (-1, -1), (-1, 0), (-1, 1),
-    (0, -1),            (0, 1),
-    (1, -1),  (1, 0),  (1, 1),
-]
-# Permitimos quedarse quieto (primer elemento) o moverse en las 8 direcciones.
-MOVES: list[tuple[int, int]] = [(0, 0)] + NEIS8
+from eventos import rollout_quieto
+from candidatos import CandidateLists
+from montecarlo import MonteCarloEvaluator
 
 
 class IteratedLocalSearch(strategy_bombero):
@@ -28,6 +22,12 @@ class IteratedLocalSearch(strategy_bombero):
     - El mejor plan encontrado define el siguiente movimiento.
     """
 
+    _estado_campos = (
+        "total_plans", "total_time", "_last_report",
+        "total_warm_starts", "total_warm_wins", "_plan_previo", "_pos_esperada",
+        "total_dominados",
+    )
+
     def __init__(
         self,
         horizon: int = 6,
@@ -37,6 +37,10 @@ class IteratedLocalSearch(strategy_bombero):
         time_limit: float = 1.0,
         greedy_bias: float = 0.45,
         seed: int | None = None,
+        candidate_width: int | None = None,
+        spread_prob: float | None = None,
+        mc_samples: int = 32,
+        warm_start: bool = True,
     ):
         self.horizon = horizon
         self.max_evaluations = max_evaluations
@@ -45,28 +49,47 @@ class IteratedLocalSearch(strategy_bombero):
         self.time_limit = time_limit
         self.greedy_bias = greedy_bias
         self._rng = random.Random(seed)
+        # Ancho de las listas de candidatos (None = los 9 MOVES, sin filtrar).
+        self.candidate_width = candidate_width
+        self._candidatos: CandidateLists | None = None
+        # Expansion incierta: con spread_prob cada plan se puntua por las
+        # quemadas esperadas sobre mc_samples futuros (None = determinista).
+        self.spread_prob = spread_prob
+        self.mc_samples = mc_samples
+        self._montecarlo = (
+            MonteCarloEvaluator(spread_prob, mc_samples) if spread_prob is not None else None
+        )
 
         self._fire = fuego(tasa_crecimiento=1)
         self.total_plans = 0
+        self.total_dominados = 0  # rollouts cortados por superar al incumbente
         self.total_time = 0.0
         self._last_report: dict[str, object] = {}
+        # Horizonte deslizante: la cola del mejor plan del tick anterior se
+        # reutiliza (corrida un tick) como incumbente junto al plan nuevo.
+        self.warm_start = warm_start
+        self._plan_previo: list[tuple[int, int]] | None = None
+        self._pos_esperada: tuple[int, int] | None = None
+        self.total_warm_starts = 0
+        self.total_warm_wins = 0
 
     def _clone_area(self, area: Area) -> Area:
-        return Area([row.copy() for row in area.matrix], tick=area.tick)
+        return area.clone()
 
-    def _rollout_stay_until_stable(self, area: Area) -> Area:
+    def _rollout_stay_until_stable(self, area: Area, cota: float | None = None) -> Area | None:
         """
         Deja al bombero quieto hasta que no haya mas expansion posible.
         Sirve para estimar el costo final de una trayectoria parcial.
+        Con cota (el costo incumbente) devuelve None si las quemadas la
+        superan: el plan ya no puede ganar y no hace falta terminar el rollout.
         """
-        area_copy = self._clone_area(area)
-        while True:
-            to_burn = self._fire.a_quemar(area_copy)
-            if not to_burn:
-                break
-            self._fire.aplicar(area_copy, to_burn)
-            area_copy.tick += 1
-        return area_copy
+        if self._contexto is not None:
+            final = self._contexto.rollout(area, cota)
+        else:
+            final = rollout_quieto(area, self._fire.tasa_crecimiento, cota)
+        if final is None:
+            self.total_dominados += 1
+        return final
 
     def _valid_moves(self, area: Area, pos: tuple[int, int]) -> list[tuple[int, int]]:
         """
@@ -84,6 +107,12 @@ class IteratedLocalSearch(strategy_bombero):
             moves.append((di, dj))
         return moves
 
+    def _moves_para(self, plan: list[tuple[int, int]], idx: int) -> list[tuple[int, int]]:
+        #Movimientos a probar en plan[idx]: todos o la lista de candidatos del tick
+        if self._candidatos is None:
+            return MOVES
+        return self._candidatos.movimientos(plan, idx)
+
     def _apply_move(
         self,
         area: Area,
@@ -164,11 +193,18 @@ class IteratedLocalSearch(strategy_bombero):
         area: Area,
         pos: tuple[int, int],
         plan: list[tuple[int, int]],
-    ) -> tuple[float, float, Area, tuple[int, int]]:
+        cota: float | None = None,
+    ) -> tuple[float, float, Area | None, tuple[int, int]]:
         """
         Ejecuta el plan y devuelve (costo, score, area_final, pos_final).
-        Costo = celdas quemadas tras un rollout pasivo.
+        Costo = celdas quemadas tras un rollout pasivo (o su media sobre los
+        futuros muestreados si la expansion es estocastica).
+        Con cota, un plan que seguro quema mas que ella se corta y vuelve como
+        (inf, inf, None, pos): nunca gana una comparacion con el incumbente.
         """
+        if self._montecarlo is not None:
+            costo, score, rollout_area, cur_pos, _ = self._montecarlo.evaluar(plan)
+            return costo, score, rollout_area, cur_pos
         area_copy = self._clone_area(area)
         ci, cj = pos
         if area_copy.matrix[ci][cj] == est_celda.bomb:
@@ -182,22 +218,36 @@ class IteratedLocalSearch(strategy_bombero):
             if not moves:
                 break
             chosen = mv if mv in moves else moves[0]
-            area_copy, cur_pos, _ = self._apply_move(area_copy, cur_pos, chosen, clone=False)
+            area_copy, cur_pos, counts = self._apply_move(area_copy, cur_pos, chosen, clone=False)
             steps_taken += 1
+            if cota is not None and counts[1] > cota:
+                self.total_dominados += 1
+                return DOMINADO, DOMINADO, None, cur_pos
             if not self._fire.a_quemar(area_copy):
                 break
 
-        rollout_area = self._rollout_stay_until_stable(area_copy)
+        rollout_area = self._rollout_stay_until_stable(area_copy, cota)
+        if rollout_area is None:
+            return DOMINADO, DOMINADO, None, cur_pos
         libres, quemadas, cortafuegos = rollout_area.counts()
         costo = float(quemadas)
         score = costo - 0.05 * cortafuegos + 0.02 * steps_taken
         return costo, score, rollout_area, cur_pos
 
+    def _plan_tibio(self, pos: tuple[int, int]) -> list[tuple[int, int]] | None:
+        """
+        Plan del tick anterior sin su primer movimiento (ya ejecutado) y con
+        (0,0) al final. Solo vale si el bombero quedo donde el plan esperaba.
+        """
+        if not self.warm_start or self._plan_previo is None or self._pos_esperada != pos:
+            return None
+        return self._plan_previo[1:] + [(0, 0)]
+
     def _perturb_plan(self, plan: list[tuple[int, int]]) -> list[tuple[int, int]]:
         mutated = list(plan)
         for _ in range(self.perturbation_strength):
             idx = self._rng.randrange(len(mutated))
-            mutated[idx] = self._rng.choice(MOVES)
+            mutated[idx] = self._rng.choice(self._moves_para(mutated, idx))
         return mutated
 
     def _local_improve(
@@ -224,12 +274,14 @@ class IteratedLocalSearch(strategy_bombero):
             improved = False
             idx = self._rng.randrange(len(plan))
             base_move = plan[idx]
-            for mv in MOVES:
+            for mv in self._moves_para(plan, idx):
                 if mv == base_move:
                     continue
+                if self._cancelado():
+                    return plan, current_cost, current_score, current_area, evals_used
                 candidate = list(plan)
                 candidate[idx] = mv
-                cost, score, cand_area, _ = self._evaluate_plan(area, pos, candidate)
+                cost, score, cand_area, _ = self._evaluate_plan(area, pos, candidate, cota=self._cota(current_cost))
                 evals_used += 1
                 if cost < current_cost or (cost == current_cost and score < current_score):
                     plan = candidate
@@ -249,16 +301,42 @@ class IteratedLocalSearch(strategy_bombero):
         forbidden: set[tuple[int, int]],
     ) -> tuple[int, int]:
         start = time.perf_counter()
+        self._candidatos = (
+            CandidateLists(
+                area, (i, j), self.candidate_width,
+                llegada=self._contexto.llegada(area) if self._contexto is not None else None,
+            )
+            if self.candidate_width else None
+        )
+        if self._montecarlo is not None:
+            # misma semilla para todos los planes de esta decision (numeros comunes)
+            self._montecarlo.preparar(area, (i, j), self._rng.getrandbits(32))
         status = "ok"
 
         best_plan = self._initial_plan(area, (i, j))
         best_cost, best_score, best_area, _ = self._evaluate_plan(area, (i, j), best_plan)
         evaluations = 1
+        warm_plan = self._plan_tibio((i, j))
+        warm_gano = False
+        if warm_plan is not None:
+            self.total_warm_starts += 1
+            cost, score, cand_area, _ = self._evaluate_plan(area, (i, j), warm_plan, cota=self._cota(best_cost))
+            evaluations += 1
+            if cost < best_cost or (cost == best_cost and score < best_score):
+                best_plan = warm_plan
+                best_cost = cost
+                best_score = score
+                best_area = cand_area
+                warm_gano = True
+                self.total_warm_wins += 1
 
         while evaluations < self.max_evaluations:
             if (time.perf_counter() - start) >= self.time_limit:
                 status = "time_limit"
                 break
+            if self._cancelado():
+                status = "cancelado"
+                break
 
             perturbed = self._perturb_plan(best_plan)
             perturbed, cost, score, cand_area, used = self._local_improve(
@@ -275,6 +353,7 @@ class IteratedLocalSearch(strategy_bombero):
                 best_cost = cost
                 best_score = score
                 best_area = cand_area
+                self._avisar({"tick": area.tick, "evaluaciones": evaluations, "mejor_costo": best_cost})
             elif self._rng.random() < 0.1:
                 # Aceptacion ocasional para diversificar.
                 best_plan = perturbed
@@ -298,7 +377,12 @@ class IteratedLocalSearch(strategy_bombero):
                 "cortafuegos": best_area.counts()[2],
             },
             "cerrado": cerrada,
+            "mejor_costo": best_cost,
+            "warm_start": warm_plan is not None,
+            "warm_gano": warm_gano,
         }
+        if self._montecarlo is not None:
+            self._last_report["montecarlo"] = self._montecarlo.reporte()
 
         # Devolvemos solo el primer movimiento del mejor plan.
         mv = best_plan[0] if best_plan else (0, 0)
@@ -310,7 +394,12 @@ class IteratedLocalSearch(strategy_bombero):
                 mv = valid[0]
                 ni, nj = i + mv[0], j + mv[1]
             else:
-                return i, j
+                ni, nj = i, j
+        # El plan sigue valido el proximo tick solo si se ejecuto su primer
+        # movimiento; con el movimiento de respaldo la cola ya no aplica.
+        ejecutado = bool(best_plan) and mv == best_plan[0]
+        self._plan_previo = list(best_plan) if ejecutado else None
+        self._pos_esperada = (ni, nj)
         return ni, nj
 
     def ultima_busqueda(self) -> dict[str, object]:
@@ -321,22 +410,9 @@ class IteratedLocalSearch(strategy_bombero):
         area: Area | None = None,
         wall_time: float | None = None,
     ) -> dict[str, object]:
-        libres = quemadas = cortafuegos = None
-        instantes = None
-        cerrado = None
-        if area is not None:
-            libres, quemadas, cortafuegos = area.counts()
-            instantes = area.tick
-            cerrado = area.limite()
-
         return {
-            "nodes": self.total_plans,
-            "estrategia": self._last_report.get("status", "sin_busqueda"),
-            "tiempo_busqueda_sec": self.total_time,
-            "tiempo_total_sec": wall_time,
-            "instantes": instantes,
-            "sin_afectar": libres,
-            "quemadas": quemadas,
-            "cortafuegos": cortafuegos,
-            "cerrado": cerrado,
+            **self._resumen(self.total_plans, area, wall_time),
+            "warm_starts": self.total_warm_starts,
+            "warm_ganados": self.total_warm_wins,
+            "rollouts_dominados": self.total_dominados,
         }
@@ -1,10 +1,18 @@
+import os
+import struct
+
 from area import Area
+from area_teselada import TILE, TiledArea
 from celdas import est_celda
 from errors import InputFormatError
 
 def data_carga(path: str) -> tuple[int, tuple[int, int], tuple[int, int], Area]: #Funcion para cargar las primeras 3 lineas + toda el area a quemar
     with open(path, "r", encoding="utf-8") as f:
-        lines = [ln.strip() for ln in f if ln.strip()]
+        return data_carga_texto(f.read())
+
+
+def data_carga_texto(text: str) -> tuple[int, tuple[int, int], tuple[int, int], Area]: #Igual que data_carga pero desde el contenido ya leido
+    lines = [ln.strip() for ln in text.splitlines() if ln.strip()]
 
     if not lines:
         raise InputFormatError("Falta la linea con el valor de n.")
@@ -40,6 +48,128 @@ def data_carga(path: str) -> tuple[int, tuple[int, int], tuple[int, int], Area]:
     return n, (x, y), (a, b), grid
 
 
+# Cache de instancias ya parseadas. La clave es (ruta, mtime_ns, tamaño): si el
+# archivo cambia, la entrada deja de servir y se vuelve a parsear. Se guarda la
+# grilla validada como filas inmutables (y empaquetada para el side-car), y
+# cada llamada entrega un Area nueva con solo copiar las filas.
+# El side-car (<input>.cache, junto al .dat) persiste la grilla empaquetada
+# entre procesos: cabecera <4sqqIiiii (MAGIC, mtime_ns, tamaño, n, fuego,
+# bombero) seguida de n*n bytes de celdas (Area.to_bytes).
+SIDECAR_EXT = ".cache"
+_SIDECAR_MAGIC = b"PAIC"
+_SIDECAR = struct.Struct("<4sqqIiiii")
+
+Instancia = tuple[int, tuple[int, int], tuple[int, int], tuple[tuple[est_celda, ...], ...]]
+_instancias: dict[tuple[str, int, int], Instancia] = {}
+
+
+def data_carga_cacheada(path: str, persistir: bool = False) -> tuple[int, tuple[int, int], tuple[int, int], Area]:
+    """
+    Igual que data_carga, pero el archivo se lee y valida una sola vez por
+    version (mtime y tamaño). Cada llamada devuelve un Area propia que se
+    puede modificar sin afectar al cache. Con persistir=True tambien se
+    lee/escribe el side-car para que otros procesos se salten el parseo.
+    """
+    info = os.stat(path)
+    key = (os.path.abspath(path), info.st_mtime_ns, info.st_size)
+    inst = _instancias.get(key)
+    if inst is None:
+        inst = _leer_sidecar(path, key) if persistir else None
+        if inst is None:
+            n, fuego_coord, bombero_coord, area = data_carga(path)
+            inst = (n, fuego_coord, bombero_coord, tuple(tuple(row) for row in area.matrix))
+            if persistir:
+                _escribir_sidecar(path, key, inst, area)
+        for viejo in [k for k in _instancias if k[0] == key[0]]:
+            del _instancias[viejo]  # versiones anteriores del mismo archivo
+        _instancias[key] = inst
+    n, fuego_coord, bombero_coord, filas = inst
+    return n, fuego_coord, bombero_coord, Area([list(row) for row in filas])
+
+
+def limpiar_cache() -> None:
+    _instancias.clear()
+
+
+def _leer_sidecar(path: str, key: tuple[str, int, int]) -> Instancia | None:
+    #Un side-car ausente, viejo o corrupto se ignora (se vuelve a parsear)
+    try:
+        with open(path + SIDECAR_EXT, "rb") as f:
+            data = f.read()
+        magic, mtime, tamano, n, fx, fy, bx, by = _SIDECAR.unpack_from(data, 0)
+        if magic != _SIDECAR_MAGIC or (mtime, tamano) != key[1:]:
+            return None
+        area = Area.from_bytes(data[_SIDECAR.size:], n)
+    except (OSError, struct.error, InputFormatError):
+        return None
+    return n, (fx, fy), (bx, by), tuple(tuple(row) for row in area.matrix)
+
+
+def _escribir_sidecar(path: str, key: tuple[str, int, int], inst: Instancia, area: Area) -> None:
+    n, (fx, fy), (bx, by), _ = inst
+    tmp = path + SIDECAR_EXT + ".tmp"
+    try:
+        with open(tmp, "wb") as f:
+            f.write(_SIDECAR.pack(_SIDECAR_MAGIC, key[1], key[2], n, fx, fy, bx, by))
+            f.write(area.to_bytes())
+        os.replace(tmp, path + SIDECAR_EXT)
+    except OSError:
+        pass  # sin permisos de escritura: queda solo el cache en memoria
+
+
+def data_carga_teselada(path: str, tile: int = TILE) -> tuple[int, tuple[int, int], tuple[int, int], TiledArea]:
+    """
+    Igual que data_carga pero arma un TiledArea leyendo fila por fila: solo
+    se guardan las baldosas con alguna celda distinta de sn_af (mapas enormes).
+    """
+    with open(path, "r", encoding="utf-8") as f:
+        lines = (ln.strip() for ln in f)
+        lines = (ln for ln in lines if ln)
+        cabecera = [next(lines, None) for _ in range(3)]
+        if cabecera[0] is None:
+            raise InputFormatError("Falta la linea con el valor de n.")
+        if cabecera[1] is None:
+            raise InputFormatError("Falta la linea con las coordenadas iniciales del fuego.")
+        if cabecera[2] is None:
+            raise InputFormatError("Falta la linea con las coordenadas del bombero.")
+        n = _parse_int(cabecera[0], "n")
+        if n <= 0:
+            raise InputFormatError("El valor de n debe ser mayor que cero.")
+        fuego_coord = _parse_pair(cabecera[1], "fuego")
+        bombero_coord = _parse_pair(cabecera[2], "bombero")
+
+        grid = TiledArea(n, tile)
+        for row_idx in range(n):
+            line = next(lines, None)
+            if line is None:
+                raise InputFormatError(
+                    f"El area esta incompleta: se esperaban {n} filas y solo hay {row_idx}."
+                )
+            tokens = line.split()
+            if len(tokens) != n:
+                raise InputFormatError(
+                    f"La fila {row_idx + 1} del area tiene {len(tokens)} columnas y se esperaban {n}."
+                )
+            for col_idx, token in enumerate(tokens):
+                if token == est_celda.sn_af.value:
+                    continue
+                try:
+                    grid.matrix[row_idx][col_idx] = est_celda(token)
+                except ValueError as exc:
+                    raise InputFormatError(
+                        f"Caracter anormal '{token}' en la fila {row_idx + 1}, columna {col_idx + 1}."
+                    ) from exc
+
+    _validate_inside(fuego_coord, n, "fuego")
+    _validate_inside(bombero_coord, n, "bombero")
+
+    x, y = fuego_coord
+    a, b = bombero_coord
+    grid.matrix[x][y] = est_celda.fuego
+    grid.matrix[a][b] = est_celda.bomb
+    return n, (x, y), (a, b), grid
+
+
 def _parse_int(text: str, label: str) -> int:
     try:
         return int(text)
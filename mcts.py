@@ -0,0 +1,364 @@
+from __future__ import annotations
+
+import math
+import random
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from area import Area
+from celdas import MOVES, NEIS8, est_celda
+from comp_fuego import fuego
+from eventos import rollout_quieto
+from memoria_compartida import RecursosCompartidos, adjuntar_cacheada
+from strategy import strategy_bombero
+
+
+class TreeNode:
+    __slots__ = ("area", "pos", "parent", "move", "children", "untried", "visits", "cost_sum", "terminal")
+
+    def __init__(self, area: Area, pos: tuple[int, int], parent: "TreeNode | None", move: tuple[int, int] | None):
+        self.area = area
+        self.pos = pos
+        self.parent = parent
+        self.move = move
+        self.children: dict[tuple[int, int], TreeNode] = {}
+        self.untried: list[tuple[int, int]] | None = None
+        self.visits = 0
+        self.cost_sum = 0.0
+        self.terminal = False
+
+
+_contexto_worker = None
+
+
+def _init_worker(contexto) -> None:
+    global _contexto_worker
+    _contexto_worker = contexto
+
+
+def _buscar_remoto(
+    nombre: str,
+    pos: tuple[int, int],
+    params: dict,
+    seed: int,
+    budget: float,
+) -> tuple[dict[tuple[int, int], tuple[int, float]], int, int]:
+    #Arbol independiente en un worker (paralelismo de raiz)
+    strategy = MonteCarloTreeSearch(seed=seed, workers=1, **params)
+    strategy.usar_contexto(_contexto_worker)
+    root = strategy._nueva_raiz(adjuntar_cacheada(nombre).leer(0), pos)
+    iterations, _ = strategy._buscar(root, time.perf_counter() + budget)
+    stats = {mv: (child.visits, child.cost_sum) for mv, child in root.children.items()}
+    return stats, iterations, strategy._tree_size
+
+
+class MonteCarloTreeSearch(RecursosCompartidos, strategy_bombero):
+    """
+    Estrategia Monte Carlo Tree Search (UCT).
+    - Mismo modelo de movimientos que ILS/VNS (MOVES, cortafuego en la celda
+      actual y en la nueva antes de que avance el fuego).
+    - Cada iteracion: seleccion UCT, expansion de un movimiento, unos pocos
+      pasos aleatorios y luego el rollout pasivo de siempre; el costo es la
+      cantidad de quemadas finales.
+    - Paralelismo de raiz: workers-1 procesos construyen arboles propios
+      hasta el limite de tiempo y sus estadisticas de la raiz se suman a las
+      del arbol local. Se elige el movimiento mas visitado.
+    - El arbol local se conserva entre ticks si el Area real coincide con la
+      del hijo elegido, y entra en el checkpoint (guardar_estado).
+    """
+
+    _estado_campos = ("total_iterations", "total_time", "_last_report")
+
+    def __init__(
+        self,
+        time_limit: float = 1.0,
+        exploration: float = 1.0,
+        playout_depth: int = 2,
+        max_tree_nodes: int = 5_000,
+        workers: int = 1,
+        reuse_tree: bool = True,
+        seed: int | None = None,
+    ):
+        self.time_limit = time_limit
+        self.exploration = exploration
+        self.playout_depth = playout_depth
+        self.max_tree_nodes = max_tree_nodes
+        self.workers = workers
+        self.reuse_tree = reuse_tree
+        self._rng = random.Random(seed)
+
+        self._fire = fuego(tasa_crecimiento=1)
+        self.total_iterations = 0
+        self.total_time = 0.0
+        self._last_report: dict[str, object] = {}
+        self._tree_size = 0
+        self._cost_min = float("inf")
+        self._cost_max = float("-inf")
+        self._arbol: TreeNode | None = None
+
+    def _clone_area(self, area: Area) -> Area:
+        return area.clone()
+
+    def _rollout_stay_until_stable(self, area: Area) -> Area:
+        if self._contexto is not None:
+            return self._contexto.rollout(area)
+        return rollout_quieto(area, self._fire.tasa_crecimiento)
+
+    def _valid_moves(self, area: Area, pos: tuple[int, int]) -> list[tuple[int, int]]:
+        ci, cj = pos
+        moves: list[tuple[int, int]] = [(0, 0)]
+        for di, dj in NEIS8:
+            ni, nj = ci + di, cj + dj
+            if area.dentro(ni, nj) and area.matrix[ni][nj] == est_celda.sn_af:
+                moves.append((di, dj))
+        return moves
+
+    def _apply_move(self, area: Area, pos: tuple[int, int], move: tuple[int, int]) -> tuple[int, int]:
+        #Simula un paso sobre area (in-place) y devuelve la nueva posicion
+        ci, cj = pos
+        ni, nj = ci + move[0], cj + move[1]
+        if area.matrix[ci][cj] in (est_celda.sn_af, est_celda.bomb):
+            area.matrix[ci][cj] = est_celda.c_fuego
+        if (not area.dentro(ni, nj)) or (area.matrix[ni][nj] != est_celda.sn_af):
+            ni, nj = ci, cj
+        area.matrix[ni][nj] = est_celda.c_fuego
+        area.tick += 1
+        self._fire.aplicar(area, self._fire.a_quemar(area))
+        return ni, nj
+
+    def _nueva_raiz(self, area: Area, pos: tuple[int, int]) -> TreeNode:
+        root_area = self._clone_area(area)
+        ci, cj = pos
+        if root_area.matrix[ci][cj] == est_celda.bomb:
+            root_area.matrix[ci][cj] = est_celda.c_fuego
+        self._tree_size = 1
+        self._cost_min = float("inf")
+        self._cost_max = float("-inf")
+        return TreeNode(root_area, pos, None, None)
+
+    def _uct(self, parent: TreeNode, child: TreeNode) -> float:
+        mean = child.cost_sum / child.visits
+        spread = self._cost_max - self._cost_min
+        value = 0.5 if spread <= 0 else (self._cost_max - mean) / spread
+        return value + self.exploration * math.sqrt(math.log(parent.visits) / child.visits)
+
+    def _expandir(self, node: TreeNode) -> TreeNode:
+        if node.untried is None:
+            node.untried = self._valid_moves(node.area, node.pos)
+            self._rng.shuffle(node.untried)
+            if not self._fire.a_quemar(node.area):
+                node.terminal = True
+                node.untried = []
+        if node.terminal or not node.untried or self._tree_size >= self.max_tree_nodes:
+            return node
+        move = node.untried.pop()
+        child_area = self._clone_area(node.area)
+        child_pos = self._apply_move(child_area, node.pos, move)
+        child = TreeNode(child_area, child_pos, node, move)
+        node.children[move] = child
+        self._tree_size += 1
+        return child
+
+    def _simular(self, node: TreeNode) -> float:
+        area = self._clone_area(node.area)
+        pos = node.pos
+        for _ in range(self.playout_depth):
+            if not self._fire.a_quemar(area):
+                break
+            pos = self._apply_move(area, pos, self._rng.choice(self._valid_moves(area, pos)))
+        return float(self._rollout_stay_until_stable(area).counts()[1])
+
+    def _buscar(self, root: TreeNode, deadline: float) -> tuple[int, bool]:
+        #Devuelve las iteraciones y si se corto por cancelacion
+        iterations = 0
+        while time.perf_counter() < deadline:
+            if self._cancelado():
+                return iterations, True
+            node = root
+            while (node.untried is not None and not node.untried and node.children
+                   and not node.terminal):
+                node = max(node.children.values(), key=lambda c: self._uct(node, c))
+            node = self._expandir(node)
+            cost = self._simular(node)
+            self._cost_min = min(self._cost_min, cost)
+            self._cost_max = max(self._cost_max, cost)
+            while node is not None:
+                node.visits += 1
+                node.cost_sum += cost
+                node = node.parent
+            iterations += 1
+        return iterations, False
+
+    def _crear_pool(self) -> ProcessPoolExecutor:
+        return ProcessPoolExecutor(
+            max_workers=self.workers - 1, initializer=_init_worker, initargs=(self._contexto,),
+        )
+
+    def _raiz_reutilizable(self, area: Area, pos: tuple[int, int]) -> TreeNode | None:
+        arbol = self._arbol
+        self._arbol = None
+        if not self.reuse_tree or arbol is None or arbol.pos != pos:
+            return None
+        real = self._clone_area(area)
+        if real.matrix[pos[0]][pos[1]] == est_celda.bomb:
+            real.matrix[pos[0]][pos[1]] = est_celda.c_fuego
+        if real.huella() != arbol.area.huella():
+            return None
+        arbol.parent = None
+        arbol.move = None
+        self._tree_size = self._contar(arbol)
+        return arbol
+
+    def _contar(self, node: TreeNode) -> int:
+        #Iterativo: un arbol reutilizado puede ser mas profundo que el limite de recursion
+        total = 0
+        pila = [node]
+        while pila:
+            actual = pila.pop()
+            total += 1
+            pila.extend(actual.children.values())
+        return total
+
+    def _empaquetar_arbol(self) -> dict[str, object] | None:
+        """
+        Arbol conservado para el checkpoint: el area de la raiz y, en preorden,
+        (padre, movimiento, visitas, suma de costos, untried, terminal) de cada
+        nodo. Las areas de los hijos no se guardan: se rehacen con _apply_move,
+        que es determinista.
+        """
+        if self._arbol is None:
+            return None
+        nodos: list[tuple] = []
+        pila: list[tuple[int, TreeNode]] = [(-1, self._arbol)]
+        while pila:
+            padre, node = pila.pop()
+            indice = len(nodos)
+            nodos.append((padre, node.move, node.visits, node.cost_sum,
+                          None if node.untried is None else list(node.untried), node.terminal))
+            pila.extend((indice, hijo) for hijo in reversed(list(node.children.values())))
+        return {"area": self._arbol.area, "pos": self._arbol.pos, "nodos": nodos}
+
+    def _desempaquetar_arbol(self, datos: dict[str, object] | None) -> TreeNode | None:
+        if datos is None:
+            return None
+        creados: list[TreeNode] = []
+        for padre, move, visits, cost_sum, untried, terminal in datos["nodos"]:
+            if padre < 0:
+                node = TreeNode(self._clone_area(datos["area"]), datos["pos"], None, move)
+            else:
+                base = creados[padre]
+                child_area = self._clone_area(base.area)
+                node = TreeNode(child_area, self._apply_move(child_area, base.pos, move), base, move)
+                base.children[move] = node
+            node.visits, node.cost_sum, node.untried, node.terminal = visits, cost_sum, untried, terminal
+            creados.append(node)
+        return creados[0]
+
+    def guardar_estado(self) -> dict[str, object]:
+        estado = super().guardar_estado()
+        estado["_arbol"] = self._empaquetar_arbol()
+        return estado
+
+    def cargar_estado(self, estado: dict[str, object]) -> None:
+        super().cargar_estado(estado)
+        self._arbol = self._desempaquetar_arbol(estado.get("_arbol"))
+
+    def siguiente_paso(
+        self,
+        i: int,
+        j: int,
+        area: Area,
+        forbidden: set[tuple[int, int]],
+    ) -> tuple[int, int]:
+        start = time.perf_counter()
+
+        root = self._raiz_reutilizable(area, (i, j))
+        reused = root is not None
+        if root is None:
+            root = self._nueva_raiz(area, (i, j))
+        else:
+            # Rango de costos de los nodos heredados.
+            self._cost_min = float("inf")
+            self._cost_max = float("-inf")
+            for child in root.children.values():
+                mean = child.cost_sum / child.visits
+                self._cost_min = min(self._cost_min, mean)
+                self._cost_max = max(self._cost_max, mean)
+        deadline = start + self.time_limit
+
+        futures = []
+        if self.workers > 1:
+            pool = self._get_pool()
+            params = {
+                "exploration": self.exploration,
+                "playout_depth": self.playout_depth,
+                "max_tree_nodes": self.max_tree_nodes,
+            }
+            self._publicar_area(root.area)
+            budget = max(0.0, deadline - time.perf_counter())
+            futures = [
+                pool.submit(_buscar_remoto, self._compartida.nombre, (i, j), params,
+                            self._rng.getrandbits(32), budget)
+                for _ in range(self.workers - 1)
+            ]
+
+        iterations, cancelado = self._buscar(root, deadline)
+        tree_size = self._tree_size
+        merged = {mv: (child.visits, child.cost_sum) for mv, child in root.children.items()}
+        for fut in futures:
+            stats, remote_iterations, remote_size = fut.result()
+            iterations += remote_iterations
+            tree_size += remote_size
+            for mv, (visits, cost_sum) in stats.items():
+                v0, c0 = merged.get(mv, (0, 0.0))
+                merged[mv] = (v0 + visits, c0 + cost_sum)
+
+        elapsed = time.perf_counter() - start
+        self.total_iterations += iterations
+        self.total_time += elapsed
+
+        best_move = (0, 0)
+        best_key = None
+        for mv, (visits, cost_sum) in merged.items():
+            key = (-visits, cost_sum / visits if visits else float("inf"))
+            if best_key is None or key < best_key:
+                best_key = key
+                best_move = mv
+        mean_cost = best_key[1] if best_key is not None else float(root.area.counts()[1])
+
+        child = root.children.get(best_move)
+        self._arbol = child
+        ref_area = child.area if child is not None else root.area
+        libres, quemadas, cortafuegos = ref_area.counts()
+        self._last_report = {
+            "nodes": iterations,
+            "status": ("cancelado" if cancelado else "ok") if merged else "no_move",
+            "elapsed_sec": elapsed,
+            "instants": ref_area.tick,
+            "iteraciones": iterations,
+            "iter_por_seg": iterations / elapsed if elapsed > 0 else 0.0,
+            "tamano_arbol": tree_size,
+            "arbol_reutilizado": reused,
+            "costo_medio": mean_cost,
+            "counts": {
+                "sin_afectar": libres,
+                "quemadas": quemadas,
+                "cortafuegos": cortafuegos,
+            },
+            "cerrado": ref_area.limite(),
+        }
+
+        ni, nj = i + best_move[0], j + best_move[1]
+        if not area.dentro(ni, nj) or area.matrix[ni][nj] != est_celda.sn_af:
+            return i, j
+        return ni, nj
+
+    def ultima_busqueda(self) -> dict[str, object]:
+        return dict(self._last_report)
+
+    def resumen_global(
+        self,
+        area: Area | None = None,
+        wall_time: float | None = None,
+    ) -> dict[str, object]:
+        return self._resumen(self.total_iterations, area, wall_time)
@@ -0,0 +1,213 @@
+from __future__ import annotations
+
+import struct
+import weakref
+from multiprocessing import shared_memory
+
+from area import Area
+from errors import InputFormatError
+
+# Areas en memoria compartida para los modos en paralelo. En vez de picklear
+# un Area (listas de listas de Enum) en cada tarea, el proceso principal
+# escribe la grilla empaquetada (un byte por celda, Area.to_bytes) en un
+# segmento con uno o mas slots y a los workers solo les manda
+# (nombre del segmento, slot, version). El worker se adjunta por nombre y lee
+# la vista sin copiar o saca una copia privada (Area) para modificarla.
+#
+# Disposicion del segmento:
+#   cabecera <4sII: MAGIC, n, slots
+#   por slot <QQ: tick, version (sube en cada escritura)
+#   por slot n*n bytes de celdas
+#
+# Ciclo de vida: el que crea el segmento es el dueño y es el unico que lo
+# borra (liberar). Si el dueño se olvida, un finalizador lo borra al
+# recolectarse el objeto o al salir del interprete. Los adjuntos solo cierran.
+
+MAGIC = b"PAIS"
+_CABECERA = struct.Struct("<4sII")
+_SLOT = struct.Struct("<QQ")
+
+
+def _borrar_segmento(shm: shared_memory.SharedMemory) -> None:
+    try:
+        shm.close()
+    except BufferError:
+        pass  # quedan vistas vivas: el mapeo se libera al morir el proceso
+    try:
+        shm.unlink()
+    except FileNotFoundError:
+        pass
+
+
+class SharedArea:
+    """
+    Segmento de memoria compartida con `slots` areas n x n empaquetadas.
+    - SharedArea.crear(n, slots) / SharedArea.desde_area(area): dueño.
+    - SharedArea.adjuntar(nombre): adjunto (en el worker).
+    - escribir(area, slot) / vista(slot) sin copia / leer(slot) copia privada.
+    Usar como context manager o llamar liberar() (dueño) / cerrar() (adjunto).
+    """
+
+    def __init__(self, shm: shared_memory.SharedMemory, n: int, slots: int, dueno: bool):
+        self._shm = shm
+        self.n = n
+        self.slots = slots
+        self.dueno = dueno
+        self._datos = _CABECERA.size + _SLOT.size * slots
+        self._finalizador = weakref.finalize(self, _borrar_segmento, shm) if dueno else None
+
+    @staticmethod
+    def tamano(n: int, slots: int) -> int:
+        return _CABECERA.size + slots * (_SLOT.size + n * n)
+
+    @classmethod
+    def crear(cls, n: int, slots: int = 1) -> "SharedArea":
+        if n <= 0 or slots <= 0:
+            raise ValueError("n y slots deben ser mayores que cero.")
+        shm = shared_memory.SharedMemory(create=True, size=cls.tamano(n, slots))
+        _CABECERA.pack_into(shm.buf, 0, MAGIC, n, slots)
+        for slot in range(slots):
+            _SLOT.pack_into(shm.buf, _CABECERA.size + slot * _SLOT.size, 0, 0)
+        return cls(shm, n, slots, dueno=True)
+
+    @classmethod
+    def desde_area(cls, area: Area, slots: int = 1) -> "SharedArea":
+        compartida = cls.crear(area.n, slots)
+        compartida.escribir(area, 0)
+        return compartida
+
+    @classmethod
+    def adjuntar(cls, nombre: str) -> "SharedArea":
+        try:
+            # Python 3.13+: el adjunto no se registra en el resource tracker
+            shm = shared_memory.SharedMemory(name=nombre, track=False)
+        except TypeError:
+            shm = shared_memory.SharedMemory(name=nombre)
+        magic, n, slots = _CABECERA.unpack_from(shm.buf, 0)
+        if magic != MAGIC:
+            shm.close()
+            raise InputFormatError(f"El segmento '{nombre}' no contiene areas compartidas.")
+        return cls(shm, n, slots, dueno=False)
+
+    @property
+    def nombre(self) -> str:
+        return self._shm.name
+
+    def _revisar_slot(self, slot: int) -> None:
+        if not 0 <= slot < self.slots:
+            raise IndexError(f"Slot {slot} fuera de rango (0..{self.slots - 1}).")
+
+    def _inicio(self, slot: int) -> int:
+        return self._datos + slot * self.n * self.n
+
+    def escribir(self, area: Area, slot: int = 0) -> int:
+        #Copia el area al slot y devuelve la nueva version del slot
+        self._revisar_slot(slot)
+        if area.n != self.n:
+            raise ValueError(f"El segmento es de {self.n}x{self.n} y el area de {area.n}x{area.n}.")
+        inicio = self._inicio(slot)
+        self._shm.buf[inicio:inicio + self.n * self.n] = area.to_bytes()
+        version = self.version(slot) + 1
+        _SLOT.pack_into(self._shm.buf, _CABECERA.size + slot * _SLOT.size, area.tick, version)
+        return version
+
+    def tick(self, slot: int = 0) -> int:
+        self._revisar_slot(slot)
+        return _SLOT.unpack_from(self._shm.buf, _CABECERA.size + slot * _SLOT.size)[0]
+
+    def version(self, slot: int = 0) -> int:
+        self._revisar_slot(slot)
+        return _SLOT.unpack_from(self._shm.buf, _CABECERA.size + slot * _SLOT.size)[1]
+
+    def vista(self, slot: int = 0) -> memoryview:
+        """
+        Bytes del slot sin copiar (solo lectura). La vista debe soltarse
+        (release o with) antes de cerrar el segmento.
+        """
+        self._revisar_slot(slot)
+        inicio = self._inicio(slot)
+        return self._shm.buf[inicio:inicio + self.n * self.n].toreadonly()
+
+    def leer(self, slot: int = 0) -> Area:
+        #Copia privada del slot: se puede modificar sin tocar el segmento
+        with self.vista(slot) as datos:
+            data = bytes(datos)
+        return Area.from_bytes(data, self.n, tick=self.tick(slot))
+
+    def cerrar(self) -> None:
+        if self._finalizador is not None and self._finalizador.alive:
+            # el dueño no solo cierra: tambien borra el segmento
+            self._finalizador()
+            return
+        try:
+            self._shm.close()
+        except BufferError:
+            pass
+
+    def liberar(self) -> None:
+        if not self.dueno:
+            raise RuntimeError("Solo el dueño del segmento puede liberarlo.")
+        self.cerrar()
+
+    def __enter__(self) -> "SharedArea":
+        return self
+
+    def __exit__(self, *exc: object) -> None:
+        self.cerrar()
+
+
+# Adjuntos de cada worker, por nombre. Se cierran los mas viejos para no
+# acumular segmentos que el dueño ya borro.
+_adjuntos: dict[str, SharedArea] = {}
+MAX_ADJUNTOS = 4
+
+
+def adjuntar_cacheada(nombre: str) -> SharedArea:
+    compartida = _adjuntos.get(nombre)
+    if compartida is None:
+        while len(_adjuntos) >= MAX_ADJUNTOS:
+            viejo = next(iter(_adjuntos))
+            _adjuntos.pop(viejo).cerrar()
+        compartida = SharedArea.adjuntar(nombre)
+        _adjuntos[nombre] = compartida
+    return compartida
+
+
+class RecursosCompartidos:
+    """
+    Ciclo de vida comun de las estrategias en paralelo: el segmento con el
+    area de la decision (se recrea si cambia n o faltan slots) y el pool de
+    procesos, creado la primera vez con _crear_pool. cerrar() libera ambos.
+    """
+
+    _pool = None
+    _compartida: SharedArea | None = None
+
+    def _crear_pool(self):
+        raise NotImplementedError
+
+    def _get_pool(self):
+        if self._pool is None:
+            self._pool = self._crear_pool()
+        return self._pool
+
+    def _reservar_compartida(self, n: int, slots: int = 1, reserva: int = 0) -> SharedArea:
+        #Segmento con al menos `slots`; si se recrea, con max(slots, reserva)
+        compartida = self._compartida
+        if compartida is None or compartida.n != n or compartida.slots < slots:
+            if compartida is not None:
+                compartida.liberar()
+            self._compartida = SharedArea.crear(n, max(slots, reserva))
+        return self._compartida
+
+    def _publicar_area(self, area: Area) -> int:
+        #Deja el area de la decision en el slot 0 y devuelve su version
+        return self._reservar_compartida(area.n).escribir(area)
+
+    def cerrar(self) -> None: #libera el pool de procesos y el segmento compartido
+        if self._pool is not None:
+            self._pool.shutdown(wait=True, cancel_futures=True)
+            self._pool = None
+        if self._compartida is not None:
+            self._compartida.liberar()
+            self._compartida = None
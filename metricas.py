@@ -0,0 +1,178 @@
+from __future__ import annotations
+
+import csv
+import json
+import math
+import os
+import sys
+from array import array
+
+from area import Area
+from celdas import est_celda
+
+# Metricas por tick de una corrida, en columnas tipadas (modulo array) en vez
+# de una lista de dicts: cada tick agrega un valor por columna y las columnas
+# se agrandan al doble cuando se llenan, asi registrar cuesta O(cambios del
+# tick). Los conteos por estado no recorren la grilla: se toman una vez con
+# area.counts() y despues se ajustan con las transiciones (viejo, nuevo) que
+# Simulation.step ya conoce, sin guardar una copia de la grilla.
+#
+# Exportacion:
+#   - exportar_csv(path): una fila por tick.
+#   - exportar_columnas(directorio): un archivo binario crudo por columna
+#     (<columna>.bin, array.tofile) y esquema.json con filas, tipos y orden de
+#     bytes; cargar_columnas(directorio) los vuelve a leer.
+
+# (nombre, typecode de array)
+COLUMNAS: tuple[tuple[str, str], ...] = (
+    ("tick", "i"),
+    ("quemadas", "i"),
+    ("sin_afectar", "i"),
+    ("cortafuegos", "i"),
+    ("frente", "i"),        # celdas que se quemarian en el proximo tick
+    ("nodos", "q"),         # nodos/evaluaciones de la busqueda del tick (0 sin busqueda)
+    ("latencia", "d"),      # segundos del step completo
+)
+CAPACIDAD = 256
+
+
+class MetricsRecorder:
+    """
+    Serie de tiempo por tick de la simulacion (Simulation(metricas=...)).
+    - columna(nombre): valores registrados (array).
+    - percentiles(nombre, ps): percentiles por rango mas cercano.
+    - resumen(): ticks, quemadas finales y percentiles de latencia.
+    - exportar_csv / exportar_columnas / cargar_columnas.
+    """
+
+    def __init__(self, capacidad: int = CAPACIDAD):
+        if capacidad <= 0:
+            raise ValueError("La capacidad debe ser mayor que cero.")
+        self.capacidad = capacidad
+        self._columnas = {
+            nombre: array(tipo, bytes(array(tipo).itemsize * capacidad)) for nombre, tipo in COLUMNAS
+        }
+        self.filas = 0
+        self._conteos: dict[est_celda, int] = {}
+
+    def __len__(self) -> int:
+        return self.filas
+
+    def sincronizar(self, area: Area) -> None:
+        #Rehace los conteos desde el area (al iniciar o reanudar); la celda del bombero no se cuenta
+        libres, quemadas, cortafuegos = area.counts()
+        self._conteos = {est_celda.sn_af: libres, est_celda.fuego: quemadas, est_celda.c_fuego: cortafuegos}
+
+    def iniciar(self, area: Area) -> None:
+        self.filas = 0
+        self.sincronizar(area)
+
+    def _crecer(self) -> None:
+        for nombre, tipo in COLUMNAS:
+            self._columnas[nombre].extend(array(tipo, bytes(array(tipo).itemsize * self.capacidad)))
+        self.capacidad *= 2
+
+    def registrar(
+        self,
+        tick: int,
+        transiciones: list[tuple[est_celda, est_celda]],
+        frente: int,
+        nodos: int,
+        latencia: float,
+    ) -> None:
+        """
+        Agrega la fila del tick. `transiciones` son los cambios de estado del
+        tick como pares (viejo, nuevo), uno por celda escrita.
+        """
+        conteos = self._conteos
+        for viejo, nuevo in transiciones:
+            if viejo != nuevo:
+                if viejo in conteos:
+                    conteos[viejo] -= 1
+                if nuevo in conteos:
+                    conteos[nuevo] += 1
+        if self.filas == self.capacidad:
+            self._crecer()
+        fila = self.filas
+        cols = self._columnas
+        cols["tick"][fila] = tick
+        cols["quemadas"][fila] = conteos[est_celda.fuego]
+        cols["sin_afectar"][fila] = conteos[est_celda.sn_af]
+        cols["cortafuegos"][fila] = conteos[est_celda.c_fuego]
+        cols["frente"][fila] = frente
+        cols["nodos"][fila] = nodos
+        cols["latencia"][fila] = latencia
+        self.filas += 1
+
+    def columna(self, nombre: str) -> array:
+        if nombre not in self._columnas:
+            raise KeyError(f"Columna desconocida '{nombre}'. Opciones: {[c for c, _ in COLUMNAS]}.")
+        return self._columnas[nombre][:self.filas]
+
+    def percentiles(self, nombre: str = "latencia", ps: tuple[float, ...] = (50, 90, 99)) -> dict[float, float]:
+        valores = sorted(self.columna(nombre))
+        if not valores:
+            return {p: 0.0 for p in ps}
+        total = len(valores)
+        # rango mas cercano: el menor valor con al menos p% de los datos debajo o igual
+        return {p: valores[min(total - 1, max(0, math.ceil(p * total / 100) - 1))] for p in ps}
+
+    def resumen(self) -> dict[str, object]:
+        latencias = self.percentiles("latencia", (50, 95, 99))
+        ultima = self.filas - 1
+        return {
+            "ticks": self.filas,
+            "quemadas": self._columnas["quemadas"][ultima] if self.filas else None,
+            "latencia_p50": latencias[50],
+            "latencia_p95": latencias[95],
+            "latencia_p99": latencias[99],
+            "latencia_total": sum(self.columna("latencia")),
+            "nodos_total": sum(self.columna("nodos")),
+        }
+
+    def exportar_csv(self, path: str) -> None:
+        nombres = [c for c, _ in COLUMNAS]
+        columnas = [self.columna(c) for c in nombres]
+        with open(path, "w", newline="", encoding="utf-8") as f:
+            escritor = csv.writer(f)
+            escritor.writerow(nombres)
+            escritor.writerows(zip(*columnas))
+
+    def exportar_columnas(self, directorio: str) -> str:
+        """
+        Escribe un <columna>.bin por columna y esquema.json. Devuelve la ruta
+        del esquema.
+        """
+        os.makedirs(directorio, exist_ok=True)
+        esquema = {"filas": self.filas, "byteorder": sys.byteorder, "columnas": []}
+        for nombre, tipo in COLUMNAS:
+            archivo = f"{nombre}.bin"
+            with open(os.path.join(directorio, archivo), "wb") as f:
+                self.columna(nombre).tofile(f)
+            esquema["columnas"].append({
+                "nombre": nombre,
+                "tipo": tipo,
+                "itemsize": array(tipo).itemsize,
+                "archivo": archivo,
+            })
+        ruta = os.path.join(directorio, "esquema.json")
+        with open(ruta, "w", encoding="utf-8") as f:
+            json.dump(esquema, f, indent=2)
+        return ruta
+
+
+def cargar_columnas(directorio: str) -> dict[str, array]:
+    #Lee lo escrito por exportar_columnas (corrige el orden de bytes si hace falta)
+    with open(os.path.join(directorio, "esquema.json"), encoding="utf-8") as f:
+        esquema = json.load(f)
+    columnas: dict[str, array] = {}
+    for col in esquema["columnas"]:
+        valores = array(col["tipo"])
+        if valores.itemsize != col["itemsize"]:
+            raise ValueError(f"La columna '{col['nombre']}' se escribio con otro tamaño de {col['tipo']}.")
+        with open(os.path.join(directorio, col["archivo"]), "rb") as f:
+            valores.fromfile(f, esquema["filas"])
+        if esquema["byteorder"] != sys.byteorder:
+            valores.byteswap()
+        columnas[col["nombre"]] = valores
+    return columnas
@@ -0,0 +1,166 @@
+from __future__ import annotations
+
+import random
+import time
+
+from area import Area
+from bitboard import BitGrid
+from celdas import est_celda
+
+# Evaluacion Monte Carlo de planes bajo expansion estocastica del fuego.
+# Los M futuros de un plan se simulan juntos: cada futuro es una grilla del
+# mismo bitboard (ver bitboard.py), asi un tick de los M es un puñado de
+# operaciones sobre enteros en vez de M simulaciones en Python.
+# Numeros aleatorios comunes: la mascara de igniciones del tick t depende solo
+# de (semilla, t), asi todos los planes de una decision se comparan contra los
+# mismos futuros y la diferencia entre planes tiene mucha menos varianza.
+
+
+class MonteCarloEvaluator:
+    """
+    Evalua planes de ILS/VNS (mismas reglas que _evaluate_plan) sobre
+    `muestras` futuros con prob_ignicion por celda y salto.
+    - preparar(area, pos, semilla): fija el estado inicial de la decision.
+    - evaluar(plan): (costo medio, score medio, area de una muestra,
+      pos de esa muestra, pasos medios); la varianza queda en el reporte.
+    """
+
+    def __init__(
+        self,
+        prob_ignicion: float,
+        muestras: int = 32,
+        tasa: int = 1,
+        max_ticks: int = 10_000,
+    ):
+        if not 0.0 < prob_ignicion <= 1.0:
+            raise ValueError("prob_ignicion debe estar en (0, 1].")
+        if muestras <= 0:
+            raise ValueError("muestras debe ser mayor que cero.")
+        self.prob_ignicion = prob_ignicion
+        self.muestras = muestras
+        self.tasa = tasa
+        self.max_ticks = max_ticks
+        self._grid: BitGrid | None = None
+        self._base: tuple[int, int, int] = (0, 0, 0)
+        self._pos: tuple[int, int] = (0, 0)
+        self._tick = 0
+        self._semilla = 0
+        self._mascaras: dict[int, list[int]] = {}
+        self._reiniciar_reporte()
+
+    def _reiniciar_reporte(self) -> None:
+        self.evaluaciones = 0
+        self.tiempo = 0.0
+        self.suma_varianza = 0.0
+
+    def preparar(self, area: Area, pos: tuple[int, int], semilla: int) -> None:
+        if self._grid is None or self._grid.n != area.n:
+            self._grid = BitGrid(area.n, self.muestras)
+        uno = BitGrid(area.n, 1)
+        planos = uno.planos([area])
+        fuego, corta, bomb = planos[est_celda.fuego], planos[est_celda.c_fuego], planos[est_celda.bomb]
+        # Igual que _evaluate_plan: la celda del bombero pasa a cortafuego.
+        bit = 1 << uno.indice(0, *pos)
+        if bomb & bit:
+            bomb &= ~bit
+            corta |= bit
+        grid = self._grid
+        self._base = (grid.replicar(fuego), grid.replicar(corta), grid.replicar(bomb))
+        self._pos = pos
+        self._tick = area.tick
+        self._semilla = semilla
+        self._mascaras = {}
+        self._reiniciar_reporte()
+
+    def _mascaras_tick(self, t: int) -> list[int]:
+        if t not in self._mascaras:
+            rng = random.Random(f"{self._semilla}:{t}")
+            self._mascaras[t] = [
+                self._grid.aleatorio(rng, self.prob_ignicion) for _ in range(max(1, self.tasa))
+            ]
+        return self._mascaras[t]
+
+    def evaluar(self, plan: list[tuple[int, int]]) -> tuple[float, float, Area, tuple[int, int], float]:
+        start = time.perf_counter()
+        grid = self._grid
+        m = self.muestras
+        fuego, corta, bomb = self._base
+        pos = [self._pos] * m
+        pasos = [0] * m
+        activos = list(range(m))
+        t = 0
+
+        for di, dj in plan:
+            if not activos:
+                break
+            #1 cortafuego en la celda actual (si esta sin afectar o es bombero)
+            actual = grid.de_indices(grid.indice(k, *pos[k]) for k in activos)
+            nuevo = actual & ~(fuego | corta)
+            corta |= nuevo
+            bomb &= ~nuevo
+            #2 movimiento si el destino esta dentro y sin afectar
+            libre = grid.mascara & ~(fuego | corta | bomb)
+            candidatos: list[int] = []
+            indices: list[int] = []
+            for k in activos:
+                ni, nj = pos[k][0] + di, pos[k][1] + dj
+                if 0 <= ni < grid.n and 0 <= nj < grid.n:
+                    candidatos.append(k)
+                    indices.append(grid.indice(k, ni, nj))
+            for k, ok in zip(candidatos, grid.bits_en(libre, indices)):
+                if ok:
+                    pos[k] = (pos[k][0] + di, pos[k][1] + dj)
+            #3 la celda nueva queda como cortafuego
+            nueva = grid.de_indices(grid.indice(k, *pos[k]) for k in activos)
+            corta |= nueva
+            fuego &= ~nueva
+            bomb &= ~nueva
+            #4 expansion muestreada
+            libre = grid.mascara & ~(fuego | corta | bomb)
+            fuego |= grid.propagar(fuego, corta, libre, self.tasa, self._mascaras_tick(t))
+            t += 1
+            for k in activos:
+                pasos[k] += 1
+            # los futuros sin expansion posible dejan de seguir el plan
+            libre = grid.mascara & ~(fuego | corta | bomb)
+            siguen = grid.no_vacios(grid.propagar(fuego, corta, libre, 1))
+            activos = [k for k in activos if siguen[k]]
+
+        # Rollout pasivo: el bombero queda quieto hasta que nada pueda quemarse.
+        while t < self.max_ticks:
+            libre = grid.mascara & ~(fuego | corta | bomb)
+            if not grid.propagar(fuego, corta, libre, 1):
+                break
+            fuego |= grid.propagar(fuego, corta, libre, self.tasa, self._mascaras_tick(t))
+            t += 1
+
+        quemadas = grid.conteos(fuego)
+        cortas = grid.conteos(corta)
+        costos = [float(q) for q in quemadas]
+        scores = [q - 0.05 * c + 0.02 * p for q, c, p in zip(quemadas, cortas, pasos)]
+        media = sum(costos) / m
+        varianza = sum((c - media) ** 2 for c in costos) / (m - 1) if m > 1 else 0.0
+
+        self.evaluaciones += 1
+        self.suma_varianza += varianza
+        self.tiempo += time.perf_counter() - start
+
+        muestra = grid.area(
+            {est_celda.fuego: fuego, est_celda.c_fuego: corta, est_celda.bomb: bomb},
+            0,
+            tick=self._tick + t,
+        )
+        return media, sum(scores) / m, muestra, pos[0], sum(pasos) / m
+
+    def reporte(self) -> dict[str, object]:
+        #Varianza media del costo entre futuros y rendimiento de la ultima decision
+        evals = self.evaluaciones
+        varianza = self.suma_varianza / evals if evals else 0.0
+        return {
+            "muestras": self.muestras,
+            "prob_ignicion": self.prob_ignicion,
+            "evaluaciones": evals,
+            "varianza_costo": varianza,
+            "error_estandar": (varianza / self.muestras) ** 0.5,
+            "futuros_por_seg": evals * self.muestras / self.tiempo if self.tiempo > 0 else None,
+        }
@@ -0,0 +1,286 @@
+from __future__ import annotations
+
+import hashlib
+import multiprocessing as mp
+import time
+from multiprocessing.connection import wait
+
+from strategy import strategy_bombero
+from area import Area
+from branch_and_bound import BranchAndBound
+from cancelacion import CancelToken
+from iterated_local_search import IteratedLocalSearch
+from memoria_compartida import RecursosCompartidos, adjuntar_cacheada
+from variable_neighborhood_search import VariableNeighborhoodSearch
+
+# Portafolio de estrategias: en cada siguiente_paso B&B, ILS y VNS buscan a la
+# vez, cada una en su propio proceso (persistente durante la corrida, asi
+# conserva su estado entre ticks: planes tibios, RNG, contadores). El area de
+# la decision viaja por memoria compartida y el mejor costo encontrado hasta
+# ahora se comparte en un mp.Value: cada mejora de un miembro lo baja y todos
+# lo usan como cota de poda (usar_cota_externa). Gana el primer movimiento del
+# miembro con menor costo (empate: el primero de `miembros`).
+#
+# Reparto del tiempo: cada miembro recibe time_limit * cuota, donde la cuota
+# sale de sus victorias en la instancia (el que mas gana usa el tiempo
+# completo, los demas al menos cuota_minima). Al vencer el plazo se avisa a
+# los miembros por un CancelToken y devuelven lo mejor que tengan; el que no
+# responde dentro de PLAZO_CORTE se termina y se vuelve a lanzar en la
+# siguiente decision. Un miembro que falla responde con status "error".
+
+MIEMBROS = {
+    "bnb": BranchAndBound,
+    "ils": IteratedLocalSearch,
+    "vns": VariableNeighborhoodSearch,
+}
+_SIN_COSTO = float("inf")
+
+
+def _servir(conexion, nombre: str, params: dict[str, object], contexto, mejor, parar) -> None:
+    #Proceso de un miembro: atiende decisiones hasta recibir None
+    estrategia = MIEMBROS[nombre](**params)
+    estrategia.usar_contexto(contexto)
+    estrategia.AVISO_INTERVALO = 0.0  # cada mejora se publica enseguida
+
+    def publicar(evento: dict) -> None:
+        costo = evento.get("mejor_costo")
+        if costo is None:
+            return
+        with mejor.get_lock():
+            if costo < mejor.value:
+                mejor.value = costo
+
+    estrategia.usar_cota_externa(lambda: mejor.value)
+    while True:
+        try:
+            tarea = conexion.recv()
+        except EOFError:  # el portafolio ya no existe
+            break
+        if tarea is None:
+            break
+        nombre_area, i, j, forbidden, limite = tarea
+        try:
+            area = adjuntar_cacheada(nombre_area).leer(0)
+            estrategia.time_limit = limite
+            estrategia.usar_cancelacion(CancelToken(fuente=parar.is_set), progreso=publicar)
+            mv = estrategia.siguiente_paso(i, j, area, forbidden)
+            reporte = estrategia.ultima_busqueda()
+            publicar(reporte)
+        except Exception as e:
+            # el miembro sigue vivo para la siguiente decision, pero esta no compite
+            mv, reporte = None, {"status": "error", "error": repr(e), "nodes": 0, "mejor_costo": None}
+        conexion.send((mv, reporte))
+    conexion.close()
+
+
+class PortfolioStrategy(RecursosCompartidos, strategy_bombero):
+    """
+    Portafolio de estrategias en paralelo (un proceso por miembro).
+    - miembros: nombres de MIEMBROS, en orden de desempate.
+    - parametros: parametros por miembro ({"bnb": {...}, ...}); ILS y VNS
+      reciben ademas la semilla del portafolio.
+    - historial: victorias por instancia (hash del area en la primera
+      decision). Por defecto es propio del portafolio; pasar el mismo dict a
+      varias corridas (p. ej. las 10 semillas de un input) para compartirlo.
+    Llamar cerrar() al terminar para detener los procesos.
+    """
+
+    _estado_campos = ("total_nodes", "total_time", "_last_report", "_instancia", "victorias")
+    GRACIA = 0.05  # segundos extra antes de pedirle a los miembros que corten
+    PLAZO_CORTE = 1.0  # segundos que se espera a un miembro despues de pedirle que corte
+
+    def __init__(
+        self,
+        miembros: tuple[str, ...] = ("bnb", "ils", "vns"),
+        time_limit: float = 1.0,
+        cuota_minima: float = 0.25,
+        seed: int | None = None,
+        parametros: dict[str, dict[str, object]] | None = None,
+        historial: dict[str, dict[str, int]] | None = None,
+    ):
+        desconocidos = [m for m in miembros if m not in MIEMBROS]
+        if not miembros or desconocidos:
+            raise ValueError(f"Miembros invalidos {desconocidos}. Opciones: {tuple(MIEMBROS)}.")
+        self.miembros = tuple(miembros)
+        self.time_limit = time_limit
+        self.cuota_minima = cuota_minima
+        self.seed = seed
+        self.parametros = parametros or {}
+        self._historial = {} if historial is None else historial
+        self._instancia: str | None = None
+        self.victorias: dict[str, int] = {m: 0 for m in self.miembros}
+        self.total_nodes = 0
+        self.total_time = 0.0
+        self._last_report: dict[str, object] = {}
+        self._procesos: dict[str, tuple[mp.Process, object]] = {}
+        self._mejor = None
+        self._parar = None
+
+    def _params_miembro(self, nombre: str) -> dict[str, object]:
+        params = dict(self.parametros.get(nombre, {}))
+        if nombre != "bnb" and self.seed is not None:
+            params.setdefault("seed", self.seed)
+        return params
+
+    def _get_procesos(self) -> dict[str, tuple[mp.Process, object]]:
+        #Lanza los miembros que falten (al inicio o tras descartar uno que no respondio)
+        if self._mejor is None:
+            self._mejor = mp.Value("d", _SIN_COSTO)
+            self._parar = mp.Event()
+        for nombre in self.miembros:
+            if nombre not in self._procesos:
+                principal, hijo = mp.Pipe()
+                proceso = mp.Process(
+                    target=_servir,
+                    args=(hijo, nombre, self._params_miembro(nombre), self._contexto, self._mejor, self._parar),
+                    daemon=True,
+                )
+                proceso.start()
+                hijo.close()
+                self._procesos[nombre] = (proceso, principal)
+        return self._procesos
+
+    def _descartar(self, nombre: str) -> None:
+        #Termina un miembro caido o colgado; _get_procesos lo relanza
+        proceso, conexion = self._procesos.pop(nombre)
+        if proceso.is_alive():
+            proceso.terminate()
+        proceso.join()
+        conexion.close()
+
+    def cerrar(self) -> None: #detiene los procesos y libera el segmento compartido
+        for proceso, conexion in self._procesos.values():
+            try:
+                conexion.send(None)
+            except (BrokenPipeError, OSError):
+                pass
+        for proceso, conexion in self._procesos.values():
+            proceso.join(timeout=1.0)
+            if proceso.is_alive():
+                proceso.terminate()
+                proceso.join()
+            conexion.close()
+        self._procesos = {}
+        super().cerrar()
+
+    def cuotas(self) -> dict[str, float]:
+        """
+        Fraccion de time_limit de cada miembro segun sus victorias en la
+        instancia actual (suavizadas con +1 para que nadie quede en cero).
+        """
+        ganadas = self._historial.get(self._instancia, {}) if self._instancia is not None else {}
+        pesos = {m: ganadas.get(m, 0) + 1 for m in self.miembros}
+        tope = max(pesos.values())
+        return {m: max(self.cuota_minima, p / tope) for m, p in pesos.items()}
+
+    def siguiente_paso(
+        self,
+        i: int,
+        j: int,
+        area: Area,
+        forbidden: set[tuple[int, int]],
+    ) -> tuple[int, int]:
+        start = time.perf_counter()
+        if self._instancia is None:
+            self._instancia = hashlib.sha1(area.huella()).hexdigest()
+
+        # el segmento se crea antes que los procesos: asi heredan el mismo
+        # resource tracker y no lo dan por filtrado al salir
+        self._publicar_area(area)
+        procesos = self._get_procesos()
+        with self._mejor.get_lock():
+            self._mejor.value = _SIN_COSTO
+        self._parar.clear()
+        cuotas = self.cuotas()
+        pendientes = {}
+        for nombre, (_, conexion) in procesos.items():
+            conexion.send((self._compartida.nombre, i, j, set(forbidden), self.time_limit * cuotas[nombre]))
+            pendientes[conexion] = nombre
+
+        status = "ok"
+        deadline = start + self.time_limit + self.GRACIA
+        corte = None
+        resultados: dict[str, tuple[tuple[int, int] | None, dict[str, object]]] = {}
+        while pendientes:
+            ahora = time.perf_counter()
+            if corte is None:
+                if self._cancelado():
+                    status = "cancelado"
+                elif ahora >= deadline:
+                    status = "time_limit"
+                if status != "ok":
+                    self._parar.set()
+                    corte = ahora + self.PLAZO_CORTE
+            elif ahora >= corte:
+                for conexion, nombre in pendientes.items():
+                    resultados[nombre] = (None, {"status": "sin_respuesta", "nodes": 0, "mejor_costo": None})
+                    self._descartar(nombre)
+                break
+            espera = max(0.0, min(0.05, deadline - ahora))
+            for conexion in wait(list(pendientes), timeout=espera or 0.01):
+                nombre = pendientes.pop(conexion)
+                try:
+                    resultados[nombre] = conexion.recv()
+                except (EOFError, OSError) as e:
+                    # el proceso del miembro murio
+                    resultados[nombre] = (None, {"status": "error", "error": repr(e), "nodes": 0, "mejor_costo": None})
+                    self._descartar(nombre)
+
+        # gana el menor costo; los miembros sin costo final (B&B dominado o sin
+        # hoja) no compiten y los que fallaron tampoco tienen movimiento
+        validos = [nombre for nombre in self.miembros if resultados[nombre][0] is not None]
+        ganador = validos[0] if validos else None
+        mejor_costo = None
+        for nombre in validos:
+            costo = resultados[nombre][1].get("mejor_costo")
+            if costo is not None and (mejor_costo is None or costo < mejor_costo):
+                ganador, mejor_costo = nombre, costo
+        if mejor_costo is not None:
+            self.victorias[ganador] += 1
+            ganadas = self._historial.setdefault(self._instancia, {})
+            ganadas[ganador] = ganadas.get(ganador, 0) + 1
+
+        if ganador is None:
+            # ningun miembro respondio: el bombero se queda quieto
+            status = "error"
+            mv, reporte = (i, j), {}
+        else:
+            mv, reporte = resultados[ganador]
+        elapsed = time.perf_counter() - start
+        nodos = sum(int(r.get("nodes", 0)) for _, r in resultados.values())
+        self.total_nodes += nodos
+        self.total_time += elapsed
+        self._last_report = {
+            "nodes": nodos,
+            "status": status,
+            "elapsed_sec": elapsed,
+            "instants": reporte.get("instants"),
+            "counts": reporte.get("counts"),
+            "cerrado": reporte.get("cerrado"),
+            "mejor_costo": mejor_costo,
+            "ganador": ganador,
+            "miembros": {
+                nombre: {
+                    "status": r.get("status"),
+                    "mejor_costo": r.get("mejor_costo"),
+                    "nodes": r.get("nodes"),
+                    "cuota": cuotas[nombre],
+                }
+                for nombre, (_, r) in resultados.items()
+            },
+        }
+        self._avisar({"tick": area.tick, "ganador": ganador, "mejor_costo": mejor_costo})
+        return mv
+
+    def ultima_busqueda(self) -> dict[str, object]:
+        return dict(self._last_report)
+
+    def resumen_global(
+        self,
+        area: Area | None = None,
+        wall_time: float | None = None,
+    ) -> dict[str, object]:
+        return {
+            **self._resumen(self.total_nodes, area, wall_time),
+            "victorias": dict(self.victorias),
+        }
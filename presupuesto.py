@@ -0,0 +1,130 @@
+from __future__ import annotations
+
+import time
+
+from area import Area
+
+
+class TimeBudgetScheduler:
+    """
+    Reparte un presupuesto global de tiempo (segundos de reloj para toda la
+    corrida de Simulation.run_until_stable) en limites por tick.
+    - Base: presupuesto restante / ticks restantes estimados (celdas libres
+      sobre tamano del frente, acotado por el tamano del mapa).
+    - Frente: los ticks con frente mas grande que el promedio reciben mas.
+    - Mejora: si la estimacion de quemadas finales de la estrategia sigue
+      bajando se invierte mas; si se estanco, menos.
+    El limite asignado se copia en estrategia.time_limit antes de cada paso.
+    Como las estrategias revisan el limite entre evaluaciones, se descuenta
+    el exceso promedio observado para no pasarse del presupuesto total. Con
+    el presupuesto agotado el limite es 0: la estrategia se queda con su
+    plan inicial sin buscar, asi el exceso total no crece tick a tick.
+    """
+
+    def __init__(
+        self,
+        total_budget: float,
+        min_tick: float = 0.01,
+        max_tick: float | None = None,
+        history: int = 3,
+    ):
+        if total_budget <= 0:
+            raise ValueError("El presupuesto total debe ser mayor que cero.")
+        self.total_budget = total_budget
+        self.min_tick = min_tick
+        self.max_tick = max_tick
+        self.history = history
+        self._start: float | None = None
+        self._fronts: list[int] = []
+        self._predicciones: list[float] = []
+        self._asignaciones: list[dict[str, float]] = []
+
+    def iniciar(self) -> None: #reinicia el reloj y el historial
+        self._start = time.perf_counter()
+        self._fronts = []
+        self._predicciones = []
+        self._asignaciones = []
+
+    def restante(self) -> float:
+        if self._start is None:
+            return self.total_budget
+        return self.total_budget - (time.perf_counter() - self._start)
+
+    def _ticks_restantes(self, area: Area, frente: int, libres: int | None) -> float:
+        if libres is None:
+            libres = area.counts()[0]
+        return min(max(1.0, libres / max(1, frente)), float(2 * area.n))
+
+    def _factor_frente(self, frente: int) -> float:
+        if not self._fronts:
+            return 1.0
+        promedio = sum(self._fronts) / len(self._fronts)
+        if promedio <= 0:
+            return 1.0
+        return min(2.0, max(0.5, frente / promedio))
+
+    def _factor_mejora(self) -> float:
+        if len(self._predicciones) < 2:
+            return 1.0
+        recientes = self._predicciones[-(self.history + 1):]
+        bajas = [max(0.0, a - b) for a, b in zip(recientes, recientes[1:])]
+        tasa = sum(bajas) / len(bajas)
+        return 0.6 + 0.9 * tasa / (tasa + 1.0)
+
+    def _exceso_promedio(self) -> float:
+        excesos = [
+            max(0.0, a["usado"] - a["asignado"]) for a in self._asignaciones if "usado" in a
+        ]
+        if not excesos:
+            return 0.0
+        return sum(excesos) / len(excesos)
+
+    def limite_tick(self, area: Area, frente: int, libres: int | None = None) -> float:
+        """
+        Limite de tiempo para el siguiente siguiente_paso. frente es la
+        cantidad de celdas que se quemarian en el proximo tick y libres las
+        celdas sin afectar (Simulation lleva la cuenta; si falta se recuenta
+        el mapa).
+        """
+        if self._start is None:
+            self.iniciar()
+        restante = self.restante()
+        if restante <= 0:
+            limite = 0.0
+        elif restante <= self.min_tick:
+            limite = self.min_tick
+        else:
+            base = restante / self._ticks_restantes(area, frente, libres)
+            limite = base * self._factor_frente(frente) * self._factor_mejora()
+            limite = min(limite, restante) - self._exceso_promedio()
+            limite = max(limite, self.min_tick)
+        if self.max_tick is not None:
+            limite = min(limite, self.max_tick)
+        self._fronts.append(frente)
+        self._asignaciones.append({
+            "tick": float(area.tick),
+            "frente": float(frente),
+            "asignado": limite,
+            "restante": max(0.0, restante),
+        })
+        return limite
+
+    def registrar(self, usado: float, reporte: dict[str, object] | None = None) -> None:
+        #Anota el tiempo real del paso y la estimacion de quemadas de la estrategia
+        if self._asignaciones:
+            self._asignaciones[-1]["usado"] = usado
+        if reporte:
+            counts = reporte.get("counts")
+            if isinstance(counts, dict) and counts.get("quemadas") is not None:
+                self._predicciones.append(float(counts["quemadas"]))
+
+    def reporte(self) -> dict[str, object]:
+        usado = sum(a.get("usado", 0.0) for a in self._asignaciones)
+        return {
+            "presupuesto_sec": self.total_budget,
+            "usado_sec": usado,
+            "excedido_sec": max(0.0, -self.restante()),
+            "ticks": len(self._asignaciones),
+            "ticks_agotados": sum(1 for a in self._asignaciones if a["asignado"] == 0.0),
+            "asignaciones": [dict(a) for a in self._asignaciones],
+        }
@@ -0,0 +1,240 @@
+from __future__ import annotations
+
+import argparse
+import itertools
+import math
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from comp_bombero import bombero
+from comp_fuego import fuego
+from iterated_local_search import IteratedLocalSearch
+from loader import data_carga_cacheada
+from resultados_db import ResultStore, hash_instancia, parametros
+from simulation import Simulation
+from variable_neighborhood_search import VariableNeighborhoodSearch
+
+# Ajuste de parametros por carreras (racing, estilo F-Race simplificado).
+# Las configuraciones candidatas corren por bloques de trabajos
+# (instancia, semilla) en un pool de procesos; despues de cada bloque se
+# eliminan las que son estadisticamente peores que la mejor (t pareado de
+# una cola sobre el costo), asi el tiempo se concentra en las prometedoras.
+
+ESTRATEGIAS = {"ils": IteratedLocalSearch, "vns": VariableNeighborhoodSearch}
+
+# Espacios por defecto alrededor de los valores de __init__.
+ESPACIOS: dict[str, dict[str, list[object]]] = {
+    "ils": {
+        "horizon": [4, 6, 8],
+        "max_evaluations": [60, 120, 240],
+        "perturbation_strength": [1, 2, 3],
+        "greedy_bias": [0.3, 0.45, 0.7],
+    },
+    "vns": {
+        "k_max": [2, 3, 4],
+        "max_iterations": [30, 60, 120],
+        "local_search_steps": [3, 6, 10],
+    },
+}
+
+# t de Student de una cola al 95% por grados de libertad (1..30).
+_T95 = [
+    6.314, 2.920, 2.353, 2.132, 2.015, 1.943, 1.895, 1.860, 1.833, 1.812,
+    1.796, 1.782, 1.771, 1.761, 1.753, 1.746, 1.740, 1.734, 1.729, 1.725,
+    1.721, 1.717, 1.714, 1.711, 1.708, 1.706, 1.703, 1.701, 1.699, 1.697,
+]
+
+
+def _t_critico(df: int) -> float:
+    if df <= 0:
+        return float("inf")
+    return _T95[df - 1] if df <= len(_T95) else 1.645
+
+
+def grilla(espacio: dict[str, list[object]]) -> list[dict[str, object]]:
+    claves = sorted(espacio)
+    return [dict(zip(claves, valores)) for valores in itertools.product(*(espacio[k] for k in claves))]
+
+
+def _correr_job(nombre: str, params: dict, input_path: str, seed: int) -> tuple[int, float]:
+    _, _, bombero_pos, area = data_carga_cacheada(input_path, persistir=True)
+    estrategia = ESTRATEGIAS[nombre](seed=seed, **params)
+    sim = Simulation(area, fuego(tasa_crecimiento=1), bombero(bombero_pos[0], bombero_pos[1], estrategia))
+    start = time.perf_counter()
+    sim.run_until_stable()
+    return area.counts()[1], time.perf_counter() - start
+
+
+class ConfigResult:
+    def __init__(self, idx: int, params: dict[str, object]):
+        self.idx = idx
+        self.params = params
+        self.costos: dict[tuple[str, int], float] = {}
+        self.tiempos: dict[tuple[str, int], float] = {}
+        self.eliminada_en: int | None = None
+
+    @property
+    def viva(self) -> bool:
+        return self.eliminada_en is None
+
+    def costo_medio(self) -> float:
+        return sum(self.costos.values()) / len(self.costos) if self.costos else float("inf")
+
+    def tiempo_medio(self) -> float:
+        return sum(self.tiempos.values()) / len(self.tiempos) if self.tiempos else float("inf")
+
+
+class ParameterRace:
+    """
+    Carrera de configuraciones para ILS o VNS.
+    - jobs: pares (input, semilla) en el orden en que se van corriendo.
+    - bloque: trabajos por ronda; min_bloques rondas antes de eliminar.
+    - Una configuracion cae si su diferencia pareada de costo contra la
+      mejor supera el t critico al 95% (una cola), con al menos
+      min_muestras trabajos en comun. Varianza cero (la misma diferencia en
+      todos) cuenta como peor en todos los trabajos, no como t infinito.
+    """
+
+    def __init__(
+        self,
+        nombre: str,
+        configs: list[dict[str, object]],
+        jobs: list[tuple[str, int]],
+        workers: int | None = None,
+        bloque: int = 5,
+        min_bloques: int = 2,
+        min_muestras: int = 5,
+        store: ResultStore | None = None,
+    ):
+        if nombre not in ESTRATEGIAS:
+            raise ValueError(f"Estrategia desconocida '{nombre}'. Opciones: {sorted(ESTRATEGIAS)}.")
+        self.nombre = nombre
+        self.resultados = [ConfigResult(k, dict(c)) for k, c in enumerate(configs)]
+        self.jobs = list(jobs)
+        self.workers = workers or os.cpu_count() or 1
+        self.bloque = max(1, bloque)
+        self.min_bloques = max(1, min_bloques)
+        self.min_muestras = max(2, min_muestras)
+        self.store = store
+        self._hashes: dict[str, str] = {}
+
+    def _clave(self, res: ConfigResult, input_path: str, seed: int) -> tuple[str, str, int] | None:
+        if self.store is None:
+            return None
+        if input_path not in self._hashes:
+            self._hashes[input_path] = hash_instancia(input_path)
+        params = parametros(ESTRATEGIAS[self.nombre](seed=seed, **res.params))
+        return self._hashes[input_path], params, seed
+
+    def _eliminar(self, ronda: int) -> None:
+        vivas = [r for r in self.resultados if r.viva]
+        if len(vivas) < 2:
+            return
+        mejor = min(vivas, key=lambda r: (r.costo_medio(), r.tiempo_medio()))
+        for res in vivas:
+            if res is mejor:
+                continue
+            comunes = [k for k in res.costos if k in mejor.costos]
+            m = len(comunes)
+            if m < self.min_muestras:
+                continue  # pocos pares: sin evidencia todavia
+            diffs = [res.costos[k] - mejor.costos[k] for k in comunes]
+            media = sum(diffs) / m
+            var = sum((d - media) ** 2 for d in diffs) / (m - 1)
+            if media <= 0:
+                continue
+            if var == 0:
+                # peor por lo mismo en los m trabajos (tipico con semillas que
+                # no cambian nada): ya hay min_muestras pares que lo respaldan
+                res.eliminada_en = ronda
+            elif media / math.sqrt(var / m) > _t_critico(m - 1):
+                res.eliminada_en = ronda
+
+    def correr(self) -> list[ConfigResult]:
+        with ProcessPoolExecutor(max_workers=self.workers) as pool:
+            for ronda, inicio in enumerate(range(0, len(self.jobs), self.bloque), start=1):
+                bloque = self.jobs[inicio:inicio + self.bloque]
+                futures = {}
+                for res in self.resultados:
+                    if not res.viva:
+                        continue
+                    for input_path, seed in bloque:
+                        clave = self._clave(res, input_path, seed)
+                        guardado = self.store.obtener(clave[0], self.nombre, clave[1], seed) if clave else None
+                        if guardado is not None:
+                            res.costos[(input_path, seed)] = guardado[0]
+                            res.tiempos[(input_path, seed)] = guardado[1]
+                            continue
+                        fut = pool.submit(_correr_job, self.nombre, res.params, input_path, seed)
+                        futures[fut] = (res, input_path, seed, clave)
+                for fut, (res, input_path, seed, clave) in futures.items():
+                    costo, tiempo = fut.result()
+                    res.costos[(input_path, seed)] = costo
+                    res.tiempos[(input_path, seed)] = tiempo
+                    if clave is not None:
+                        self.store.guardar(clave[0], self.nombre, clave[1], seed, input_path, costo, tiempo)
+                if ronda >= self.min_bloques:
+                    self._eliminar(ronda)
+                vivas = sum(1 for r in self.resultados if r.viva)
+                print(f"[RONDA {ronda}] trabajos={inicio + len(bloque)}/{len(self.jobs)} vivas={vivas}")
+                if vivas <= 1:
+                    break
+        return self.resultados
+
+    def frente_pareto(self) -> list[ConfigResult]:
+        """
+        Configuraciones sobrevivientes no dominadas en (costo medio, tiempo medio).
+        """
+        vivas = [r for r in self.resultados if r.viva]
+        frente = []
+        for r in vivas:
+            dominada = any(
+                o is not r
+                and o.costo_medio() <= r.costo_medio() and o.tiempo_medio() <= r.tiempo_medio()
+                and (o.costo_medio() < r.costo_medio() or o.tiempo_medio() < r.tiempo_medio())
+                for o in vivas
+            )
+            if not dominada:
+                frente.append(r)
+        return sorted(frente, key=lambda r: r.tiempo_medio())
+
+    def mas_rapida(self, costo_objetivo: float) -> ConfigResult | None:
+        #La configuracion mas rapida del frente que cumple la calidad pedida
+        for r in self.frente_pareto():
+            if r.costo_medio() <= costo_objetivo:
+                return r
+        return None
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Ajuste de parametros ILS/VNS por carreras.")
+    parser.add_argument("estrategia", choices=sorted(ESTRATEGIAS))
+    parser.add_argument("--inputs", nargs="+", default=[f"input{i}.dat" for i in range(1, 6)])
+    parser.add_argument("--seeds", type=int, default=10)
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--bloque", type=int, default=5)
+    parser.add_argument("--min-muestras", type=int, default=5, help="Trabajos en comun antes de eliminar.")
+    parser.add_argument("--objetivo", type=float, default=None, help="Costo medio maximo aceptado.")
+    parser.add_argument("--sin-cache", action="store_true", help="No usar resultados.sqlite.")
+    args = parser.parse_args()
+
+    jobs = [(inp, seed) for seed in range(args.seeds) for inp in args.inputs]
+    store = None if args.sin_cache else ResultStore()
+    race = ParameterRace(
+        args.estrategia, grilla(ESPACIOS[args.estrategia]), jobs,
+        workers=args.workers, bloque=args.bloque, min_muestras=args.min_muestras, store=store,
+    )
+    race.correr()
+    print("costo_medio,tiempo_medio,trabajos,params")
+    for r in race.frente_pareto():
+        print(f"{r.costo_medio():.4f},{r.tiempo_medio():.4f},{len(r.costos)},{r.params}")
+    if args.objetivo is not None:
+        elegida = race.mas_rapida(args.objetivo)
+        print(f"Mas rapida con costo <= {args.objetivo}: {elegida.params if elegida else '-'}")
+    if store is not None:
+        store.cerrar()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,254 @@
+from __future__ import annotations
+
+import struct
+
+from area import Area
+from celdas import est_celda
+
+# Formato del archivo de grabacion:
+#   cabecera: MAGIC, version (u8), n (u32), keyframe_every (u32)
+#   frames  : tipo (1 byte 'K' o 'D'), tick (u32), largo payload (u32), payload
+# Los enteros del payload son varints (7 bits por byte, el bit alto indica
+# que sigue otro byte): casi siempre ocupan 1 o 2 bytes en vez de 4.
+# Un keyframe guarda la grilla completa codificada por runs (largo + byte).
+# Un delta guarda solo las celdas cambiadas, ordenadas por indice plano y
+# agrupadas en runs de celdas consecutivas con el mismo estado nuevo (el
+# frente del fuego y las filas de cortafuegos suelen serlo):
+#   cantidad de runs, y por run: salto desde el fin del run anterior, largo, byte.
+# La version 1 (u32 por indice y por run) se sigue pudiendo leer.
+MAGIC = b"PAIREC"
+VERSION = 2
+_VERSIONES = (1, 2)
+_HEADER = struct.Struct("<6sBII")
+_FRAME = struct.Struct("<cII")
+_RUN = struct.Struct("<IB")  # run de un keyframe de la version 1
+KEYFRAME = b"K"
+DELTA = b"D"
+
+
+def _varint(out: bytearray, value: int) -> None:
+    while value >= 0x80:
+        out.append((value & 0x7F) | 0x80)
+        value >>= 7
+    out.append(value)
+
+
+def _leer_varint(data: bytes, pos: int) -> tuple[int, int]:
+    #Devuelve (valor, posicion siguiente)
+    value = shift = 0
+    while True:
+        byte = data[pos]
+        pos += 1
+        value |= (byte & 0x7F) << shift
+        if byte < 0x80:
+            return value, pos
+        shift += 7
+
+
+def _rle(grid: bytes | bytearray) -> bytes:
+    out = bytearray()
+    total = len(grid)
+    pos = 0
+    while pos < total:
+        value = grid[pos]
+        end = pos + 1
+        while end < total and grid[end] == value:
+            end += 1
+        _varint(out, end - pos)
+        out.append(value)
+        pos = end
+    return bytes(out)
+
+
+def _unrle(payload: bytes, size: int, version: int = VERSION) -> bytearray:
+    grid = bytearray()
+    if version == 1:
+        for run, value in _RUN.iter_unpack(payload):
+            grid += bytes((value,)) * run
+    else:
+        pos = 0
+        while pos < len(payload):
+            run, pos = _leer_varint(payload, pos)
+            grid += bytes((payload[pos],)) * run
+            pos += 1
+    if len(grid) != size:
+        raise ValueError(f"Keyframe corrupto: {len(grid)} celdas y se esperaban {size}.")
+    return grid
+
+
+def _codificar_delta(cambios: dict[int, int]) -> bytes:
+    #Cambios {indice plano: byte} como runs de indices consecutivos con el mismo byte
+    runs: list[list[int]] = []  # [inicio, largo, byte]
+    for flat in sorted(cambios):
+        code = cambios[flat]
+        if runs and runs[-1][0] + runs[-1][1] == flat and runs[-1][2] == code:
+            runs[-1][1] += 1
+        else:
+            runs.append([flat, 1, code])
+    out = bytearray()
+    _varint(out, len(runs))
+    fin = 0
+    for inicio, largo, code in runs:
+        _varint(out, inicio - fin)
+        _varint(out, largo)
+        out.append(code)
+        fin = inicio + largo
+    return bytes(out)
+
+
+def _aplicar_delta(grid: bytearray, payload: bytes, version: int) -> None:
+    if version == 1:
+        (count,) = struct.unpack_from("<I", payload)
+        idx = struct.unpack_from(f"<{count}I", payload, 4)
+        codes = payload[4 + 4 * count:]
+        for flat, code in zip(idx, codes):
+            grid[flat] = code
+        return
+    count, pos = _leer_varint(payload, 0)
+    fin = 0
+    for _ in range(count):
+        salto, pos = _leer_varint(payload, pos)
+        largo, pos = _leer_varint(payload, pos)
+        inicio = fin + salto
+        fin = inicio + largo
+        grid[inicio:fin] = bytes((payload[pos],)) * largo
+        pos += 1
+
+
+class TickRecorder:
+    """
+    Grabador opcional de la simulacion, tick por tick.
+    - Guarda la grilla inicial una vez (keyframe) y luego solo las celdas que
+      cambian en cada tick (quemas nuevas, cortafuego nuevo, bombero).
+    - Cada keyframe_every ticks escribe un keyframe para que el lector pueda
+      saltar a cualquier tick sin reproducir todo desde el inicio.
+    - Mantiene un espejo empaquetado de la grilla, asi un keyframe no vuelve a
+      recorrer el Area.
+    """
+
+    def __init__(self, path: str, keyframe_every: int = 50):
+        if keyframe_every <= 0:
+            raise ValueError("keyframe_every debe ser mayor que cero.")
+        self.path = path
+        self.keyframe_every = keyframe_every
+        self._f = None
+        self._n = 0
+        self._grid = bytearray()
+        self._last_key_tick = 0
+        self.frames = 0
+        self.bytes_written = 0
+
+    def iniciar(self, area: Area) -> None: #abre el archivo y escribe la grilla inicial
+        self.cerrar()
+        self._f = open(self.path, "wb")
+        self._n = area.n
+        self._grid = bytearray(area.to_bytes())
+        self._write(_HEADER.pack(MAGIC, VERSION, self._n, self.keyframe_every))
+        self._keyframe(area.tick)
+
+    def registrar(self, tick: int, cambios: list[tuple[int, int, est_celda]]) -> None:
+        """
+        Registra los cambios aplicados durante un tick, en el orden en que
+        ocurrieron (si una celda cambia dos veces gana la ultima).
+        """
+        if self._f is None:
+            raise RuntimeError("El grabador no esta iniciado: llame a iniciar(area) primero.")
+        n = self._n
+        nuevos: dict[int, int] = {}
+        for i, j, state in cambios:
+            flat = i * n + j
+            code = ord(state.value)
+            self._grid[flat] = code
+            nuevos[flat] = code  # si la celda cambia dos veces queda la ultima
+
+        if tick - self._last_key_tick >= self.keyframe_every:
+            self._keyframe(tick)
+            return
+        payload = _codificar_delta(nuevos)
+        self._write(_FRAME.pack(DELTA, tick, len(payload)) + payload)
+        self.frames += 1
+
+    def cerrar(self) -> None:
+        if self._f is not None:
+            self._f.close()
+            self._f = None
+
+    def _keyframe(self, tick: int) -> None:
+        payload = _rle(self._grid)
+        self._write(_FRAME.pack(KEYFRAME, tick, len(payload)) + payload)
+        self._last_key_tick = tick
+        self.frames += 1
+
+    def _write(self, data: bytes) -> None:
+        self._f.write(data)
+        self.bytes_written += len(data)
+
+    def __enter__(self) -> "TickRecorder":
+        return self
+
+    def __exit__(self, *exc: object) -> None:
+        self.cerrar()
+
+
+class TickReader:
+    """
+    Lector de grabaciones de TickRecorder. Al abrir indexa los frames (solo
+    lee cabeceras) y reconstruye cualquier tick desde el keyframe previo.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._index: list[tuple[int, bytes, int, int]] = []  # (tick, tipo, offset payload, largo)
+        with open(path, "rb") as f:
+            head = f.read(_HEADER.size)
+            if len(head) != _HEADER.size:
+                raise ValueError(f"{path} no es una grabacion valida.")
+            magic, version, n, keyframe_every = _HEADER.unpack(head)
+            if magic != MAGIC or version not in _VERSIONES:
+                raise ValueError(f"{path} no es una grabacion valida (version {version}).")
+            self.n = n
+            self.version = version
+            self.keyframe_every = keyframe_every
+            while True:
+                raw = f.read(_FRAME.size)
+                if len(raw) < _FRAME.size:
+                    break
+                kind, tick, size = _FRAME.unpack(raw)
+                offset = f.tell()
+                self._index.append((tick, kind, offset, size))
+                f.seek(size, 1)
+        if not self._index or self._index[0][1] != KEYFRAME:
+            raise ValueError(f"{path} no contiene un keyframe inicial.")
+
+    @property
+    def ticks(self) -> list[int]:
+        return [t for t, _, _, _ in self._index]
+
+    def grid_at(self, tick: int) -> Area:
+        """
+        Reconstruye el Area al final del tick pedido. Si el tick no fue
+        grabado se devuelve el ultimo estado conocido anterior a el.
+        """
+        if tick < self._index[0][0]:
+            raise ValueError(f"El tick {tick} es anterior al inicio de la grabacion.")
+        start = 0
+        for pos, (t, kind, _, _) in enumerate(self._index):
+            if t > tick:
+                break
+            if kind == KEYFRAME:
+                start = pos
+        size = self.n * self.n
+        grid = bytearray()
+        last_tick = self._index[start][0]
+        with open(self.path, "rb") as f:
+            for t, kind, offset, length in self._index[start:]:
+                if t > tick:
+                    break
+                f.seek(offset)
+                payload = f.read(length)
+                if kind == KEYFRAME:
+                    grid = _unrle(payload, size, self.version)
+                else:
+                    _aplicar_delta(grid, payload, self.version)
+                last_tick = t
+        return Area.from_bytes(bytes(grid), self.n, tick=last_tick)
@@ -0,0 +1,203 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import sqlite3
+import time
+
+# Almacen local de resultados (SQLite). Cada corrida queda identificada por
+# (hash del contenido de la instancia, estrategia, parametros, semilla,
+# version del codigo), asi un barrido solo recalcula lo que cambio.
+
+DB_PATH = "resultados.sqlite"
+# Modulos que afectan el resultado de una corrida: si cambia su codigo,
+# cambia la version y los resultados viejos dejan de reutilizarse.
+CODE_MODULES = [
+    "area.py",
+    "area_teselada.py",
+    "celdas.py",
+    "comp_fuego.py",
+    "comp_bombero.py",
+    "simulation.py",
+    "strategy.py",
+    "contencion.py",
+    "candidatos.py",
+    "contexto.py",
+    "eventos.py",
+    "bitboard.py",
+    "montecarlo.py",
+    "exacto.py",
+    "loader.py",
+    "iterated_local_search.py",
+    "variable_neighborhood_search.py",
+    "branch_and_bound.py",
+    "cola_acotada.py",
+    "portafolio.py",
+]
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    instance_hash TEXT NOT NULL,
+    estrategia TEXT NOT NULL,
+    params TEXT NOT NULL,
+    seed INTEGER NOT NULL,
+    code_version TEXT NOT NULL,
+    input_path TEXT NOT NULL,
+    costo INTEGER NOT NULL,
+    tiempo REAL NOT NULL,
+    stats TEXT NOT NULL,
+    created REAL NOT NULL,
+    PRIMARY KEY (instance_hash, estrategia, params, seed, code_version)
+)
+"""
+
+_version_cache: str | None = None
+
+
+def hash_instancia(path: str) -> str:
+    with open(path, "rb") as f:
+        return hashlib.sha256(f.read()).hexdigest()
+
+
+def version_codigo() -> str:
+    global _version_cache
+    if _version_cache is None:
+        base = os.path.dirname(os.path.abspath(__file__))
+        h = hashlib.sha256()
+        for name in CODE_MODULES:
+            path = os.path.join(base, name)
+            if os.path.exists(path):
+                with open(path, "rb") as f:
+                    h.update(name.encode("utf-8"))
+                    h.update(f.read())
+        _version_cache = h.hexdigest()[:16]
+    return _version_cache
+
+
+# Perillas de ejecucion: cambian cuanto tarda una corrida, no que corrida es.
+# Contadores y estado acumulado tampoco son configuracion.
+_NO_PARAMETROS = {"workers", "time_limit", "victorias"}
+_OMITIR = object()  # valor sin forma JSON (objetos): no entra en la clave
+
+
+def _serializable(valor: object) -> object:
+    #Valor en forma JSON canonica (tuplas como listas) o _OMITIR
+    if isinstance(valor, (int, float, str, bool, type(None))):
+        return valor
+    if isinstance(valor, (list, tuple)):
+        items = [_serializable(v) for v in valor]
+        return _OMITIR if _OMITIR in items else items
+    if isinstance(valor, dict):
+        items = {str(k): _serializable(v) for k, v in valor.items()}
+        return _OMITIR if _OMITIR in items.values() else items
+    return _OMITIR
+
+
+def parametros(estrategia: object, **extra: object) -> str:
+    """
+    Parametros publicos de la estrategia en JSON canonico, incluidos los
+    contenedores (miembros y parametros del portafolio). Se excluyen los
+    contadores acumulados (total_*) y las perillas de ejecucion. `extra`
+    agrega configuracion de la corrida que no vive en la estrategia.
+    """
+    params = {k: v for k, v in extra.items() if v is not None}
+    for k, v in vars(estrategia).items():
+        if k.startswith("_") or k.startswith("total_") or k in _NO_PARAMETROS:
+            continue
+        valor = _serializable(v)
+        if valor is not _OMITIR:
+            params[k] = valor
+    return json.dumps(params, sort_keys=True)
+
+
+class ResultStore:
+    def __init__(self, path: str = DB_PATH):
+        self.path = path
+        self._conn = sqlite3.connect(path)
+        self._conn.execute(_SCHEMA)
+        self._conn.commit()
+
+    def cerrar(self) -> None:
+        self._conn.close()
+
+    def __enter__(self) -> "ResultStore":
+        return self
+
+    def __exit__(self, *exc: object) -> None:
+        self.cerrar()
+
+    def obtener(
+        self,
+        instance_hash: str,
+        estrategia: str,
+        params: str,
+        seed: int,
+        code_version: str | None = None,
+    ) -> tuple[int, float] | None:
+        row = self._conn.execute(
+            "SELECT costo, tiempo FROM runs WHERE instance_hash=? AND estrategia=? "
+            "AND params=? AND seed=? AND code_version=?",
+            (instance_hash, estrategia, params, seed, code_version or version_codigo()),
+        ).fetchone()
+        if row is None:
+            return None
+        return int(row[0]), float(row[1])
+
+    def guardar(
+        self,
+        instance_hash: str,
+        estrategia: str,
+        params: str,
+        seed: int,
+        input_path: str,
+        costo: int,
+        tiempo: float,
+        stats: dict | None = None,
+        code_version: str | None = None,
+    ) -> None:
+        self._conn.execute(
+            "INSERT OR REPLACE INTO runs VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            (
+                instance_hash, estrategia, params, seed, code_version or version_codigo(),
+                input_path, int(costo), float(tiempo),
+                json.dumps(stats or {}, default=str), time.time(),
+            ),
+        )
+        self._conn.commit()
+
+    def corridas(
+        self,
+        estrategia: str,
+        input_path: str | None = None,
+        code_version: str | None = None,
+    ) -> list[tuple[str, str, int, int, float]]:
+        """
+        Devuelve (input_path, params, seed, costo, tiempo) de la version de
+        codigo pedida (por defecto la actual), ordenadas por input y semilla.
+        """
+        sql = ("SELECT input_path, params, seed, costo, tiempo FROM runs "
+               "WHERE estrategia=? AND code_version=?")
+        args: list[object] = [estrategia, code_version or version_codigo()]
+        if input_path is not None:
+            sql += " AND input_path=?"
+            args.append(input_path)
+        sql += " ORDER BY input_path, params, seed"
+        return [tuple(r) for r in self._conn.execute(sql, args).fetchall()]
+
+    def exportar_xlsx(self, path: str, estrategias: list[str]) -> None:
+        """
+        Exporta una hoja por estrategia. Requiere openpyxl (opcional).
+        """
+        try:
+            from openpyxl import Workbook
+        except ImportError as exc:
+            raise RuntimeError("Exportar a xlsx requiere openpyxl (pip install openpyxl).") from exc
+        wb = Workbook()
+        wb.remove(wb.active)
+        for nombre in estrategias:
+            ws = wb.create_sheet(nombre.upper())
+            ws.append(["input", "params", "seed", "costo", "tiempo"])
+            for row in self.corridas(nombre):
+                ws.append(list(row))
+        wb.save(path)
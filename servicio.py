@@ -0,0 +1,310 @@
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import multiprocessing
+import os
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from branch_and_bound import BranchAndBound
+from cancelacion import CancelToken
+from comp_bombero import bombero
+from comp_fuego import fuego
+from iterated_local_search import IteratedLocalSearch
+from loader import data_carga_texto
+from presupuesto import TimeBudgetScheduler
+from simulation import Simulation
+from variable_neighborhood_search import VariableNeighborhoodSearch
+from writer import guardar_presupuesto, guardar_report
+
+# Servicio local de simulaciones.
+# Protocolo: una linea JSON por mensaje, sobre socket Unix o TCP en localhost.
+#   -> {"op": "run", "id": "a1", "instancia": "<contenido input.dat>",
+#       "estrategia": "ils", "params": {...}, "seed": 0, "max_steps": 10000,
+#       "reporte": "/ruta/reporte.txt",  (opcional: guardar_report al terminar)
+#       "presupuesto": 30.0, "reporte_presupuesto": "/ruta/presupuesto.txt"}
+#       (opcional: presupuesto global en segundos repartido entre ticks)
+#   -> {"op": "cancel", "id": "a1"}
+#   -> {"op": "ping"}
+#   <- {"id": "a1", "type": "accepted" | "progress" | "result" | "cancelled" | "error" | "busy", ...}
+ESTRATEGIAS = {
+    "ils": IteratedLocalSearch,
+    "vns": VariableNeighborhoodSearch,
+    "bnb": BranchAndBound,
+}
+PROGRESO_BUFFER = 64  # eventos de progreso pendientes por trabajo antes de descartar
+
+
+def _crear_estrategia(nombre: str, params: dict, seed: int | None):
+    try:
+        factory = ESTRATEGIAS[nombre]
+    except KeyError as exc:
+        raise ValueError(f"Estrategia desconocida '{nombre}'. Opciones: {sorted(ESTRATEGIAS)}.") from exc
+    kwargs = dict(params)
+    if seed is not None and nombre != "bnb":
+        kwargs["seed"] = seed
+    return factory(**kwargs)
+
+
+def _calentar_worker() -> None:
+    #Los imports ya ocurrieron al cargar este modulo en el worker
+    return None
+
+
+def _ejecutar_trabajo(job_id: str, payload: dict, cola, cancelar) -> dict[str, object]:
+    """
+    Corre una simulacion completa dentro de un worker del pool. Publica el
+    progreso de cada tick (y las mejoras de la busqueda) en la cola
+    compartida; la cancelacion se revisa entre ticks y dentro de la busqueda
+    de la estrategia, asi un trabajo reemplazado se corta sin esperar el tick.
+    """
+    _, _, bombero_pos, area = data_carga_texto(payload["instancia"])
+    estrategia = _crear_estrategia(
+        payload.get("estrategia", "ils"),
+        payload.get("params") or {},
+        payload.get("seed"),
+    )
+    comp_bombero = bombero(bombero_pos[0], bombero_pos[1], estrategia=estrategia)
+    presupuesto = payload.get("presupuesto")
+    scheduler = TimeBudgetScheduler(float(presupuesto)) if presupuesto else None
+    sim = Simulation(
+        area, fuego(tasa_crecimiento=1), comp_bombero,
+        scheduler=scheduler,
+        cancelacion=CancelToken(fuente=cancelar.is_set),
+        progreso=lambda evento: cola.put((job_id, evento)),
+    )
+    max_steps = int(payload.get("max_steps", 10_000))
+
+    start = time.perf_counter()
+    sim.run_until_stable(max_steps=max_steps)
+    elapsed = time.perf_counter() - start
+    finished = not sim.cancelado and sim.estable()
+    stats = estrategia.resumen_global(area=area, wall_time=elapsed)
+    if payload.get("reporte"):
+        # tambien si se cancelo: el area queda consistente y el reporte sale "Parcial"
+        guardar_report(payload["reporte"], area, finished, area.limite(), stats)
+    if scheduler is not None:
+        stats["presupuesto"] = scheduler.reporte()
+        if payload.get("reporte_presupuesto"):
+            guardar_presupuesto(payload["reporte_presupuesto"], stats["presupuesto"])
+    cola.put((job_id, {"type": "_fin"}))
+
+    return {
+        "finished": finished,
+        "cancelled": sim.cancelado,
+        "estado": "Finalizada" if finished else "Parcial",
+        "stats": stats,
+        "salida": area.to_lines(),
+    }
+
+
+class _Trabajo:
+    def __init__(self, job_id: str, cancelar):
+        self.id = job_id
+        self.cancelar = cancelar
+        self.eventos: asyncio.Queue = asyncio.Queue(maxsize=PROGRESO_BUFFER)
+        self.future: asyncio.Future | None = None
+        self.descartados = 0
+
+
+class SimulationService:
+    """
+    Servicio asyncio de larga vida que ejecuta simulaciones en un pool de
+    procesos ya calentados.
+    - Back-pressure: como maximo max_pendientes trabajos (en cola + en curso);
+      los demas se rechazan con "busy". El progreso que el cliente no alcanza
+      a leer se descarta (se conserva siempre el resultado final).
+    - Cancelacion: por mensaje "cancel" o al cerrarse la conexion del cliente.
+    """
+
+    def __init__(self, workers: int | None = None, max_pendientes: int | None = None):
+        self.workers = workers or os.cpu_count() or 1
+        self.max_pendientes = max_pendientes or 4 * self.workers
+        self._manager = None
+        self._cola = None
+        self._pool: ProcessPoolExecutor | None = None
+        self._trabajos: dict[str, _Trabajo] = {}
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._lector: threading.Thread | None = None
+
+    async def iniciar(self) -> None:
+        self._loop = asyncio.get_running_loop()
+        self._manager = multiprocessing.Manager()
+        self._cola = self._manager.Queue()
+        self._pool = ProcessPoolExecutor(max_workers=self.workers, initializer=_calentar_worker)
+        # Forzamos el arranque de todos los workers antes de aceptar clientes.
+        await asyncio.gather(*(
+            self._loop.run_in_executor(self._pool, _calentar_worker) for _ in range(self.workers)
+        ))
+        self._lector = threading.Thread(target=self._leer_progreso, daemon=True)
+        self._lector.start()
+
+    async def cerrar(self) -> None:
+        for trabajo in list(self._trabajos.values()):
+            trabajo.cancelar.set()
+        if self._cola is not None:
+            self._cola.put(None)
+        if self._pool is not None:
+            self._pool.shutdown(wait=True, cancel_futures=True)
+        if self._manager is not None:
+            self._manager.shutdown()
+
+    def _leer_progreso(self) -> None:
+        #Hilo que reparte los mensajes de los workers al loop de asyncio
+        while True:
+            try:
+                item = self._cola.get()
+            except (EOFError, OSError):
+                return
+            if item is None:
+                return
+            self._loop.call_soon_threadsafe(self._entregar, *item)
+
+    def _entregar(self, job_id: str, evento: dict) -> None:
+        trabajo = self._trabajos.get(job_id)
+        if trabajo is None:
+            return
+        if trabajo.eventos.full():
+            if evento["type"] != "_fin":
+                trabajo.descartados += 1
+                return
+            # El aviso de fin nunca se descarta: dejamos fuera el progreso mas antiguo.
+            trabajo.eventos.get_nowait()
+            trabajo.descartados += 1
+        trabajo.eventos.put_nowait(evento)
+
+    async def atender(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        lock = asyncio.Lock()
+        propios: dict[str, asyncio.Task] = {}
+
+        async def enviar(msg: dict) -> None:
+            async with lock:
+                writer.write((json.dumps(msg) + "\n").encode("utf-8"))
+                await writer.drain()
+
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                try:
+                    msg = json.loads(line)
+                except json.JSONDecodeError as e:
+                    await enviar({"type": "error", "message": f"JSON invalido: {e}"})
+                    continue
+                op = msg.get("op")
+                job_id = str(msg.get("id", ""))
+                if op == "ping":
+                    await enviar({"type": "pong", "pendientes": len(self._trabajos)})
+                elif op == "cancel":
+                    # solo se cancelan trabajos lanzados por esta misma conexion
+                    trabajo = self._trabajos.get(job_id) if job_id in propios else None
+                    if trabajo is not None:
+                        # el worker corta la busqueda en curso y devuelve el
+                        # resultado parcial (tipo "cancelled", estado "Parcial")
+                        trabajo.cancelar.set()
+                elif op == "run":
+                    if not job_id or job_id in self._trabajos:
+                        await enviar({"id": job_id, "type": "error", "message": "id vacio o repetido."})
+                    elif len(self._trabajos) >= self.max_pendientes:
+                        await enviar({"id": job_id, "type": "busy", "pendientes": len(self._trabajos)})
+                    else:
+                        # se registra antes de crear la tarea: un "run" repetido
+                        # que llegue enseguida ya ve el id ocupado
+                        trabajo = _Trabajo(job_id, self._manager.Event())
+                        self._trabajos[job_id] = trabajo
+                        propios[job_id] = asyncio.create_task(self._correr(trabajo, msg, enviar))
+                else:
+                    await enviar({"id": job_id, "type": "error", "message": f"Operacion desconocida '{op}'."})
+        finally:
+            # Cliente desconectado: cancelamos lo que siga pendiente de esta conexion.
+            for job_id, task in propios.items():
+                trabajo = self._trabajos.get(job_id)
+                if trabajo is not None:
+                    trabajo.cancelar.set()
+                task.cancel()
+            writer.close()
+
+    async def _correr(self, trabajo: _Trabajo, msg: dict, enviar) -> None:
+        job_id = trabajo.id
+        try:
+            await enviar({"id": job_id, "type": "accepted"})
+            trabajo.future = self._loop.run_in_executor(
+                self._pool, _ejecutar_trabajo, job_id, msg, self._cola, trabajo.cancelar,
+            )
+            fin = False
+            while not fin and not trabajo.future.done():
+                getter = asyncio.ensure_future(trabajo.eventos.get())
+                await asyncio.wait({getter, trabajo.future}, return_when=asyncio.FIRST_COMPLETED)
+                if not getter.done():
+                    getter.cancel()
+                    continue
+                evento = getter.result()
+                if evento["type"] == "_fin":
+                    fin = True
+                else:
+                    await enviar({"id": job_id, **evento})
+            await asyncio.wait({trabajo.future})
+            ok = not trabajo.future.cancelled() and trabajo.future.exception() is None
+            while ok and not fin:
+                # El worker termino: vaciamos el progreso que aun viene en camino.
+                evento = await trabajo.eventos.get()
+                if evento["type"] == "_fin":
+                    fin = True
+                else:
+                    await enviar({"id": job_id, **evento})
+
+            try:
+                resultado = trabajo.future.result()
+            except asyncio.CancelledError:
+                await enviar({"id": job_id, "type": "cancelled"})
+                return
+            except Exception as e:
+                await enviar({"id": job_id, "type": "error", "message": str(e)})
+                return
+            tipo = "cancelled" if resultado["cancelled"] else "result"
+            await enviar({"id": job_id, "type": tipo, "descartados": trabajo.descartados, **resultado})
+        except (ConnectionError, asyncio.CancelledError):
+            trabajo.cancelar.set()
+        finally:
+            self._trabajos.pop(job_id, None)
+
+
+async def servir(socket_path: str | None, host: str, port: int, workers: int | None) -> None:
+    servicio = SimulationService(workers=workers)
+    await servicio.iniciar()
+    if socket_path:
+        if os.path.exists(socket_path):
+            os.remove(socket_path)
+        server = await asyncio.start_unix_server(servicio.atender, path=socket_path)
+        print(f"[OK] Servicio escuchando en {socket_path} con {servicio.workers} workers")
+    else:
+        server = await asyncio.start_server(servicio.atender, host=host, port=port)
+        print(f"[OK] Servicio escuchando en {host}:{port} con {servicio.workers} workers")
+    try:
+        async with server:
+            await server.serve_forever()
+    finally:
+        await servicio.cerrar()
+        if socket_path and os.path.exists(socket_path):
+            os.remove(socket_path)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Servicio local de simulaciones de incendio.")
+    parser.add_argument("--socket", help="Ruta del socket Unix (por defecto TCP en localhost).")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--workers", type=int, default=None)
+    args = parser.parse_args()
+    try:
+        asyncio.run(servir(args.socket, args.host, args.port, args.workers))
+    except KeyboardInterrupt:
+        print("Adios!")
+
+
+if __name__ == "__main__":
+    main()
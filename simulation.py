@@ -1,37 +1,213 @@
+import time
+
 from area import Area
+from cancelacion import CancelToken, Progreso
 from celdas import est_celda
 from comp_fuego import fuego
 from comp_bombero import bombero
+from recorder import TickRecorder
+from metricas import MetricsRecorder
+from checkpoint import cargar_checkpoint, guardar_checkpoint, restaurar_area, snapshot_area
+from presupuesto import TimeBudgetScheduler
+from area_teselada import TiledArea
+from contencion import ContainmentTracker, cerrado_exacto
 
 class Simulation:
-    def __init__(self, area: Area, comp_fuego: fuego, comp_bombero: bombero):
+    def __init__(
+        self,
+        area: Area,
+        comp_fuego: fuego,
+        comp_bombero: bombero,
+        recorder: TickRecorder | None = None,
+        checkpoint_path: str | None = None,
+        checkpoint_every: int = 0,
+        scheduler: TimeBudgetScheduler | None = None,
+        detectar_contencion: bool = True,
+        cancelacion: CancelToken | None = None,
+        progreso: Progreso | None = None,
+        metricas: MetricsRecorder | None = None,
+    ):
         self.area = area
         self.comp_fuego = comp_fuego
         self.comp_bombero = comp_bombero
         # marcar visualmente dónde está el bombero al inicio
         self.area.matrix[self.comp_bombero.i][self.comp_bombero.j] = est_celda.bomb
+        # grabador opcional: guarda la grilla inicial y luego solo los cambios
+        self.recorder = recorder
+        if self.recorder is not None:
+            self.recorder.iniciar(self.area)
+        # checkpoint opcional cada checkpoint_every ticks (0 = desactivado)
+        self.checkpoint_path = checkpoint_path
+        self.checkpoint_every = checkpoint_every
+        # presupuesto global opcional: fija estrategia.time_limit en cada tick
+        self.scheduler = scheduler
+        self._libres: int | None = None  # celdas sin afectar, al dia solo con scheduler
+        # contencion exacta: al quedar el fuego aislado del bombero no se busca mas.
+        # Con TiledArea se omite: el alcance de un fuego abierto recorre todo el mapa
+        if isinstance(self.area, TiledArea):
+            detectar_contencion = False
+        self.contencion = ContainmentTracker(self.area) if detectar_contencion else None
+        # cancelacion cooperativa y avisos de progreso: se revisan entre ticks
+        # y la estrategia los revisa dentro de su busqueda
+        self.cancelacion = cancelacion
+        self.progreso = progreso
+        self.cancelado = False
+        if cancelacion is not None or progreso is not None:
+            self.comp_bombero.estrategia.usar_cancelacion(cancelacion, progreso)
+        # metricas opcionales por tick (conteos, frente, nodos, latencia)
+        self.metricas = metricas
+        if self.metricas is not None:
+            self.metricas.iniciar(self.area)
+
+    def _reporte_estrategia(self) -> dict | None:
+        estrategia = self.comp_bombero.estrategia
+        return estrategia.ultima_busqueda() if hasattr(estrategia, "ultima_busqueda") else None
 
     def step(self) -> None:
+        t_step = time.perf_counter()
+        bi, bj = self.comp_bombero.i, self.comp_bombero.j
+        viejo_b = self.area.matrix[bi][bj]
+        reporte = None
         #1 el bombero construye cortafuego en su celda actual
         self.comp_bombero.u_cortafuego(self.area)
-        #2 predecimos y aplicamos expansión del fuego
-        para_quemar = self.comp_fuego.a_quemar(self.area)
+        #2 predecimos y aplicamos expansión del fuego (muestreada si es estocastico)
+        para_quemar = self.comp_fuego.muestrear(self.area)
         self.comp_fuego.aplicar(self.area, para_quemar)
+        if self.scheduler is not None:
+            # conteo corriente para el scheduler: recontar el mapa es n*n por tick
+            if self._libres is None:
+                self._libres = self.area.counts()[0]
+            else:
+                self._libres -= len(para_quemar) + (viejo_b == est_celda.sn_af)
 
         #3 predecimos la próxima expansión y nos movemos evitando esas celdas
         forbidden_next = self.comp_fuego.a_quemar(self.area)
-        self.comp_bombero.move(self.area, forbidden=forbidden_next)
+        if self.contencion is not None:
+            self.contencion.actualizar(self.area, para_quemar, [(bi, bj)])
+        if self.contencion is not None and self.contencion.contenido(self.area, (bi, bj)):
+            # el resultado ya no depende del bombero: se queda quieto sin buscar
+            self.area.matrix[bi][bj] = est_celda.bomb
+        elif self.scheduler is not None:
+            estrategia = self.comp_bombero.estrategia
+            estrategia.time_limit = self.scheduler.limite_tick(self.area, len(forbidden_next), self._libres)
+            t0 = time.perf_counter()
+            self.comp_bombero.move(self.area, forbidden=forbidden_next)
+            self._libres -= (self.comp_bombero.i, self.comp_bombero.j) != (bi, bj)
+            reporte = self._reporte_estrategia()
+            self.scheduler.registrar(time.perf_counter() - t0, reporte)
+        else:
+            self.comp_bombero.move(self.area, forbidden=forbidden_next)
+            if self.metricas is not None:
+                reporte = self._reporte_estrategia()
+        if self.contencion is not None:
+            self.contencion.actualizar(self.area, (), [(self.comp_bombero.i, self.comp_bombero.j)])
 
         #4 avanzar tiempo
         self.area.tick += 1
 
+        if self.recorder is not None or self.metricas is not None:
+            # cambios del tick en orden: cortafuego, quemas nuevas, bombero
+            cambios = [(bi, bj, self.area.matrix[bi][bj])]
+            cambios.extend((i, j, est_celda.fuego) for i, j in para_quemar)
+            ni, nj = self.comp_bombero.i, self.comp_bombero.j
+            cambios.append((ni, nj, est_celda.bomb))
+            if self.recorder is not None:
+                self.recorder.registrar(self.area.tick, cambios)
+            if self.metricas is not None:
+                # las quemas y la celda nueva del bombero parten de sn_af
+                transiciones = [(viejo_b, self.area.matrix[bi][bj])]
+                transiciones.extend((est_celda.sn_af, est_celda.fuego) for _ in para_quemar)
+                if (ni, nj) != (bi, bj):
+                    transiciones.append((est_celda.sn_af, est_celda.bomb))
+                nodos = int(reporte.get("nodes", 0)) if reporte else 0
+                self.metricas.registrar(
+                    self.area.tick, transiciones, len(forbidden_next), nodos, time.perf_counter() - t_step,
+                )
+
+        if (self.checkpoint_path is not None and self.checkpoint_every > 0
+                and self.area.tick % self.checkpoint_every == 0):
+            self.guardar_checkpoint()
+
+    def fuego_contenido(self) -> bool:
+        if self.contencion is None:
+            return False
+        return self.contencion.contenido(self.area, (self.comp_bombero.i, self.comp_bombero.j))
+
+    def cerrado_exacto(self) -> bool:
+        return cerrado_exacto(self.area, (self.comp_bombero.i, self.comp_bombero.j))
+
+    def guardar_checkpoint(self, path: str | None = None) -> None:
+        """
+        Guarda area, tick, posicion del bombero, el estado de la estrategia
+        (contadores, ultimo reporte y estado del RNG) y el RNG del fuego.
+        """
+        path = path or self.checkpoint_path
+        if path is None:
+            raise ValueError("No hay ruta de checkpoint configurada.")
+        guardar_checkpoint(path, {
+            "area": snapshot_area(self.area),
+            "bombero": (self.comp_bombero.i, self.comp_bombero.j),
+            "estrategia": self.comp_bombero.estrategia.guardar_estado(),
+            "fuego": self.comp_fuego.guardar_estado(),
+        })
+
+    def reanudar(self, path: str | None = None) -> bool:
+        """
+        Restaura el ultimo checkpoint sobre esta simulacion. La estrategia
+        debe haberse construido con los mismos parametros que la original.
+        Devuelve False si no hay checkpoint que reanudar.
+        """
+        path = path or self.checkpoint_path
+        if path is None:
+            raise ValueError("No hay ruta de checkpoint configurada.")
+        data = cargar_checkpoint(path)
+        if data is None:
+            return False
+        restaurar_area(self.area, data["area"])
+        self.comp_bombero.i, self.comp_bombero.j = data["bombero"]
+        self.comp_bombero.estrategia.cargar_estado(data["estrategia"])
+        if "fuego" in data:
+            self.comp_fuego.cargar_estado(data["fuego"])
+        if self.contencion is not None:
+            self.contencion = ContainmentTracker(self.area)
+        if self.metricas is not None:
+            self.metricas.sincronizar(self.area)
+        return True
+
+    def _cancelar(self) -> bool:
+        if self.cancelacion is not None and self.cancelacion.cancelado(forzar=True):
+            self.cancelado = True
+        return self.cancelado
+
+    def _avisar_tick(self) -> None:
+        if self.progreso is None:
+            return
+        libres, quemadas, cortafuegos = self.area.counts()
+        self.progreso({
+            "type": "progress",
+            "tick": self.area.tick,
+            "sin_afectar": libres,
+            "quemadas": quemadas,
+            "cortafuegos": cortafuegos,
+            "bombero": [self.comp_bombero.i, self.comp_bombero.j],
+        })
+
+    def _paso(self) -> bool:
+        #Un tick con cancelacion y progreso; False si la corrida fue cancelada
+        if self._cancelar():
+            return False
+        self.step()
+        self._avisar_tick()
+        return True
+
     def run_until_end(self, max_steps: int = 10_000) -> int:
         steps = 0
         while steps < max_steps:
             # si ya no hay más expansión posible, paramos
             if not self.comp_fuego.a_quemar(self.area):
                 break
-            self.step()
+            if not self._paso():
+                break
             steps += 1
         return steps
 
@@ -50,16 +226,24 @@ class Simulation:
         finally:
             self.area.matrix[bi][bj] = original
 
+    def estable(self) -> bool:
+        #True si la corrida ya termino: el fuego no se expande tras el cortafuego del bombero
+        return self._no_more_expansion_after_bomber()
+
     def run_until_stable(self, max_steps: int = 10_000) -> int:
         """
         Igual que run_until_end, pero chequeando la condición de paro
         tras simular el cortafuego del bombero del siguiente tick.
         """
+        if self.scheduler is not None:
+            self.scheduler.iniciar()
+            self._libres = None
         steps = 0
         while steps < max_steps:
             if self._no_more_expansion_after_bomber():
                 break
-            self.step()
+            if not self._paso():
+                break
             steps += 1
         return steps
 
@@ -68,6 +252,7 @@ class Simulation:
         while self.area.tick < target_tick:
             if not self.comp_fuego.a_quemar(self.area):
                 break
-            self.step()
+            if not self._paso():
+                break
             steps += 1
         return steps
@@ -1,5 +1,114 @@
+from __future__ import annotations
+
+import time
+from typing import TYPE_CHECKING, Callable
+
 from area import Area
+from area_teselada import TiledArea
+from contencion import cerrado_exacto
+
+if TYPE_CHECKING:
+    from cancelacion import CancelToken, Progreso
+    from contexto import InstanceContext
+
+# Costo de un plan cuyo rollout se corto por superar la cota (el incumbente):
+# pierde cualquier comparacion, incluso contra un empate.
+DOMINADO = float("inf")
+
 
 class strategy_bombero:
+    # Atributos que forman parte del estado de la estrategia entre ticks
+    # (contadores y reportes). El RNG, si existe, se agrega aparte.
+    _estado_campos: tuple[str, ...] = ()
+    # Datos precalculados de la instancia, compartidos entre semillas (contexto.py)
+    _contexto: InstanceContext | None = None
+    # Cancelacion cooperativa y avisos de progreso (cancelacion.py)
+    _cancelacion: CancelToken | None = None
+    _progreso: Progreso | None = None
+    AVISO_INTERVALO = 0.1  # segundos minimos entre avisos de busqueda
+    _ultimo_aviso = 0.0
+    # Cota externa opcional: mejor costo ya encontrado por otra busqueda que
+    # corre en paralelo (portafolio.py). Poda igual que el incumbente propio.
+    _cota_externa: Callable[[], float] | None = None
+
+    def usar_contexto(self, contexto: InstanceContext | None) -> None:
+        """
+        Asocia el contexto de la instancia (llamar antes de correr). El fuego
+        interno de la estrategia, si tiene, tambien lo usa.
+        """
+        self._contexto = contexto
+        fire = getattr(self, "_fire", None)
+        if fire is not None:
+            fire.contexto = contexto
+
+    def usar_cancelacion(self, token: CancelToken | None, progreso: Progreso | None = None) -> None:
+        self._cancelacion = token
+        self._progreso = progreso
+
+    def usar_cota_externa(self, cota: Callable[[], float] | None) -> None:
+        self._cota_externa = cota
+
+    def _cota(self, propia: float) -> float:
+        #Cota de poda de los rollouts: la propia o la externa si es menor
+        if self._cota_externa is None:
+            return propia
+        return min(propia, self._cota_externa())
+
+    def _cancelado(self) -> bool:
+        #Se llama una vez por evaluacion o expansion: el token limita lo caro
+        return self._cancelacion is not None and self._cancelacion.cancelado()
+
+    def _avisar(self, evento: dict) -> None:
+        #Aviso de progreso de la busqueda (mejoras), a lo mas uno cada AVISO_INTERVALO
+        if self._progreso is None:
+            return
+        ahora = time.monotonic()
+        if ahora - self._ultimo_aviso < self.AVISO_INTERVALO:
+            return
+        self._ultimo_aviso = ahora
+        self._progreso({"type": "busqueda", **evento})
+
     def siguiente_paso(self, i: int, j: int, area: Area, forbidden: set[tuple[int, int]]) -> tuple[int, int]:
         raise NotImplementedError
+
+    def _resumen(self, nodos: int, area: Area | None, wall_time: float | None) -> dict[str, object]:
+        #Campos comunes de resumen_global; cada estrategia agrega los suyos
+        libres = quemadas = cortafuegos = None
+        instantes = None
+        cerrado = exacto = None
+        if area is not None:
+            libres, quemadas, cortafuegos = area.counts()
+            instantes = area.tick
+            cerrado = area.limite()
+            if not isinstance(area, TiledArea):
+                # el alcance exacto de un fuego abierto recorre todo el mapa
+                exacto = cerrado_exacto(area)
+        return {
+            "nodes": nodos,
+            "estrategia": self._last_report.get("status", "sin_busqueda"),
+            "tiempo_busqueda_sec": self.total_time,
+            "tiempo_total_sec": wall_time,
+            "instantes": instantes,
+            "sin_afectar": libres,
+            "quemadas": quemadas,
+            "cortafuegos": cortafuegos,
+            "cerrado": cerrado,
+            "cerrado_exacto": exacto,
+        }
+
+    def guardar_estado(self) -> dict[str, object]: #estado serializable para checkpoints
+        estado: dict[str, object] = {
+            campo: getattr(self, campo) for campo in self._estado_campos
+        }
+        rng = getattr(self, "_rng", None)
+        if rng is not None:
+            estado["_rng"] = rng.getstate()
+        return estado
+
+    def cargar_estado(self, estado: dict[str, object]) -> None:
+        for campo in self._estado_campos:
+            if campo in estado:
+                setattr(self, campo, estado[campo])
+        rng = getattr(self, "_rng", None)
+        if rng is not None and "_rng" in estado:
+            rng.setstate(estado["_rng"])
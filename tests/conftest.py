@@ -0,0 +1,11 @@
+import os
+import sys
+
+# Los modulos del proyecto viven en la raiz del repositorio (sin paquete).
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if RAIZ not in sys.path:
+    sys.path.insert(0, RAIZ)
+
+
+def ruta_input(nombre: str) -> str:
+    return os.path.join(RAIZ, nombre)
@@ -0,0 +1,78 @@
+import random
+import time
+
+from area import Area
+from area_teselada import TiledArea
+from celdas import est_celda
+from comp_bombero import bombero
+from comp_fuego import fuego
+from contexto import InstanceContext
+from eventos import rollout_quieto
+from iterated_local_search import IteratedLocalSearch
+from simulation import Simulation
+from variable_neighborhood_search import VariableNeighborhoodSearch
+
+
+def _mapa(rng: random.Random, n: int) -> Area:
+    opciones = [est_celda.sn_af] * 6 + [est_celda.c_fuego, est_celda.fuego, est_celda.bomb]
+    return Area([[rng.choice(opciones) for _ in range(n)] for _ in range(n)])
+
+
+def test_rollout_y_llegadas_igual_que_el_area_densa():
+    rng = random.Random(0)
+    for _ in range(60):
+        n = rng.randint(2, 16)
+        densa = _mapa(rng, n)
+        tiled = TiledArea.desde_area(densa, tile=rng.randint(1, 6))
+        for tasa in (1, 2, 3):
+            esperado = rollout_quieto(densa, tasa)
+            final = rollout_quieto(tiled, tasa)
+            assert isinstance(final, TiledArea)
+            assert final.to_bytes() == esperado.to_bytes() and final.tick == esperado.tick
+            quemadas = esperado.counts()[1]
+            assert rollout_quieto(tiled, tasa, cota=quemadas) is not None
+            assert rollout_quieto(tiled, tasa, cota=quemadas - 1) is None
+            llegada = fuego(tasa_crecimiento=tasa).tiempos_llegada(densa)
+            dispersa = fuego(tasa_crecimiento=tasa).tiempos_llegada(tiled)
+            assert all(dispersa[i][j] == llegada[i][j] for i in range(n) for j in range(n))
+
+
+def test_huella_distingue_estados_sin_recorrer_el_mapa():
+    a = TiledArea(10_000, tile=16)
+    b = a.clone()
+    assert a.huella() == b.huella() == b""
+    a.matrix[5000][5000] = est_celda.fuego
+    assert a.huella() != b.huella()
+    b.matrix[5000][5000] = est_celda.fuego
+    assert a.huella() == b.huella()
+    b.matrix[20][20] = est_celda.c_fuego
+    b.matrix[20][20] = est_celda.sn_af  # la baldosa existe pero quedo vacia
+    assert a.huella() == b.huella()
+
+
+def _fuego_encerrado(n: int, r: int = 6) -> tuple[TiledArea, tuple[int, int]]:
+    area = TiledArea(n, tile=16)
+    c = n // 2
+    for k in range(-r, r + 1):
+        for i, j in ((c - r, c + k), (c + r, c + k), (c + k, c - r), (c + k, c + r)):
+            area.matrix[i][j] = est_celda.c_fuego
+    area.matrix[c][c] = est_celda.fuego
+    return area, (c + 2, c + 2)
+
+
+def test_paso_en_mapa_teselado_grande_no_recorre_n_por_n():
+    # 5000x5000 = 25M celdas: una sola pasada densa tarda mas que el tope
+    for estrategia in (
+        IteratedLocalSearch(time_limit=float("inf"), max_evaluations=6, seed=1, candidate_width=4),
+        VariableNeighborhoodSearch(time_limit=float("inf"), max_evaluations=6, seed=1, candidate_width=4),
+    ):
+        area, (bi, bj) = _fuego_encerrado(5000)
+        inicio = time.perf_counter()
+        estrategia.usar_contexto(InstanceContext(area))
+        sim = Simulation(area, fuego(), bombero(bi, bj, estrategia=estrategia))
+        for _ in range(3):
+            sim.step()
+        resumen = estrategia.resumen_global(sim.area)
+        assert time.perf_counter() - inicio < 10.0
+        assert resumen["cerrado_exacto"] is None
+        assert sim.area.baldosas_activas() <= 4
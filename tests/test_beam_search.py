@@ -0,0 +1,45 @@
+import pytest
+
+from beam_search import BeamSearch
+from comp_bombero import bombero
+from comp_fuego import fuego
+from conftest import ruta_input
+from loader import data_carga
+from simulation import Simulation
+
+
+def _traza(input_path: str, workers: int, **params) -> list[object]:
+    #(movimiento, nodos, quemadas) de cada tick de una corrida completa
+    _, _, bombero_pos, area = data_carga(input_path)
+    estrategia = BeamSearch(workers=workers, time_limit=float("inf"), **params)
+    comp_bombero = bombero(bombero_pos[0], bombero_pos[1], estrategia=estrategia)
+    sim = Simulation(area, fuego(tasa_crecimiento=1), comp_bombero)
+    traza: list[object] = []
+    try:
+        while not sim.estable():
+            sim.step()
+            reporte = estrategia.ultima_busqueda()
+            traza.append(((comp_bombero.i, comp_bombero.j), reporte.get("nodes"), area.counts()[1]))
+    finally:
+        estrategia.cerrar()
+    return traza
+
+
+@pytest.mark.parametrize("nombre", ["input3.dat", "input12.dat"])
+def test_paralelo_decide_igual_que_secuencial(nombre):
+    # width/frontier_weight distintos de los defaults: los workers deben usar los del principal
+    params = {"width": 3, "frontier_weight": 5.0}
+    secuencial = _traza(ruta_input(nombre), 1, **params)
+    paralelo = _traza(ruta_input(nombre), 2, **params)
+    assert secuencial
+    assert paralelo == secuencial
+
+
+def test_haz_acotado_por_width():
+    _, _, (bi, bj), area = data_carga(ruta_input("input12.dat"))
+    estrategia = BeamSearch(width=2, depth=4, time_limit=float("inf"))
+    mv = estrategia.siguiente_paso(bi, bj, area, fuego().a_quemar(area))
+    reporte = estrategia.ultima_busqueda()
+    assert abs(mv[0] - bi) <= 1 and abs(mv[1] - bj) <= 1
+    # cada capa expande a lo mas width nodos con 9 movimientos cada uno
+    assert reporte["nodes"] <= 2 * 9 * 4 + 9
@@ -0,0 +1,28 @@
+import random
+
+from candidatos import CandidateLists
+from celdas import MOVES
+from conftest import ruta_input
+from loader import data_carga
+
+
+def test_posiciones_cacheadas_siguen_al_plan():
+    _, _, pos, area = data_carga(ruta_input("input12.dat"))
+    candidatos = CandidateLists(area, pos, width=4)
+    rng = random.Random(0)
+    plan = [rng.choice(MOVES) for _ in range(12)]
+    for _ in range(200):
+        idx = rng.randrange(len(plan))
+        esperado = candidatos.ranking(candidatos._posiciones(plan[:idx + 1])[idx], idx)
+        assert candidatos.movimientos(plan, idx) == esperado
+        # el plan cambia en el mismo lugar, como en _perturb_plan
+        plan[rng.randrange(len(plan))] = rng.choice(MOVES)
+
+
+def test_quedarse_va_detras_de_los_destinos_cercanos():
+    _, _, pos, area = data_carga(ruta_input("input3.dat"))
+    candidatos = CandidateLists(area, pos, width=len(MOVES))
+    ranking = candidatos.ranking(pos, 0)
+    assert sorted(ranking) == sorted(MOVES)
+    # la celda del bombero no esta libre: quedarse no es lo primero
+    assert ranking[0] != (0, 0)
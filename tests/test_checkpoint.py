@@ -0,0 +1,51 @@
+import pytest
+
+from comp_bombero import bombero
+from comp_fuego import fuego
+from conftest import ruta_input
+from iterated_local_search import IteratedLocalSearch
+from loader import data_carga
+from simulation import Simulation
+from variable_neighborhood_search import VariableNeighborhoodSearch
+
+ESTRATEGIAS = {
+    "ils": lambda: IteratedLocalSearch(horizon=4, max_evaluations=12, time_limit=float("inf"), seed=3),
+    "vns": lambda: VariableNeighborhoodSearch(max_iterations=8, max_evaluations=40, time_limit=float("inf"), seed=3),
+}
+
+
+def _simulacion(nombre: str, ruta: str | None = None) -> Simulation:
+    _, _, (bi, bj), area = data_carga(ruta_input("input7.dat"))
+    return Simulation(
+        area, fuego(tasa_crecimiento=1, prob_ignicion=0.7, seed=11),
+        bombero(bi, bj, estrategia=ESTRATEGIAS[nombre]()),
+        checkpoint_path=ruta,
+    )
+
+
+def _terminar(sim: Simulation, movimientos: list[tuple[int, int]]) -> bytes:
+    while not sim.estable():
+        sim.step()
+        movimientos.append((sim.comp_bombero.i, sim.comp_bombero.j))
+    return sim.area.to_bytes()
+
+
+@pytest.mark.parametrize("nombre", sorted(ESTRATEGIAS))
+def test_reanudar_repite_los_mismos_movimientos(nombre, tmp_path):
+    completos: list[tuple[int, int]] = []
+    final = _terminar(_simulacion(nombre), completos)
+    assert len(completos) > 3
+
+    ruta = str(tmp_path / f"{nombre}.ckpt")
+    cortada = _simulacion(nombre, ruta)
+    antes = []
+    for _ in range(3):
+        cortada.step()
+        antes.append((cortada.comp_bombero.i, cortada.comp_bombero.j))
+    cortada.guardar_checkpoint()
+
+    reanudada = _simulacion(nombre, ruta)
+    assert reanudada.reanudar()
+    despues: list[tuple[int, int]] = []
+    assert _terminar(reanudada, despues) == final
+    assert antes + despues == completos
@@ -0,0 +1,87 @@
+import random
+import tracemalloc
+
+from area import Area
+from area_teselada import TiledArea
+from branch_and_bound import BranchAndBound, SearchNode
+from celdas import est_celda
+from cola_acotada import BoundedQueue
+
+
+def _nodo(rng: random.Random, area: Area) -> SearchNode:
+    costo = float(rng.randrange(20))
+    return SearchNode(
+        priority=costo, depth=rng.randrange(5), bnb_cost=costo, score=rng.random(),
+        pos=(1, 1), area=area.clone(), forbidden={(0, 0)}, path=[(0, 1)], counts=(1, 2, 3),
+    )
+
+
+def _vaciar(cola: BoundedQueue) -> list[tuple[float, int, float]]:
+    claves = []
+    while cola:
+        nodo = cola.pop()
+        claves.append((nodo.priority, nodo.depth, nodo.bnb_cost))
+    return claves
+
+
+def test_spill_saca_en_el_mismo_orden_que_sin_tope():
+    rng = random.Random(0)
+    area = Area([[est_celda.sn_af] * 4 for _ in range(4)])
+    nodos = [_nodo(rng, area) for _ in range(300)]
+    libre, acotada = BoundedQueue(), BoundedQueue(max_nodes=20, mode="spill")
+    for nodo in nodos:
+        libre.push(nodo)
+        acotada.push(nodo)
+    try:
+        assert acotada.spilled > 0
+        assert _vaciar(acotada) == _vaciar(libre)
+    finally:
+        acotada.close()
+
+
+def test_drop_conserva_los_mejores():
+    rng = random.Random(1)
+    area = Area([[est_celda.sn_af] * 4 for _ in range(4)])
+    nodos = [_nodo(rng, area) for _ in range(100)]
+    cola = BoundedQueue(max_nodes=10, mode="drop")
+    for nodo in nodos:
+        cola.push(nodo)
+    claves = _vaciar(cola)
+    assert claves == sorted(claves)
+    assert len(claves) + cola.dropped == len(nodos)
+    assert claves[0] == min((n.priority, n.depth, n.bnb_cost) for n in nodos)
+
+
+def test_spill_devuelve_el_tipo_de_area():
+    rng = random.Random(2)
+    area = TiledArea(40, tile=8)
+    area.matrix[3][5] = est_celda.fuego
+    cola = BoundedQueue(max_nodes=4, mode="spill")
+    for _ in range(12):
+        cola.push(_nodo(rng, area))
+    try:
+        while cola:
+            nodo = cola.pop()
+            assert isinstance(nodo.area, TiledArea) and nodo.area.tile == 8
+            assert nodo.area.matrix[3][5] == est_celda.fuego
+            assert nodo.area.baldosas_activas() == 1
+    finally:
+        cola.close()
+
+
+def test_bytes_por_nodo_del_tope_en_mb():
+    # el tope en MB usa la misma estimacion que se mide aca (+-35%)
+    n, frente = 30, 30
+    area = Area([[est_celda.sn_af] * n for _ in range(n)])
+    tracemalloc.start()
+    nodos = [
+        SearchNode(priority=1.0, depth=1, bnb_cost=1.0, score=0.0, pos=(0, 1), area=area.clone(),
+                   forbidden={(i, 0) for i in range(frente)}, path=[(0, 1)] * 3, counts=(1, 2, 3))
+        for _ in range(100)
+    ]
+    medido = tracemalloc.get_traced_memory()[0] / len(nodos)
+    tracemalloc.stop()
+    del nodos
+    tope = BranchAndBound(max_open_mb=1.0)._open_limit(n, frente)
+    estimado = 1024 * 1024 / tope
+    assert 0.65 * medido <= estimado <= 1.35 * medido
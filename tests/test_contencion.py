@@ -0,0 +1,40 @@
+import pytest
+
+from comp_bombero import bombero
+from comp_fuego import fuego
+from conftest import ruta_input
+from contencion import alcance_fuego, fuego_contenido
+from iterated_local_search import IteratedLocalSearch
+from loader import data_carga
+from simulation import Simulation
+
+
+class _Contadora(IteratedLocalSearch):
+    #ILS que anota en que tick se le pidio decidir
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self.llamadas: list[int] = []
+
+    def siguiente_paso(self, i, j, area, forbidden):
+        self.llamadas.append(area.tick)
+        return super().siguiente_paso(i, j, area, forbidden)
+
+
+@pytest.mark.parametrize("nombre", ["input3.dat", "input5.dat", "input12.dat"])
+def test_tracker_igual_al_alcance_exacto(nombre):
+    _, _, (bi, bj), area = data_carga(ruta_input(nombre))
+    estrategia = _Contadora(seed=0, max_evaluations=30, time_limit=float("inf"))
+    sim = Simulation(area, fuego(tasa_crecimiento=1), bombero(bi, bj, estrategia=estrategia))
+    contenido_desde = None
+    while not sim.estable():
+        sim.step()
+        pos = (sim.comp_bombero.i, sim.comp_bombero.j)
+        if not sim.contencion._contenido:
+            # mientras no esta contenido el alcance incremental es el exacto
+            assert sim.contencion.alcance == alcance_fuego(area)
+        if contenido_desde is None and sim.fuego_contenido():
+            contenido_desde = area.tick
+            assert fuego_contenido(area, pos)
+    if contenido_desde is not None:
+        # una vez contenido la simulacion no le pide mas decisiones a la estrategia
+        assert all(t < contenido_desde for t in estrategia.llamadas)
@@ -0,0 +1,69 @@
+import random
+
+import pytest
+
+from area import Area
+from celdas import MOVES, est_celda
+from comp_bombero import bombero
+from comp_fuego import fuego
+from ensemble import EnsembleSimulation
+from simulation import Simulation
+from strategy import strategy_bombero
+
+
+class _Guion(strategy_bombero):
+    #Camina al azar y anota lo que Simulation le entrega en cada decision
+    def __init__(self, seed: int):
+        self._rng = random.Random(seed)
+        self.vistos: list[tuple[bytes, frozenset]] = []
+
+    def siguiente_paso(self, i, j, area, forbidden):
+        self.vistos.append((area.to_bytes(), frozenset(forbidden)))
+        di, dj = self._rng.choice(MOVES)
+        return i + di, j + dj
+
+
+def _mapa(rng: random.Random, n: int) -> tuple[Area, tuple[int, int]]:
+    matrix = [[est_celda.sn_af] * n for _ in range(n)]
+    for _ in range(rng.randint(1, 2)):
+        matrix[rng.randrange(n)][rng.randrange(n)] = est_celda.fuego
+    for _ in range(rng.randrange(2 * n)):
+        matrix[rng.randrange(n)][rng.randrange(n)] = est_celda.c_fuego
+    pos = (rng.randrange(n), rng.randrange(n))
+    matrix[pos[0]][pos[1]] = est_celda.sn_af
+    return Area(matrix), pos
+
+
+@pytest.mark.parametrize("tasa", [1, 2])
+def test_ensemble_igual_a_simulation_por_miembro(tasa):
+    rng = random.Random(tasa)
+    mapas = [_mapa(rng, 9) for _ in range(5)]
+
+    sims = []
+    for k, (area, pos) in enumerate(mapas):
+        sim = Simulation(area.clone(), fuego(tasa_crecimiento=tasa), bombero(*pos, estrategia=_Guion(k)),
+                         detectar_contencion=False)
+        sim.run_until_stable()
+        sims.append(sim)
+
+    ens = EnsembleSimulation([a.clone() for a, _ in mapas], [p for _, p in mapas], fuego(tasa_crecimiento=tasa))
+    guiones = [_Guion(k) for k in range(len(mapas))]
+
+    def politica(e: EnsembleSimulation):
+        objetivos = []
+        prohibidas = e.a_quemar()
+        for k, guion in enumerate(guiones):
+            if not e.activos[k]:
+                objetivos.append(None)
+                continue
+            i, j = e.posiciones[k]
+            objetivos.append(guion.siguiente_paso(i, j, e.area(k), prohibidas[k]))
+        return objetivos
+
+    pasos = ens.run_until_stable(politica)
+    for k, sim in enumerate(sims):
+        assert pasos[k] == sim.area.tick
+        assert guiones[k].vistos == sim.comp_bombero.estrategia.vistos
+        assert ens.area(k).to_bytes() == sim.area.to_bytes()
+        assert ens.posiciones[k] == (sim.comp_bombero.i, sim.comp_bombero.j)
+        assert ens.counts()[k] == sim.area.counts()
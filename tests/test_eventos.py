@@ -0,0 +1,67 @@
+import random
+
+import pytest
+
+from area import Area
+from area_teselada import TiledArea
+from celdas import MOVES, est_celda
+from comp_bombero import bombero
+from comp_fuego import fuego
+from eventos import rollout_quieto
+from simulation import Simulation
+from strategy import strategy_bombero
+
+
+class _AlAzar(strategy_bombero):
+    #Camina al azar: deja cortafuegos y mueve la celda del bombero en cada tick
+    def __init__(self, seed: int):
+        self._rng = random.Random(seed)
+
+    def siguiente_paso(self, i, j, area, forbidden):
+        di, dj = self._rng.choice(MOVES)
+        return i + di, j + dj
+
+
+def _tick_a_tick(area: Area, tasa: int) -> Area:
+    fire = fuego(tasa_crecimiento=tasa)
+    final = area.clone()
+    while True:
+        to_burn = fire.a_quemar(final)
+        if not to_burn:
+            return final
+        fire.aplicar(final, to_burn)
+        final.tick += 1
+
+
+def _comparar(area: Area, tasa: int) -> None:
+    esperado = _tick_a_tick(area, tasa)
+    final = rollout_quieto(area, tasa)
+    assert final.to_bytes() == esperado.to_bytes() and final.tick == esperado.tick
+    quemadas = esperado.counts()[1]
+    assert rollout_quieto(area, tasa, cota=quemadas) is not None
+    assert rollout_quieto(area, tasa, cota=quemadas - 1) is None
+
+
+@pytest.mark.parametrize("tasa", [1, 2, 3])
+@pytest.mark.parametrize("teselada", [False, True])
+def test_rollout_igual_a_a_quemar_durante_la_simulacion(tasa, teselada):
+    rng = random.Random(tasa)
+    for semilla in range(12):
+        n = rng.randint(4, 14)
+        matrix = [[est_celda.sn_af] * n for _ in range(n)]
+        for _ in range(rng.randint(1, 3)):
+            matrix[rng.randrange(n)][rng.randrange(n)] = est_celda.fuego
+        for _ in range(rng.randrange(n)):
+            matrix[rng.randrange(n)][rng.randrange(n)] = est_celda.c_fuego
+        area = Area(matrix)
+        if teselada:
+            area = TiledArea.desde_area(area, tile=4)
+        bi, bj = rng.randrange(n), rng.randrange(n)
+        area.matrix[bi][bj] = est_celda.sn_af
+        sim = Simulation(area, fuego(tasa_crecimiento=tasa), bombero(bi, bj, estrategia=_AlAzar(semilla)),
+                         detectar_contencion=False)
+        _comparar(sim.area, tasa)
+        for _ in range(6):
+            # cada paso deja un cortafuego y mueve al bombero antes del rollout
+            sim.step()
+            _comparar(sim.area, tasa)
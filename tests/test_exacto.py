@@ -0,0 +1,97 @@
+import random
+
+import pytest
+
+from area import Area
+from celdas import MOVES, est_celda
+from comp_bombero import bombero
+from comp_fuego import fuego
+from exacto import ExactSolver
+from simulation import Simulation
+from strategy import strategy_bombero
+
+
+class _Fija(strategy_bombero):
+    #Va siempre a la celda vecina indicada por `move`
+    move = (0, 0)
+
+    def siguiente_paso(self, i, j, area, forbidden):
+        return i + self.move[0], j + self.move[1]
+
+
+def _fuerza_bruta(area: Area, pos: tuple[int, int], memo: dict) -> int:
+    #Minimo de quemadas probando los 9 movimientos en cada tick con Simulation
+    clave = (area.to_bytes(), pos)
+    if clave in memo:
+        return memo[clave]
+    estrategia = _Fija()
+    sim = Simulation(area.clone(), fuego(tasa_crecimiento=1), bombero(*pos, estrategia=estrategia),
+                     detectar_contencion=False)
+    if sim.estable():
+        memo[clave] = sim.area.counts()[1]
+        return memo[clave]
+    mejor = None
+    vistos = set()
+    for move in MOVES:
+        estrategia.move = move
+        sim_hijo = Simulation(area.clone(), fuego(tasa_crecimiento=1), bombero(*pos, estrategia=estrategia),
+                              detectar_contencion=False)
+        sim_hijo.step()
+        hijo = (sim_hijo.area.to_bytes(), (sim_hijo.comp_bombero.i, sim_hijo.comp_bombero.j))
+        if hijo in vistos:
+            continue  # movimiento invalido: igual que quedarse
+        vistos.add(hijo)
+        valor = _fuerza_bruta(sim_hijo.area, hijo[1], memo)
+        mejor = valor if mejor is None else min(mejor, valor)
+    memo[clave] = mejor
+    return mejor
+
+
+def _mapa(rng: random.Random, n: int) -> tuple[Area, tuple[int, int]]:
+    matrix = [[est_celda.sn_af] * n for _ in range(n)]
+    celdas = [(i, j) for i in range(n) for j in range(n)]
+    rng.shuffle(celdas)
+    (fi, fj), pos = celdas[0], celdas[1]
+    matrix[fi][fj] = est_celda.fuego
+    for i, j in celdas[2:2 + rng.randrange(n)]:
+        matrix[i][j] = est_celda.c_fuego  # algunos cortafuegos previos
+    return Area(matrix), pos
+
+
+@pytest.mark.parametrize("n", [3, 4, 5])
+def test_optimo_igual_a_fuerza_bruta(n):
+    rng = random.Random(n)
+    solver = ExactSolver()
+    for _ in range(8):
+        area, pos = _mapa(rng, n)
+        resultado = solver.resolver(area.clone(), pos)
+        assert resultado["status"] == "ok"
+        assert resultado["quemadas"] == _fuerza_bruta(area, pos, {})
+
+
+def test_plan_reproduce_el_optimo():
+    area, pos = _mapa(random.Random(7), 5)
+    resultado = ExactSolver().resolver(area.clone(), pos)
+    estrategia = _Fija()
+    sim = Simulation(area.clone(), fuego(tasa_crecimiento=1), bombero(*pos, estrategia=estrategia),
+                     detectar_contencion=False)
+    for destino in resultado["plan"]:
+        estrategia.move = (destino[0] - sim.comp_bombero.i, destino[1] - sim.comp_bombero.j)
+        sim.step()
+    assert sim.estable()
+    assert sim.area.counts()[1] == resultado["quemadas"]
+
+
+def test_max_n_acotado_por_la_recursion():
+    with pytest.raises(ValueError):
+        ExactSolver(max_n=100)
+
+
+def test_dominancia_sin_entradas_dominadas():
+    solver = ExactSolver()
+    area, pos = _mapa(random.Random(3), 5)
+    solver.resolver(area, pos)
+    for lista in solver._dominancia.values():
+        for a, (fa, va) in enumerate(lista):
+            for b, (fb, vb) in enumerate(lista):
+                assert a == b or not (fa & ~fb == 0 and va >= vb)
@@ -0,0 +1,49 @@
+from comp_bombero import bombero
+from comp_fuego import fuego
+from conftest import ruta_input
+from loader import data_carga
+from mcts import MonteCarloTreeSearch, TreeNode
+from simulation import Simulation
+
+
+def _recorrer(node: TreeNode) -> list[tuple]:
+    filas = []
+    pila = [(0, node)]
+    while pila:
+        nivel, actual = pila.pop()
+        filas.append((nivel, actual.move, actual.pos, actual.visits, actual.cost_sum,
+                      actual.untried, actual.terminal, actual.area.to_bytes(), actual.area.tick))
+        pila.extend((nivel + 1, hijo) for hijo in actual.children.values())
+    return filas
+
+
+def test_contar_no_usa_recursion():
+    raiz = nodo = TreeNode(None, (0, 0), None, None)
+    for k in range(5_000):
+        hijo = TreeNode(None, (0, 0), nodo, (k, 0))
+        nodo.children[(k, 0)] = hijo
+        nodo = hijo
+    assert MonteCarloTreeSearch()._contar(raiz) == 5_001
+
+
+def test_arbol_entra_en_el_checkpoint(tmp_path):
+    _, _, (bi, bj), area = data_carga(ruta_input("input12.dat"))
+    estrategia = MonteCarloTreeSearch(time_limit=0.3, seed=0)
+    sim = Simulation(area, fuego(tasa_crecimiento=1), bombero(bi, bj, estrategia=estrategia),
+                     detectar_contencion=False)
+    sim.step()
+    assert estrategia._arbol is not None
+    ruta = str(tmp_path / "mcts.ckpt")
+    sim.guardar_checkpoint(ruta)
+
+    _, _, (bi, bj), otra_area = data_carga(ruta_input("input12.dat"))
+    otra = MonteCarloTreeSearch(time_limit=0.3, seed=0)
+    reanudada = Simulation(otra_area, fuego(tasa_crecimiento=1), bombero(bi, bj, estrategia=otra),
+                           detectar_contencion=False)
+    assert reanudada.reanudar(ruta)
+    assert _recorrer(otra._arbol) == _recorrer(estrategia._arbol)
+    # en el tick siguiente las dos corridas siguen desde el arbol conservado
+    sim.step()
+    reanudada.step()
+    assert estrategia.ultima_busqueda()["arbol_reutilizado"]
+    assert otra.ultima_busqueda()["arbol_reutilizado"]
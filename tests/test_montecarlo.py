@@ -0,0 +1,53 @@
+import random
+
+import pytest
+
+from celdas import MOVES
+from comp_bombero import bombero
+from comp_fuego import fuego
+from conftest import ruta_input
+from iterated_local_search import IteratedLocalSearch
+from loader import data_carga
+from montecarlo import MonteCarloEvaluator
+from simulation import Simulation
+from strategy import strategy_bombero
+from variable_neighborhood_search import VariableNeighborhoodSearch
+
+
+class _AlAzar(strategy_bombero):
+    def __init__(self, seed: int):
+        self._rng = random.Random(seed)
+
+    def siguiente_paso(self, i, j, area, forbidden):
+        di, dj = self._rng.choice(MOVES)
+        return i + di, j + dj
+
+
+def _estados(nombre: str, ticks: int):
+    #Estados de una corrida al azar: con cortafuegos, quemadas y el bombero marcado
+    _, _, (bi, bj), area = data_carga(ruta_input(nombre))
+    sim = Simulation(area, fuego(), bombero(bi, bj, estrategia=_AlAzar(0)), detectar_contencion=False)
+    for _ in range(ticks):
+        yield sim.area.clone(), (sim.comp_bombero.i, sim.comp_bombero.j)
+        if sim.estable():
+            return
+        sim.step()
+
+
+@pytest.mark.parametrize("estrategia", [IteratedLocalSearch, VariableNeighborhoodSearch])
+def test_p_1_igual_a_evaluate_plan(estrategia):
+    rng = random.Random(5)
+    evaluador = MonteCarloEvaluator(1.0, muestras=3)
+    for nombre in ("input5.dat", "input12.dat"):
+        for area, pos in _estados(nombre, 4):
+            evaluador.preparar(area, pos, semilla=rng.getrandbits(32))
+            for _ in range(10):
+                plan = [rng.choice(MOVES) for _ in range(rng.randint(0, 8))]
+                esperado = estrategia(seed=0)._evaluate_plan(area, pos, plan)
+                costo, score, final, cur_pos, pasos = evaluador.evaluar(plan)
+                assert costo == esperado[0]
+                assert score == pytest.approx(esperado[1])
+                assert final.to_bytes() == esperado[2].to_bytes() and final.tick == esperado[2].tick
+                assert cur_pos == esperado[3]
+                if len(esperado) > 4:  # VNS tambien devuelve los pasos del plan
+                    assert pasos == esperado[4]
@@ -0,0 +1,22 @@
+import pytest
+
+from comp_bombero import bombero
+from comp_fuego import fuego
+from conftest import ruta_input
+from iterated_local_search import IteratedLocalSearch
+from loader import data_carga
+from presupuesto import TimeBudgetScheduler
+from simulation import Simulation
+
+
+@pytest.mark.parametrize("nombre", ["input3.dat", "input12.dat"])
+def test_conteo_corriente_de_libres(nombre):
+    _, _, (bi, bj), area = data_carga(ruta_input(nombre))
+    scheduler = TimeBudgetScheduler(1.0)
+    sim = Simulation(area, fuego(tasa_crecimiento=1), bombero(bi, bj, estrategia=IteratedLocalSearch(seed=0)),
+                     scheduler=scheduler)
+    scheduler.iniciar()
+    while not sim.estable():
+        sim.step()
+        assert sim._libres == area.counts()[0]
+    assert scheduler.reporte()["ticks"] > 0
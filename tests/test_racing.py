@@ -0,0 +1,32 @@
+from racing import ParameterRace
+
+
+def _carrera(costos: list[list[float]], min_muestras: int = 5) -> ParameterRace:
+    race = ParameterRace("ils", [{"horizon": k} for k in range(len(costos))], [], workers=1,
+                         min_muestras=min_muestras)
+    for res, fila in zip(race.resultados, costos):
+        for job, costo in enumerate(fila):
+            res.costos[("input.dat", job)] = costo
+            res.tiempos[("input.dat", job)] = 1.0
+    return race
+
+
+def test_dos_muestras_iguales_no_eliminan():
+    # m=2 con la misma diferencia: varianza cero pero sin evidencia todavia
+    race = _carrera([[10, 10], [11, 11]])
+    race._eliminar(1)
+    assert all(r.viva for r in race.resultados)
+
+
+def test_varianza_cero_elimina_con_suficientes_muestras():
+    race = _carrera([[10] * 5, [11] * 5])
+    race._eliminar(1)
+    assert race.resultados[0].viva and race.resultados[1].eliminada_en == 1
+
+
+def test_t_pareado_elimina_solo_diferencias_claras():
+    race = _carrera([[10, 12, 9, 11, 10, 12], [13, 15, 12, 14, 14, 15], [11, 11, 10, 10, 11, 12]])
+    race._eliminar(2)
+    assert race.resultados[0].viva
+    assert race.resultados[1].eliminada_en == 2
+    assert race.resultados[2].viva  # media peor pero dentro del ruido
@@ -0,0 +1,70 @@
+import struct
+
+from area import Area
+from comp_bombero import bombero
+from comp_fuego import fuego
+from conftest import ruta_input
+from iterated_local_search import IteratedLocalSearch
+from loader import data_carga
+from recorder import _FRAME, _HEADER, _RUN, DELTA, KEYFRAME, MAGIC, TickReader, TickRecorder
+from simulation import Simulation
+
+
+class _Medido(TickRecorder):
+    #Cuenta lo que ocuparian los deltas en la version 1 (u32 por indice)
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.celdas = self.v1 = self.deltas = 0
+
+    def registrar(self, tick, cambios):
+        antes = self.bytes_written
+        super().registrar(tick, cambios)
+        if self._last_key_tick != tick:  # se escribio un delta
+            self.celdas += len(cambios)
+            self.v1 += _FRAME.size + 4 + 5 * len(cambios)
+            self.deltas += self.bytes_written - antes
+
+
+def _grabar(tmp_path, keyframe_every):
+    _, _, (bi, bj), area = data_carga(ruta_input("input.dat"))
+    rec = _Medido(str(tmp_path / "sim.rec"), keyframe_every=keyframe_every)
+    estrategia = IteratedLocalSearch(horizon=3, max_evaluations=4, local_search_steps=2, time_limit=float("inf"), seed=0)
+    sim = Simulation(area, fuego(), bombero(bi, bj, estrategia=estrategia), recorder=rec)
+    estados = {area.tick: area.to_bytes()}
+    while not sim.estable():
+        sim.step()
+        estados[area.tick] = area.to_bytes()
+    rec.cerrar()
+    return rec, estados
+
+
+def test_reproduce_cada_tick(tmp_path):
+    rec, estados = _grabar(tmp_path, keyframe_every=4)
+    lector = TickReader(rec.path)
+    for tick, grid in estados.items():
+        assert lector.grid_at(tick).to_bytes() == grid
+
+
+def test_deltas_codificados_ocupan_menos_de_la_mitad(tmp_path):
+    # medido en input.dat: ~1.7 bytes por celda cambiada (con la cabecera del
+    # frame) contra 5+ de la version 1, unos 32% del tamaño anterior
+    rec, _ = _grabar(tmp_path, keyframe_every=10**6)
+    assert rec.celdas > 300
+    assert rec.deltas <= 0.45 * rec.v1
+    assert rec.deltas / rec.celdas < 2.5
+
+
+def test_lee_grabaciones_version_1(tmp_path):
+    area = Area.from_bytes(b"*" * 8 + b"-", 3)
+    grid = bytearray(area.to_bytes())
+    path = tmp_path / "v1.rec"
+    with open(path, "wb") as f:
+        f.write(_HEADER.pack(MAGIC, 1, 3, 50))
+        key = _RUN.pack(8, ord("*")) + _RUN.pack(1, ord("-"))
+        f.write(_FRAME.pack(KEYFRAME, 0, len(key)) + key)
+        delta = struct.pack("<I2I", 2, 4, 7) + b"-+"
+        f.write(_FRAME.pack(DELTA, 1, len(delta)) + delta)
+    grid[4], grid[7] = ord("-"), ord("+")
+    lector = TickReader(str(path))
+    assert lector.grid_at(0).to_bytes() == area.to_bytes()
+    assert lector.grid_at(1).to_bytes() == bytes(grid)
@@ -0,0 +1,27 @@
+import json
+
+from iterated_local_search import IteratedLocalSearch
+from portafolio import PortfolioStrategy
+from resultados_db import ResultStore, parametros
+
+
+def test_perillas_de_ejecucion_no_cambian_la_clave():
+    base = parametros(IteratedLocalSearch(seed=0))
+    assert parametros(IteratedLocalSearch(seed=0, time_limit=30.0)) == base
+    assert "time_limit" not in json.loads(base)
+
+
+def test_contenedores_entran_en_la_clave():
+    base = parametros(PortfolioStrategy(seed=0))
+    assert json.loads(base)["miembros"] == ["bnb", "ils", "vns"]
+    assert parametros(PortfolioStrategy(miembros=("ils", "vns"), seed=0)) != base
+    assert parametros(PortfolioStrategy(parametros={"ils": {"horizon": 5}}, seed=0)) != base
+
+
+def test_almacen_distingue_miembros(tmp_path):
+    with ResultStore(str(tmp_path / "r.sqlite")) as store:
+        params = parametros(PortfolioStrategy(seed=0))
+        store.guardar("h", "portafolio", params, 0, "input3.dat", 7, 0.1, {})
+        assert store.obtener("h", "portafolio", params, 0) == (7, 0.1)
+        otros = parametros(PortfolioStrategy(miembros=("bnb",), seed=0))
+        assert store.obtener("h", "portafolio", otros, 0) is None
@@ -0,0 +1,144 @@
+import asyncio
+import json
+import os
+
+from conftest import ruta_input
+from servicio import SimulationService
+
+
+def _instancia(nombre: str) -> str:
+    with open(ruta_input(nombre), encoding="utf-8") as f:
+        return f.read()
+
+
+async def _con_servicio(tmp_path, cuerpo, **kwargs):
+    servicio = SimulationService(**kwargs)
+    await servicio.iniciar()
+    ruta = os.path.join(tmp_path, "pai.sock")
+    server = await asyncio.start_unix_server(servicio.atender, path=ruta)
+    try:
+        return await cuerpo(ruta)
+    finally:
+        server.close()
+        await server.wait_closed()
+        await servicio.cerrar()
+
+
+async def _conectar(ruta):
+    reader, writer = await asyncio.open_unix_connection(ruta)
+
+    async def enviar(msg: dict) -> None:
+        writer.write((json.dumps(msg) + "\n").encode("utf-8"))
+        await writer.drain()
+
+    async def recibir() -> dict:
+        return json.loads(await asyncio.wait_for(reader.readline(), timeout=60))
+
+    return enviar, recibir, writer
+
+
+def _run(job_id: str, instancia: str = "input12.dat", **extra) -> dict:
+    return {
+        "op": "run", "id": job_id, "instancia": _instancia(instancia),
+        "estrategia": "ils", "params": {"time_limit": 0.2}, "seed": 0, **extra,
+    }
+
+
+def _estado_reporte(path) -> str:
+    with open(path, encoding="utf-8") as f:
+        return next(linea for linea in f if linea.startswith("Estado :")).split(":", 1)[1].strip()
+
+
+def test_rechaza_id_repetido_y_aplica_back_pressure(tmp_path):
+    async def cuerpo(ruta):
+        enviar, recibir, writer = await _conectar(ruta)
+        # dos "run" seguidos con el mismo id: el segundo ya ve el id ocupado
+        await enviar(_run("a"))
+        await enviar(_run("a"))
+        await enviar(_run("b"))
+        tipos: dict[str, list[str]] = {"a": [], "b": []}
+        while "result" not in tipos["a"] and "cancelled" not in tipos["a"]:
+            msg = await recibir()
+            tipos[msg["id"]].append(msg["type"])
+            if msg["type"] == "progress" and msg["id"] == "a":
+                await enviar({"op": "cancel", "id": "a"})
+        writer.close()
+        return tipos
+
+    tipos = asyncio.run(_con_servicio(tmp_path, cuerpo, workers=1, max_pendientes=1))
+    # el repetido se rechaza y el original se acepta una sola vez
+    assert tipos["a"].count("error") == 1
+    assert tipos["a"].count("accepted") == 1
+    assert tipos["b"] == ["busy"]  # max_pendientes=1: no hay lugar para otro trabajo
+
+
+def test_cancel_solo_afecta_trabajos_de_la_misma_conexion(tmp_path):
+    async def cuerpo(ruta):
+        enviar, recibir, writer = await _conectar(ruta)
+        enviar_otro, _, writer_otro = await _conectar(ruta)
+        await enviar(_run("c", reporte=str(tmp_path / "c.txt")))
+        ticks = 0
+        while True:
+            msg = await recibir()
+            if msg["type"] == "progress":
+                ticks += 1
+                if ticks == 1:
+                    # otra conexion no puede cancelar un trabajo ajeno
+                    await enviar_otro({"op": "cancel", "id": "c"})
+                elif ticks == 3:
+                    await enviar({"op": "cancel", "id": "c"})
+            if msg["type"] in ("result", "cancelled", "error"):
+                break
+        writer.close()
+        writer_otro.close()
+        return ticks, msg
+
+    ticks, final = asyncio.run(_con_servicio(tmp_path, cuerpo, workers=1))
+    assert ticks >= 3
+    assert final["type"] == "cancelled"
+    assert final["estado"] == "Parcial"
+    assert final["finished"] is False
+    assert _estado_reporte(tmp_path / "c.txt") == "Parcial"
+
+
+def test_corrida_completa_termina_estable(tmp_path):
+    async def cuerpo(ruta):
+        enviar, recibir, writer = await _conectar(ruta)
+        await enviar({"op": "ping"})
+        pong = await recibir()
+        await enviar(_run("d", "input3.dat", reporte=str(tmp_path / "d.txt")))
+        while True:
+            msg = await recibir()
+            if msg["type"] in ("result", "cancelled", "error"):
+                break
+        writer.close()
+        return pong, msg
+
+    pong, final = asyncio.run(_con_servicio(tmp_path, cuerpo, workers=1))
+    assert pong["type"] == "pong"
+    assert final["type"] == "result"
+    assert final["finished"] is True and final["estado"] == "Finalizada"
+    assert len(final["salida"]) == 7
+    assert _estado_reporte(tmp_path / "d.txt") == "Finalizada"
+
+
+def test_presupuesto_global(tmp_path):
+    async def cuerpo(ruta):
+        enviar, recibir, writer = await _conectar(ruta)
+        ruta_presupuesto = str(tmp_path / "p.txt")
+        await enviar(_run("e", "input3.dat", presupuesto=1.0, reporte_presupuesto=ruta_presupuesto))
+        while True:
+            msg = await recibir()
+            if msg["type"] in ("result", "cancelled", "error"):
+                break
+        writer.close()
+        return msg
+
+    final = asyncio.run(_con_servicio(tmp_path, cuerpo, workers=1))
+    assert final["type"] == "result"
+    presupuesto = final["stats"]["presupuesto"]
+    assert presupuesto["presupuesto_sec"] == 1.0 and presupuesto["ticks"] > 0
+    with open(tmp_path / "p.txt", encoding="utf-8") as f:
+        lineas = f.read().splitlines()
+    assert lineas[0] == "Presupuesto (s) : 1.0"
+    assert len(lineas) == 5 + presupuesto["ticks"]
@@ -0,0 +1,32 @@
+import pytest
+
+from comp_bombero import bombero
+from comp_fuego import fuego
+from conftest import ruta_input
+from loader import data_carga
+from simulation import Simulation
+from variable_neighborhood_search import VariableNeighborhoodSearch
+
+
+def _correr(nombre: str, workers: int, **params) -> tuple[list[tuple[int, int]], bytes, int]:
+    _, _, (bi, bj), area = data_carga(ruta_input(nombre))
+    estrategia = VariableNeighborhoodSearch(
+        max_iterations=10, max_evaluations=60, time_limit=float("inf"), seed=4, workers=workers, **params,
+    )
+    sim = Simulation(area, fuego(), bombero(bi, bj, estrategia=estrategia))
+    movimientos = []
+    try:
+        while not sim.estable():
+            sim.step()
+            movimientos.append((sim.comp_bombero.i, sim.comp_bombero.j))
+    finally:
+        estrategia.cerrar()
+    return movimientos, sim.area.to_bytes(), estrategia.total_evaluations
+
+
+@pytest.mark.parametrize("nombre", ["input3.dat", "input6.dat"])
+@pytest.mark.parametrize("params", [{}, {"candidate_width": 4}])
+def test_cuatro_workers_igual_que_uno(nombre, params):
+    secuencial = _correr(nombre, 1, **params)
+    assert len(secuencial[0]) > 1
+    assert _correr(nombre, 4, **params) == secuencial
@@ -1,32 +1,97 @@
 from __future__ import annotations
 
+import multiprocessing as mp
 import random
 import time
+from concurrent.futures import ProcessPoolExecutor
 
-from strategy import strategy_bombero
+from strategy import DOMINADO, strategy_bombero
 from area import Area
-from celdas import est_celda
+from celdas import MOVES, NEIS8, est_celda
 from comp_fuego import fuego
-
-# Movimientos en 8 direcciones.
-NEIS8: list[tuple[int, int]] = [
-    (-1, -1), (-1, 0), (-1, 1),
-    (0, -1),            (0, 1),
-    (1, -1),  (1, 0),  (1, 1),
-]
-# Permite quedarse quieto (primer elemento) o moverse en las 8 direcciones.
-MOVES: list[tuple[int, int]] = [(0, 0)] + NEIS8
-
-
-class VariableNeighborhoodSearch(strategy_bombero):
+from eventos import rollout_quieto
+from candidatos import CandidateLists
+from montecarlo import MonteCarloEvaluator
+from memoria_compartida import RecursosCompartidos, adjuntar_cacheada
+
+
+# Busqueda local en paralelo: cada proceso del pool tiene su propia VNS y
+# comparte con el principal la posicion de la primera mejora encontrada.
+# El area de la decision viaja por memoria compartida (nombre + version).
+_worker: "VariableNeighborhoodSearch | None" = None
+_corte = None
+_area_worker: tuple[tuple[str, int, int | None], Area] | None = None
+_SIN_CORTE = 1 << 62
+
+
+def _init_worker(params: dict[str, object], corte, contexto=None) -> None:
+    global _worker, _corte
+    _worker = VariableNeighborhoodSearch(**params)
+    _worker.usar_contexto(contexto)
+    _corte = corte
+
+
+def _area_de(nombre: str, version: int, pos: tuple[int, int], semilla_mc: int | None) -> Area:
+    #Lee el area solo cuando cambia la decision (y prepara el Monte Carlo una vez)
+    global _area_worker
+    clave = (nombre, version, semilla_mc)
+    if _area_worker is None or _area_worker[0] != clave:
+        area = adjuntar_cacheada(nombre).leer(0)
+        if semilla_mc is not None:
+            _worker._montecarlo.preparar(area, pos, semilla_mc)
+        _area_worker = (clave, area)
+    return _area_worker[1]
+
+
+def _evaluar_vecinos(
+    nombre: str,
+    version: int,
+    pos: tuple[int, int],
+    semilla_mc: int | None,
+    tareas: list[tuple[int, list[tuple[int, int]]]],
+    best_cost: float,
+    best_score: float,
+    deadline: float,
+    cota: float,
+) -> tuple[int, tuple[int, float, float, bytes, int] | None]:
+    """
+    Evalua vecinos en el orden del recorrido secuencial y se detiene en la
+    primera mejora o cuando otro proceso ya encontro una mas temprana. Los
+    rollouts se podan con `cota` (best_cost o una cota externa menor).
+    Devuelve (evaluados, (posicion, costo, score, area, tick) o None).
+    """
+    area = _area_de(nombre, version, pos, semilla_mc)
+    evaluados = 0
+    for posicion, candidate in tareas:
+        if posicion > _corte.value or time.time() >= deadline:
+            break
+        cost, score, cand_area, _, _ = _worker._evaluate_plan(area, pos, candidate, cota=cota)
+        evaluados += 1
+        if cost < best_cost or (cost == best_cost and score < best_score):
+            with _corte.get_lock():
+                if posicion < _corte.value:
+                    _corte.value = posicion
+            return evaluados, (posicion, cost, score, cand_area.to_bytes(), cand_area.tick)
+    return evaluados, None
+
+
+class VariableNeighborhoodSearch(RecursosCompartidos, strategy_bombero):
     """
     Estrategia basada en Variable Neighborhood Search (VNS).
     - Construye un plan corto de movimientos (horizon) y lo evalua con rollout.
     - Aplica etapas de shaking con distintos tamanos de vecindad (k) y luego
       mejora local por primer mejor.
     - Reinicia k cuando hay mejora; recorre vecindades mas amplias si no la hay.
+    - Con workers > 1 la mejora local evalua los vecinos en paralelo; con la
+      misma semilla da el mismo resultado que el recorrido secuencial.
     """
 
+    _estado_campos = (
+        "total_evaluations", "total_time", "_last_report",
+        "total_warm_starts", "total_warm_wins", "_plan_previo", "_pos_esperada",
+        "total_dominados",
+    )
+
     def __init__(
         self,
         horizon: int = 6,
@@ -36,6 +101,11 @@ class VariableNeighborhoodSearch(strategy_bombero):
         local_search_steps: int = 6,
         time_limit: float = 1.0,
         seed: int | None = None,
+        candidate_width: int | None = None,
+        spread_prob: float | None = None,
+        mc_samples: int = 32,
+        warm_start: bool = True,
+        workers: int = 1,
     ):
         self.horizon = horizon
         self.k_max = k_max
@@ -44,28 +114,53 @@ class VariableNeighborhoodSearch(strategy_bombero):
         self.local_search_steps = local_search_steps
         self.time_limit = time_limit
         self._rng = random.Random(seed)
+        # Ancho de las listas de candidatos (None = los 9 MOVES, sin filtrar).
+        self.candidate_width = candidate_width
+        self._candidatos: CandidateLists | None = None
+        # Expansion incierta: con spread_prob cada plan se puntua por las
+        # quemadas esperadas sobre mc_samples futuros (None = determinista).
+        self.spread_prob = spread_prob
+        self.mc_samples = mc_samples
+        self._montecarlo = (
+            MonteCarloEvaluator(spread_prob, mc_samples) if spread_prob is not None else None
+        )
 
         self._fire = fuego(tasa_crecimiento=1)
         self.total_evaluations = 0
+        self.total_dominados = 0  # rollouts cortados por superar al incumbente
         self.total_time = 0.0
         self._last_report: dict[str, object] = {}
+        # Horizonte deslizante: la cola del mejor plan del tick anterior se
+        # reutiliza (corrida un tick) como incumbente junto al plan nuevo.
+        self.warm_start = warm_start
+        self._plan_previo: list[tuple[int, int]] | None = None
+        self._pos_esperada: tuple[int, int] | None = None
+        self.total_warm_starts = 0
+        self.total_warm_wins = 0
+        # Con workers > 1 la busqueda local evalua los vecinos en un pool de
+        # procesos; el resultado es el mismo que el recorrido secuencial.
+        self.workers = workers
+        self._corte = None
+        self._semilla_mc: int | None = None
+        self._version_area = 0
 
     def _clone_area(self, area: Area) -> Area:
-        return Area([row.copy() for row in area.matrix], tick=area.tick)
+        return area.clone()
 
-    def _rollout_stay_until_stable(self, area: Area) -> Area:
+    def _rollout_stay_until_stable(self, area: Area, cota: float | None = None) -> Area | None:
         """
         Deja al bombero quieto hasta que no haya mas expansion posible.
         Sirve para estimar el costo final de una trayectoria parcial.
+        Con cota (el costo incumbente) devuelve None si las quemadas la
+        superan: el plan ya no puede ganar y no hace falta terminar el rollout.
         """
-        area_copy = self._clone_area(area)
-        while True:
-            to_burn = self._fire.a_quemar(area_copy)
-            if not to_burn:
-                break
-            self._fire.aplicar(area_copy, to_burn)
-            area_copy.tick += 1
-        return area_copy
+        if self._contexto is not None:
+            final = self._contexto.rollout(area, cota)
+        else:
+            final = rollout_quieto(area, self._fire.tasa_crecimiento, cota)
+        if final is None:
+            self.total_dominados += 1
+        return final
 
     def _valid_moves(self, area: Area, pos: tuple[int, int]) -> list[tuple[int, int]]:
         """
@@ -83,6 +178,12 @@ class VariableNeighborhoodSearch(strategy_bombero):
             moves.append((di, dj))
         return moves
 
+    def _moves_para(self, plan: list[tuple[int, int]], idx: int) -> list[tuple[int, int]]:
+        #Movimientos a probar en plan[idx]: todos o la lista de candidatos del tick
+        if self._candidatos is None:
+            return MOVES
+        return self._candidatos.movimientos(plan, idx)
+
     def _apply_move(
         self,
         area: Area,
@@ -159,10 +260,17 @@ class VariableNeighborhoodSearch(strategy_bombero):
         area: Area,
         pos: tuple[int, int],
         plan: list[tuple[int, int]],
-    ) -> tuple[float, float, Area, tuple[int, int], int]:
+        cota: float | None = None,
+    ) -> tuple[float, float, Area | None, tuple[int, int], int]:
         """
         Ejecuta el plan y devuelve (costo, score, area_final, pos_final, pasos).
+        Con expansion estocastica son medias sobre los futuros muestreados.
+        Con cota, un plan que seguro quema mas que ella vuelve con costo
+        DOMINADO y sin area (la cota no aplica a la evaluacion Monte Carlo).
         """
+        if self._montecarlo is not None:
+            costo, score, rollout_area, cur_pos, pasos = self._montecarlo.evaluar(plan)
+            return costo, score, rollout_area, cur_pos, round(pasos)
         area_copy = self._clone_area(area)
         ci, cj = pos
         if area_copy.matrix[ci][cj] == est_celda.bomb:
@@ -178,15 +286,29 @@ class VariableNeighborhoodSearch(strategy_bombero):
             chosen = mv if mv in moves else moves[0]
             area_copy, cur_pos, counts = self._apply_move(area_copy, cur_pos, chosen, clone=False)
             steps_taken += 1
+            if cota is not None and counts[1] > cota:
+                self.total_dominados += 1
+                return DOMINADO, DOMINADO, None, cur_pos, steps_taken
             if not self._fire.a_quemar(area_copy):
                 break
 
-        rollout_area = self._rollout_stay_until_stable(area_copy)
+        rollout_area = self._rollout_stay_until_stable(area_copy, cota)
+        if rollout_area is None:
+            return DOMINADO, DOMINADO, None, cur_pos, steps_taken
         counts = rollout_area.counts()
         costo = float(counts[1])
         score = self._score(counts, steps_taken)
         return costo, score, rollout_area, cur_pos, steps_taken
 
+    def _plan_tibio(self, pos: tuple[int, int]) -> list[tuple[int, int]] | None:
+        """
+        Plan del tick anterior sin su primer movimiento (ya ejecutado) y con
+        (0,0) al final. Solo vale si el bombero quedo donde el plan esperaba.
+        """
+        if not self.warm_start or self._plan_previo is None or self._pos_esperada != pos:
+            return None
+        return self._plan_previo[1:] + [(0, 0)]
+
     def _shake_plan(self, plan: list[tuple[int, int]], k: int) -> list[tuple[int, int]]:
         shaken = list(plan)
         if not shaken:
@@ -194,9 +316,81 @@ class VariableNeighborhoodSearch(strategy_bombero):
         changes = min(k, len(shaken))
         indices = self._rng.sample(range(len(shaken)), changes)
         for idx in indices:
-            shaken[idx] = self._rng.choice(MOVES)
+            shaken[idx] = self._rng.choice(self._moves_para(shaken, idx))
         return shaken
 
+    def _crear_pool(self) -> ProcessPoolExecutor:
+        self._corte = mp.Value("q", _SIN_CORTE)
+        params = {
+            "horizon": self.horizon,
+            "spread_prob": self.spread_prob,
+            "mc_samples": self.mc_samples,
+        }
+        return ProcessPoolExecutor(
+            max_workers=self.workers,
+            initializer=_init_worker,
+            initargs=(params, self._corte, self._contexto),
+        )
+
+    def cerrar(self) -> None:
+        super().cerrar()
+        self._corte = None
+
+    def _vecino_paralelo(
+        self,
+        area: Area,
+        pos: tuple[int, int],
+        plan: list[tuple[int, int]],
+        indices: list[int],
+        best_cost: float,
+        best_score: float,
+        restantes: int,
+        start: float,
+    ) -> tuple[tuple[list[tuple[int, int]], float, float, Area] | None, int]:
+        """
+        Un paso de primer mejor repartido entre procesos. Los vecinos se
+        numeran en el orden del recorrido secuencial (mismo corte por
+        max_evaluations al terminar cada indice) y gana la mejora de menor
+        posicion; las evaluaciones se cuentan como las contaria ese recorrido.
+        """
+        candidatos: list[list[tuple[int, int]]] = []
+        for idx in indices:
+            base_move = plan[idx]
+            for mv in self._moves_para(plan, idx):
+                if mv == base_move:
+                    continue
+                candidate = list(plan)
+                candidate[idx] = mv
+                candidatos.append(candidate)
+            if len(candidatos) >= restantes:
+                break
+        if not candidatos:
+            return None, 0
+
+        pool = self._get_pool()
+        self._corte.value = _SIN_CORTE
+        deadline = time.time() + self.time_limit - (time.perf_counter() - start)
+        procesos = min(self.workers, len(candidatos))
+        futures = [
+            pool.submit(
+                _evaluar_vecinos, self._compartida.nombre, self._version_area, pos, self._semilla_mc,
+                [(p, candidatos[p]) for p in range(w, len(candidatos), procesos)],
+                best_cost, best_score, deadline, self._cota(best_cost),
+            )
+            for w in range(procesos)
+        ]
+        evaluados = 0
+        mejora: tuple[int, float, float, bytes, int] | None = None
+        for fut in futures:
+            usados, hallado = fut.result()
+            evaluados += usados
+            if hallado is not None and (mejora is None or hallado[0] < mejora[0]):
+                mejora = hallado
+        if mejora is None:
+            return None, evaluados
+        posicion, cost, score, data, tick = mejora
+        return (candidatos[posicion], cost, score, Area.from_bytes(data, area.n, tick=tick)), posicion + 1
+
     def _local_search(
         self,
         area: Area,
@@ -220,14 +414,27 @@ class VariableNeighborhoodSearch(strategy_bombero):
             improved = False
             indices = list(range(len(plan)))
             self._rng.shuffle(indices)
+            if self.workers > 1:
+                hallado, usados = self._vecino_paralelo(
+                    area, pos, plan, indices, best_cost, best_score,
+                    self.max_evaluations - evaluations_done - evals_used, start,
+                )
+                evals_used += usados
+                if hallado is not None:
+                    plan, best_cost, best_score, best_area = hallado
+                    improved = True
+                steps += 1
+                continue
             for idx in indices:
                 base_move = plan[idx]
-                for mv in MOVES:
+                for mv in self._moves_para(plan, idx):
                     if mv == base_move:
                         continue
+                    if self._cancelado():
+                        return plan, best_cost, best_score, best_area, evals_used
                     candidate = list(plan)
                     candidate[idx] = mv
-                    cost, score, cand_area, _, _ = self._evaluate_plan(area, pos, candidate)
+                    cost, score, cand_area, _, _ = self._evaluate_plan(area, pos, candidate, cota=self._cota(best_cost))
                     evals_used += 1
                     if cost < best_cost or (cost == best_cost and score < best_score):
                         plan = candidate
@@ -251,6 +458,19 @@ class VariableNeighborhoodSearch(strategy_bombero):
         forbidden: set[tuple[int, int]],
     ) -> tuple[int, int]:
         start = time.perf_counter()
+        self._candidatos = (
+            CandidateLists(
+                area, (i, j), self.candidate_width,
+                llegada=self._contexto.llegada(area) if self._contexto is not None else None,
+            )
+            if self.candidate_width else None
+        )
+        if self._montecarlo is not None:
+            # misma semilla para todos los planes de esta decision (numeros comunes)
+            self._semilla_mc = self._rng.getrandbits(32)
+            self._montecarlo.preparar(area, (i, j), self._semilla_mc)
+        if self.workers > 1:
+            self._version_area = self._publicar_area(area)
         status = "ok"
 
         base_plan = self._initial_plan(area, (i, j))
@@ -261,6 +481,19 @@ class VariableNeighborhoodSearch(strategy_bombero):
             start,
             evaluations_done=0,
         )
+        warm_plan = self._plan_tibio((i, j))
+        warm_gano = False
+        if warm_plan is not None:
+            self.total_warm_starts += 1
+            cost, score, cand_area, _, _ = self._evaluate_plan(area, (i, j), warm_plan, cota=self._cota(best_cost))
+            evaluations += 1
+            if cost < best_cost or (cost == best_cost and score < best_score):
+                base_plan = warm_plan
+                best_cost = cost
+                best_score = score
+                best_area = cand_area
+                warm_gano = True
+                self.total_warm_wins += 1
 
         k = 1
         iterations = 0
@@ -271,6 +504,9 @@ class VariableNeighborhoodSearch(strategy_bombero):
             if evaluations >= self.max_evaluations:
                 status = "eval_limit"
                 break
+            if self._cancelado():
+                status = "cancelado"
+                break
 
             shaken = self._shake_plan(base_plan, k)
             shaken, cost, score, cand_area, used = self._local_search(
@@ -289,6 +525,7 @@ class VariableNeighborhoodSearch(strategy_bombero):
                 best_score = score
                 best_area = cand_area
                 k = 1
+                self._avisar({"tick": area.tick, "evaluaciones": evaluations, "mejor_costo": best_cost})
             else:
                 k += 1
                 if k > self.k_max:
@@ -310,7 +547,12 @@ class VariableNeighborhoodSearch(strategy_bombero):
                 "cortafuegos": best_area.counts()[2],
             },
             "cerrado": cerrada,
+            "mejor_costo": best_cost,
+            "warm_start": warm_plan is not None,
+            "warm_gano": warm_gano,
         }
+        if self._montecarlo is not None:
+            self._last_report["montecarlo"] = self._montecarlo.reporte()
 
         mv = base_plan[0] if base_plan else (0, 0)
         ni, nj = i + mv[0], j + mv[1]
@@ -320,7 +562,12 @@ class VariableNeighborhoodSearch(strategy_bombero):
                 mv = valid[0]
                 ni, nj = i + mv[0], j + mv[1]
             else:
-                return i, j
+                ni, nj = i, j
+        # El plan sigue valido el proximo tick solo si se ejecuto su primer
+        # movimiento; con el movimiento de respaldo la cola ya no aplica.
+        ejecutado = bool(base_plan) and mv == base_plan[0]
+        self._plan_previo = list(base_plan) if ejecutado else None
+        self._pos_esperada = (ni, nj)
         return ni, nj
 
     def ultima_busqueda(self) -> dict[str, object]:
@@ -331,22 +578,9 @@ class VariableNeighborhoodSearch(strategy_bombero):
         area: Area | None = None,
         wall_time: float | None = None,
     ) -> dict[str, object]:
-        libres = quemadas = cortafuegos = None
-        instantes = None
-        cerrado = None
-        if area is not None:
-            libres, quemadas, cortafuegos = area.counts()
-            instantes = area.tick
-            cerrado = area.limite()
-
         return {
-            "nodes": self.total_evaluations,
-            "estrategia": self._last_report.get("status", "sin_busqueda"),
-            "tiempo_busqueda_sec": self.total_time,
-            "tiempo_total_sec": wall_time,
-            "instantes": instantes,
-            "sin_afectar": libres,
-            "quemadas": quemadas,
-            "cortafuegos": cortafuegos,
-            "cerrado": cerrado,
+            **self._resumen(self.total_evaluations, area, wall_time),
+            "warm_starts": self.total_warm_starts,
+            "warm_ganados": self.total_warm_wins,
+            "rollouts_dominados": self.total_dominados,
         }
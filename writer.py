@@ -3,7 +3,7 @@ from area import Area
 
 def guardar_salida(path: str, area: Area) -> None:
     with open(path, "w", encoding="utf-8") as f:
-        for line in area.to_lines():
+        for line in area.iter_lines():
             f.write(line + "\n")
 
 
@@ -13,10 +13,14 @@ def guardar_report(
     finished: bool,
     cerrado: bool,
     stats: dict | None = None,
+    cerrado_exacto: bool | None = None,
 ) -> None:
     a_salvo, quemado, corta_fuego = area.counts()
     estado = "Finalizada" if finished else "Parcial"
     ctext = "Si" if cerrado else "No"
+    if cerrado_exacto is None and stats:
+        cerrado_exacto = stats.get("cerrado_exacto")
+    cetext = "-" if cerrado_exacto is None else ("Si" if cerrado_exacto else "No")
 
     nodes = "-"
     status = "-"
@@ -41,6 +45,7 @@ def guardar_report(
         f.write(f"Posiciones quemadas : {quemado}\n")
         f.write(f"Posiciones con cortafuego : {corta_fuego}\n")
         f.write(f"El cortafuego esta cerrado? : {ctext}\n")
+        f.write(f"El fuego esta contenido (exacto)? : {cetext}\n")
 
 
 def guardar_salida_txt(
@@ -76,3 +81,21 @@ def guardar_salida_txt(
         f.write(f"Posiciones quemadas : {quemadas}\n")
         f.write(f"Posiciones con cortafuego : {cortafuego}\n")
         f.write(f"Cortafuego cerrado : {cerrado_txt}\n")
+
+
+def guardar_presupuesto(path: str, reporte: dict) -> None:
+    """
+    Escribe como se repartio el presupuesto global de tiempo entre ticks.
+    """
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(f"Presupuesto (s) : {reporte.get('presupuesto_sec', '-')}\n")
+        f.write(f"Usado (s) : {reporte.get('usado_sec', '-')}\n")
+        f.write(f"Excedido (s) : {reporte.get('excedido_sec', '-')}\n")
+        f.write(f"Ticks sin presupuesto : {reporte.get('ticks_agotados', '-')}\n")
+        f.write("tick,frente,asignado,usado,exceso,restante\n")
+        for a in reporte.get("asignaciones", []):
+            usado = a.get("usado", 0.0)
+            f.write(
+                f"{int(a['tick'])},{int(a['frente'])},{a['asignado']:.6f},"
+                f"{usado:.6f},{max(0.0, usado - a['asignado']):.6f},{a['restante']:.6f}\n"
+            )